@@ -0,0 +1,44 @@
+"""hash zoho indexed record keys
+
+Revision ID: a9f3c61d2e84
+Revises: e4c9b2a7f150
+Create Date: 2026-10-19 20:06:15.418302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9f3c61d2e84'
+down_revision = 'e4c9b2a7f150'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The stored keys are plaintext; the next sync rebuilds the index hashed
+    op.execute('DELETE FROM zoho_indexed_record')
+    with op.batch_alter_table('zoho_indexed_record', schema=None) as batch_op:
+        batch_op.drop_column('phone')
+        batch_op.drop_column('email')
+        batch_op.drop_column('last_name')
+        batch_op.drop_column('first_name')
+        batch_op.alter_column('email_key', existing_type=sa.String(length=320), type_=sa.String(length=64), existing_nullable=True)
+        batch_op.alter_column('phone_key', existing_type=sa.String(length=32), type_=sa.String(length=64), existing_nullable=True)
+        batch_op.alter_column('mobile_phone_key', existing_type=sa.String(length=32), type_=sa.String(length=64), existing_nullable=True)
+        batch_op.alter_column('name_key', existing_type=sa.String(length=255), type_=sa.String(length=64), existing_nullable=True)
+
+
+def downgrade():
+    # Hashed keys cannot be turned back, so the index is rebuilt by the next sync
+    op.execute('DELETE FROM zoho_indexed_record')
+    with op.batch_alter_table('zoho_indexed_record', schema=None) as batch_op:
+        batch_op.alter_column('name_key', existing_type=sa.String(length=64), type_=sa.String(length=255), existing_nullable=True)
+        batch_op.alter_column('mobile_phone_key', existing_type=sa.String(length=64), type_=sa.String(length=32), existing_nullable=True)
+        batch_op.alter_column('phone_key', existing_type=sa.String(length=64), type_=sa.String(length=32), existing_nullable=True)
+        batch_op.alter_column('email_key', existing_type=sa.String(length=64), type_=sa.String(length=320), existing_nullable=True)
+        batch_op.add_column(sa.Column('first_name', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('last_name', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('email', sa.String(length=320), nullable=True))
+        batch_op.add_column(sa.Column('phone', sa.String(length=64), nullable=True))
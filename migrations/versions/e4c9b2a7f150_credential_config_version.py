@@ -0,0 +1,43 @@
+"""credential config version
+
+Revision ID: e4c9b2a7f150
+Revises: d3a8f61c0b27
+Create Date: 2026-10-19 18:12:44.301926
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4c9b2a7f150'
+down_revision = 'd3a8f61c0b27'
+branch_labels = None
+depends_on = None
+
+
+CREDENTIAL_TABLES = (
+    'anthropic_credential',
+    'dialpad_credential',
+    'fireflies_credential',
+    'google_credential',
+    'hubspot_credential',
+    'notion_credential',
+    'office365_credential',
+    'openai_credential',
+    'rapidapi_credential',
+    'sharpspring_credential',
+    'zoho_credential',
+)
+
+
+def upgrade():
+    for table_name in CREDENTIAL_TABLES:
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('config_version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    for table_name in reversed(CREDENTIAL_TABLES):
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.drop_column('config_version')
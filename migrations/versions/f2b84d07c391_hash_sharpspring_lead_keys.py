@@ -0,0 +1,36 @@
+"""hash sharpspring lead keys
+
+Revision ID: f2b84d07c391
+Revises: a9f3c61d2e84
+Create Date: 2026-10-19 20:21:37.905126
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b84d07c391'
+down_revision = 'a9f3c61d2e84'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The stored keys are plaintext; the next sync rebuilds the index hashed
+    op.execute('DELETE FROM sharpspring_lead')
+    with op.batch_alter_table('sharpspring_lead', schema=None) as batch_op:
+        batch_op.alter_column('email_key', existing_type=sa.String(length=320), type_=sa.String(length=64), existing_nullable=True)
+        batch_op.alter_column('phone_key', existing_type=sa.String(length=32), type_=sa.String(length=64), existing_nullable=True)
+        batch_op.alter_column('mobile_phone_key', existing_type=sa.String(length=32), type_=sa.String(length=64), existing_nullable=True)
+        batch_op.alter_column('name_key', existing_type=sa.String(length=255), type_=sa.String(length=64), existing_nullable=True)
+
+
+def downgrade():
+    # Hashed keys cannot be turned back, so the index is rebuilt by the next sync
+    op.execute('DELETE FROM sharpspring_lead')
+    with op.batch_alter_table('sharpspring_lead', schema=None) as batch_op:
+        batch_op.alter_column('name_key', existing_type=sa.String(length=64), type_=sa.String(length=255), existing_nullable=True)
+        batch_op.alter_column('mobile_phone_key', existing_type=sa.String(length=64), type_=sa.String(length=32), existing_nullable=True)
+        batch_op.alter_column('phone_key', existing_type=sa.String(length=64), type_=sa.String(length=32), existing_nullable=True)
+        batch_op.alter_column('email_key', existing_type=sa.String(length=64), type_=sa.String(length=320), existing_nullable=True)
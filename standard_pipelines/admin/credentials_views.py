@@ -157,7 +157,7 @@ def add_credential(client_id: UUID, credential_type: str):
     # Get model fields for form
     fields = []
     for column in model.__table__.columns:
-        if column.name not in ['id', 'client_id', 'created_at', 'updated_at']:
+        if column.name not in ['id', 'client_id', 'created_at', 'updated_at', 'config_version']:
             field_info = {
                 'name': column.name,
                 'type': str(column.type),
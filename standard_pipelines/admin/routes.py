@@ -1,10 +1,11 @@
-from flask import render_template, redirect, url_for, flash, request, abort, current_app
+from flask import render_template, redirect, url_for, flash, request, abort, current_app, jsonify
 from flask_login import current_user, login_required
 from standard_pipelines.admin import admin, _registered_views
 from sqlalchemy import func
 from sqlalchemy.inspection import inspect as sa_inspect
 from standard_pipelines.extensions import db
 from standard_pipelines.data_flow.models import Client, DataFlow, ClientDataFlowJoin
+from standard_pipelines.api.read_cache import read_cache
 from functools import wraps
 
 # Custom decorator to restrict access to admin users
@@ -84,6 +85,12 @@ def index():
     
     return render_template('admin/index.html', stats=stats)
 
+@admin.route('/read-cache')
+@admin_required
+def read_cache_stats():
+    """Hit and miss counters for cached API reads"""
+    return jsonify(read_cache.stats())
+
 @admin.route('/list/<model_name>')
 @admin_required
 def list_model(model_name):
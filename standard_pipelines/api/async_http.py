@@ -0,0 +1,134 @@
+"""
+Shared async HTTP engine for manually managed APIs.
+
+``httpx.AsyncClient`` is bound to the event loop it was first used on, while
+our callers are mostly synchronous Flask and Celery code that has no loop of
+its own. The engine therefore owns one background event loop per process and
+a single pooled client living on it. Async callers on any loop await requests
+through ``send``; sync callers hand whole coroutines over with ``run``, which
+blocks until they finish and keeps the Flask app context available to them.
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+from typing import Awaitable, Optional, TypeVar
+
+import httpx
+from flask import current_app, has_app_context
+from requests import PreparedRequest
+
+ResultType = TypeVar('ResultType')
+
+
+class AsyncHTTPEngine:
+
+    MAX_CONNECTIONS = 100
+    MAX_KEEPALIVE_CONNECTIONS = 20
+    KEEPALIVE_EXPIRY = 30  # seconds
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        # Gunicorn and Celery fork after import, and a forked child inherits
+        # neither the loop thread nor usable sockets, so start per process.
+        if self._loop is not None and self._pid == os.getpid():
+            return self._loop
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name='async-http-engine', daemon=True)
+                thread.start()
+                self._client = None
+                self._loop = loop
+                self._pid = os.getpid()
+        return self._loop
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Only touched from the engine loop, so it needs no locking
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.MAX_CONNECTIONS,
+                    max_keepalive_connections=self.MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=self.KEEPALIVE_EXPIRY,
+                ),
+            )
+        return self._client
+
+    async def send(self, prepared: PreparedRequest, timeout: float) -> httpx.Response:
+        """
+        Send a request prepared by a ``requests`` session on the shared client.
+
+        Preparing through ``requests`` keeps session headers and ``AuthBase``
+        authenticators working unchanged for the async path.
+        """
+        loop = self._ensure_started()
+        request = self._send(prepared, timeout)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return await request
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(request, loop))
+
+    async def _send(self, prepared: PreparedRequest, timeout: float) -> httpx.Response:
+        return await self.client.request(
+            prepared.method,
+            prepared.url,
+            headers=dict(prepared.headers),
+            content=prepared.body,
+            timeout=timeout,
+        )
+
+    def run(self, coroutine: Awaitable[ResultType]) -> ResultType:
+        """Run a coroutine on the engine loop and block until it completes."""
+        loop = self._ensure_started()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            raise RuntimeError("AsyncHTTPEngine.run cannot be called from the engine loop, await instead")
+
+        app = current_app._get_current_object() if has_app_context() else None
+        context = contextvars.copy_context()
+        return asyncio.run_coroutine_threadsafe(
+            self._in_context(context, self._in_app_context(app, coroutine)), loop
+        ).result()
+
+    @staticmethod
+    async def _in_context(context: contextvars.Context, coroutine: Awaitable[ResultType]) -> ResultType:
+        # Run with the caller's context variables (such as the read cache
+        # bypass) rather than the engine thread's empty ones.
+        return await asyncio.get_running_loop().create_task(coroutine, context=context)
+
+    @staticmethod
+    async def _in_app_context(app, coroutine: Awaitable[ResultType]) -> ResultType:
+        # Each task gets its own copy of the context, so pushing an app
+        # context here does not leak into other coroutines on the loop.
+        if app is None:
+            return await coroutine
+        with app.app_context():
+            return await coroutine
+
+    def close(self) -> None:
+        with self._lock:
+            loop, client, pid = self._loop, self._client, self._pid
+            self._loop = self._client = self._pid = None
+        # A loop inherited through fork has no thread left to run on
+        if loop is None or pid != os.getpid():
+            return
+        if client is not None:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+
+async_http_engine = AsyncHTTPEngine()
@@ -0,0 +1,244 @@
+"""
+Circuit breakers around external providers.
+
+One breaker exists per (provider, endpoint class) and its state lives in
+Redis, so when a partner goes down every worker stops calling it as soon as
+any of them has seen enough failures. While the breaker is open, calls raise
+``CircuitOpenError`` immediately instead of waiting out timeouts and retries.
+Once the cooldown has passed a single probe call is let through (half-open):
+success closes the breaker, failure opens it for another cooldown.
+
+Only outages count as failures: network errors, timeouts and 5xx responses.
+Client errors and rate limiting are the caller's problem, not the provider's.
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional, Tuple
+
+import httpx
+import requests
+from flask import current_app
+
+from standard_pipelines.data_flow.exceptions import CircuitOpenError
+
+CircuitKey = Tuple[str, str]
+
+# Exceptions that mean the provider could not be reached or did not answer
+OUTAGE_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    httpx.TransportError,
+    ConnectionError,
+    TimeoutError,
+)
+
+_RECORD_FAILURE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local threshold = tonumber(ARGV[2])
+local window = tonumber(ARGV[3])
+local cooldown = tonumber(ARGV[4])
+local failures = redis.call('HINCRBY', KEYS[1], 'failures', 1)
+local open_until = tonumber(redis.call('HGET', KEYS[1], 'open_until')) or 0
+if open_until == 0 and failures == 1 then
+    redis.call('EXPIRE', KEYS[1], window)
+end
+if open_until > 0 or failures >= threshold then
+    redis.call('HSET', KEYS[1], 'open_until', tostring(now + cooldown))
+    redis.call('EXPIRE', KEYS[1], cooldown + window)
+    redis.call('DEL', KEYS[2])
+    return 1
+end
+return 0
+"""
+
+
+class _LocalCircuit:
+
+    def __init__(self) -> None:
+        self.failures = 0
+        self.window_ends = 0.0
+        self.open_until = 0.0
+        self.probe_until = 0.0
+
+
+class CircuitBreaker:
+
+    # Failures within FAILURE_WINDOW seconds that open the breaker
+    FAILURE_THRESHOLD = 5
+    FAILURE_WINDOW = 60
+    # Seconds the breaker stays open before a probe is allowed
+    COOLDOWN = 30
+    # Seconds one probe has before another worker may probe instead
+    PROBE_TIMEOUT = 30
+
+    def __init__(self) -> None:
+        self._local: Dict[CircuitKey, _LocalCircuit] = {}
+        self._lock = threading.Lock()
+        self._scripts: Dict[int, tuple] = {}
+
+    def before_call(self, key: Optional[CircuitKey]) -> None:
+        """Raise ``CircuitOpenError`` unless a call to ``key`` may go out now."""
+        if key is None:
+            return
+        retry_after = self._rejection(key)
+        if retry_after is not None:
+            raise CircuitOpenError(f"{key[0]} {key[1]} circuit is open, retry in {retry_after:.0f}s", retry_after)
+
+    def check(self, key: Optional[CircuitKey]) -> None:
+        """
+        Raise ``CircuitOpenError`` if ``key`` is open, without taking the
+        half-open probe, so callers can stop before work they cannot finish.
+        """
+        if key is None:
+            return
+        retry_after = self._rejection(key, claim_probe=False)
+        if retry_after is not None:
+            raise CircuitOpenError(f"{key[0]} {key[1]} circuit is open, retry in {retry_after:.0f}s", retry_after)
+
+    def record_result(self, key: Optional[CircuitKey], status_code: Optional[int]) -> None:
+        if status_code is not None and status_code >= 500:
+            self.record_failure(key)
+        else:
+            self.record_success(key)
+
+    def record_success(self, key: Optional[CircuitKey]) -> None:
+        if key is None:
+            return
+        redis_client = self._redis_client()
+        if redis_client is not None:
+            try:
+                # Most calls succeed on a closed breaker, so check before writing
+                if redis_client.exists(self._redis_key(key)):
+                    redis_client.delete(self._redis_key(key), self._probe_key(key))
+                return
+            except Exception as e:
+                current_app.logger.warning(f"Redis circuit breaker unavailable, recording locally: {e}")
+        with self._lock:
+            self._local.pop(key, None)
+
+    def record_failure(self, key: Optional[CircuitKey]) -> None:
+        if key is None:
+            return
+        now = time.time()
+        redis_client = self._redis_client()
+        if redis_client is not None:
+            try:
+                script = self._script(redis_client)
+                opened = script(
+                    keys=[self._redis_key(key), self._probe_key(key)],
+                    args=[now, self.FAILURE_THRESHOLD, self.FAILURE_WINDOW, self.COOLDOWN],
+                )
+                if opened:
+                    current_app.logger.warning(f"Circuit for {key[0]} {key[1]} opened for {self.COOLDOWN}s")
+                return
+            except Exception as e:
+                current_app.logger.warning(f"Redis circuit breaker unavailable, recording locally: {e}")
+        with self._lock:
+            circuit = self._local.setdefault(key, _LocalCircuit())
+            if circuit.window_ends <= now and not circuit.open_until:
+                circuit.failures, circuit.window_ends = 0, now + self.FAILURE_WINDOW
+            circuit.failures += 1
+            if circuit.open_until or circuit.failures >= self.FAILURE_THRESHOLD:
+                circuit.open_until, circuit.probe_until = now + self.COOLDOWN, 0.0
+                current_app.logger.warning(f"Circuit for {key[0]} {key[1]} opened for {self.COOLDOWN}s")
+
+    @contextmanager
+    def recording_failures(self, key: Optional[CircuitKey]):
+        """Record the wrapped call as a failure if it raises a network error or timeout."""
+        try:
+            yield
+        except Exception as e:
+            if self.is_outage(e):
+                self.record_failure(key)
+            raise
+
+    # Async counterparts for coroutines on the async HTTP engine loop. Redis
+    # calls block, so they run in a worker thread instead of stalling every
+    # other request on the loop.
+
+    async def abefore_call(self, key: Optional[CircuitKey]) -> None:
+        if key is not None:
+            await asyncio.to_thread(self.before_call, key)
+
+    async def arecord_result(self, key: Optional[CircuitKey], status_code: Optional[int]) -> None:
+        if key is not None:
+            await asyncio.to_thread(self.record_result, key, status_code)
+
+    @asynccontextmanager
+    async def arecording_failures(self, key: Optional[CircuitKey]):
+        try:
+            yield
+        except Exception as e:
+            if key is not None and self.is_outage(e):
+                await asyncio.to_thread(self.record_failure, key)
+            raise
+
+    @staticmethod
+    def is_outage(error: BaseException) -> bool:
+        """Whether ``error``, or an error an SDK wrapped in it, is an ``OUTAGE_ERRORS``."""
+        seen = set()
+        while error is not None and id(error) not in seen:
+            if isinstance(error, OUTAGE_ERRORS):
+                return True
+            seen.add(id(error))
+            error = error.__cause__ or (None if error.__suppress_context__ else error.__context__)
+        return False
+
+    def _rejection(self, key: CircuitKey, claim_probe: bool = True) -> Optional[float]:
+        """
+        Seconds until ``key`` may be retried, or None if the call may proceed.
+        Past the cooldown, ``claim_probe`` makes this caller the half-open probe.
+        """
+        now = time.time()
+        redis_client = self._redis_client()
+        if redis_client is not None:
+            try:
+                open_until = float(redis_client.hget(self._redis_key(key), 'open_until') or 0)
+                if not open_until:
+                    return None
+                if now < open_until:
+                    return open_until - now
+                if not claim_probe:
+                    return None
+                # Half-open: exactly one worker gets to probe
+                if redis_client.set(self._probe_key(key), 1, nx=True, ex=self.PROBE_TIMEOUT):
+                    return None
+                return float(self.PROBE_TIMEOUT)
+            except Exception as e:
+                current_app.logger.warning(f"Redis circuit breaker unavailable, checking locally: {e}")
+        with self._lock:
+            circuit = self._local.get(key)
+            if circuit is None or not circuit.open_until:
+                return None
+            if now < circuit.open_until:
+                return circuit.open_until - now
+            if not claim_probe:
+                return None
+            if circuit.probe_until <= now:
+                circuit.probe_until = now + self.PROBE_TIMEOUT
+                return None
+            return circuit.probe_until - now
+
+    def _script(self, redis_client):
+        entry = self._scripts.get(id(redis_client))
+        if entry is None or entry[0] is not redis_client:
+            entry = self._scripts[id(redis_client)] = (redis_client, redis_client.register_script(_RECORD_FAILURE_SCRIPT))
+        return entry[1]
+
+    @staticmethod
+    def _redis_client():
+        return getattr(current_app, 'redis_client', None)
+
+    @staticmethod
+    def _redis_key(key: CircuitKey) -> str:
+        return f"circuit:{key[0]}:{key[1]}"
+
+    @staticmethod
+    def _probe_key(key: CircuitKey) -> str:
+        return f"circuit-probe:{key[0]}:{key[1]}"
+
+
+circuit_breaker = CircuitBreaker()
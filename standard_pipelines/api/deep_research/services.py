@@ -13,16 +13,26 @@ from openai.types.chat.chat_completion import ChatCompletion
 from standard_pipelines.api.services import BaseAPIManager
 from standard_pipelines.data_flow.exceptions import APIError
 from standard_pipelines.api.services import BaseManualAPIManager
+from standard_pipelines.api.rate_limit import RateLimitKey, credential_fingerprint
+from standard_pipelines.api.read_cache import read_cache
 from standard_pipelines.api.openai.services import OpenAIAPIManager
 import requests
 
 
 class LinkedInAPIClient(BaseManualAPIManager):
     """Internal specialized client for LinkedIn RapidAPI endpoints."""
+
+    # Profiles, posts and comments are re-researched often but change rarely
+    CACHE_TTL = 6 * 60 * 60
+    CACHE_STALE_TTL = 24 * 60 * 60
     
     @property
     def required_config(self) -> list[str]:
         return ["rapidapi_key", "rapidapi_host"]
+
+    @property
+    def rate_limit_key(self) -> Optional[RateLimitKey]:
+        return ("rapidapi", credential_fingerprint(self.api_config['rapidapi_key']))
     
     def api_url(self, api_context: Optional[dict] = None) -> str:
         """Get the RapidAPI URL based on the context."""
@@ -48,6 +58,30 @@ class LinkedInAPIClient(BaseManualAPIManager):
             return api_context['params']
         return None
 
+    def get_json_many(self, api_contexts: List[dict], bypass_cache: bool = False) -> List[Any]:
+        """
+        Return the JSON bodies for several calls, serving recent ones from the
+        read cache and fetching the rest concurrently.
+        """
+        name = f"{LinkedInAPIClient.__qualname__}.get_json_many"
+        keys = [
+            read_cache.make_key(name, self.cache_scope, (self.api_url(api_context), self.https_parameters(api_context)))
+            for api_context in api_contexts
+        ]
+
+        def fetch(indexes: List[int]) -> List[Any]:
+            responses = self.get_responses([api_contexts[index] for index in indexes])
+            return [response.json() for response in responses]
+
+        return read_cache.load_many(
+            name,
+            keys,
+            fetch,
+            ttl=self.CACHE_TTL,
+            stale_ttl=self.CACHE_STALE_TTL,
+            bypass=bypass_cache,
+        )
+
 
 class DeepResearchManager(BaseAPIManager):
     """
@@ -99,14 +133,23 @@ class DeepResearchManager(BaseAPIManager):
         if not current_app.config.get("RAPIDAPI_KEY") or not current_app.config.get("RAPIDAPI_HOST"):
             raise ValueError("RapidAPI credentials not configured in application config")
         
-        # Extract all LinkedIn data
-        profile_data = self._extract_linkedin_profile_data(linkedin_url)
+        username = self._extract_username_from_url(linkedin_url)
+        if not username:
+            raise ValueError(f"Could not extract username from LinkedIn URL: {linkedin_url}")
+
+        # Fetch the profile and posts concurrently; the profile response also
+        # carries the profile picture, so it is not requested a second time.
+        profile_json, posts_json = self.linkedin_client.get_json_many([
+            {'endpoint': '', 'params': {'username': username}},
+            {'endpoint': 'get-profile-posts', 'params': {'username': username}},
+        ])
+        profile_data = self._parse_linkedin_profile_data(profile_json)
         if not profile_data:
             raise APIError("Failed to extract LinkedIn profile data")
             
-        posts_data = self._extract_linkedin_posts(linkedin_url)
+        posts_data = self._parse_linkedin_posts(posts_json)
         comments_data = self._extract_linkedin_comments(profile_data["username"])
-        profile_image_url = self._extract_linkedin_profile_image(linkedin_url)
+        profile_image_url = profile_json.get('profilePicture')
         
         # Build prompts for analysis
         profile_prompt = self._build_profile_prompt(profile_data)
@@ -161,19 +204,8 @@ class DeepResearchManager(BaseAPIManager):
             return None
         return match.group(1)
     
-    def _extract_linkedin_profile_data(self, linkedin_url: str) -> Dict[str, Any]:
-        """Extract profile data from LinkedIn URL using LinkedIn API client."""
-        username = self._extract_username_from_url(linkedin_url)
-        if not username:
-            raise ValueError(f"Could not extract username from LinkedIn URL: {linkedin_url}")
-        
-        # Use the LinkedInAPIClient to get profile data
-        api_context = {
-            'endpoint': '',
-            'params': {'username': username}
-        }
-        response = self.linkedin_client.get_response(api_context)
-        data = response.json()
+    def _parse_linkedin_profile_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Shape the LinkedIn API profile payload into the fields used for analysis."""
         geo = data.get('geo', {})
         
         # Process and return the data
@@ -222,34 +254,8 @@ class DeepResearchManager(BaseAPIManager):
             ]
         }
     
-    def _extract_linkedin_profile_image(self, linkedin_url: str) -> Optional[str]:
-        """Extract profile image URL from LinkedIn URL using LinkedIn API client."""
-        username = self._extract_username_from_url(linkedin_url)
-        if not username:
-            return None
-        
-        api_context = {
-            'endpoint': '',
-            'params': {'username': username}
-        }
-        response = self.linkedin_client.get_response(api_context)
-        data = response.json()
-        return data.get('profilePicture')
-    
-    def _extract_linkedin_posts(self, linkedin_url: str) -> List[Dict[str, Any]]:
-        """Extract posts from LinkedIn URL using LinkedIn API client."""
-        username = self._extract_username_from_url(linkedin_url)
-        if not username:
-            return []
-        
-        api_context = {
-            'endpoint': 'get-profile-posts',
-            'params': {'username': username}
-        }
-        response = self.linkedin_client.get_response(api_context)
-        data = response.json()
-        
-        # Process posts, excluding reposts and limiting to 25
+    def _parse_linkedin_posts(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Process posts, excluding reposts and limiting to 25."""
         posts = []
         for post in data.get('data', []):
             if len(posts) >= 25:
@@ -272,8 +278,7 @@ class DeepResearchManager(BaseAPIManager):
             'endpoint': 'get-profile-comments',
             'params': {'username': username}
         }
-        response = self.linkedin_client.get_response(api_context)
-        data = response.json()
+        data, = self.linkedin_client.get_json_many([api_context])
         
         comments = []
         for comment in data.get('data', []):
@@ -2,7 +2,8 @@ from flask import current_app
 from .models import DialpadCredentials
 from standard_pipelines.api.services import BaseAPIManager
 from dialpad import DialpadClient
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 import pytz
 from requests.exceptions import RequestException, HTTPError
 from typing import Optional
@@ -12,6 +13,10 @@ class DialpadAPIManager(BaseAPIManager):
         super().__init__(creds)
         self.dialpad_client = DialpadClient(creds["api_key"])
 
+    @classmethod
+    def from_credentials(cls, credentials) -> "DialpadAPIManager":
+        return cls({"api_key": credentials.dialpad_api_key})
+
     @property
     def required_config(self) -> list[str]:
         return ["api_key"]
@@ -27,14 +32,16 @@ class DialpadAPIManager(BaseAPIManager):
                 return {"error": "Invalid call_id provided."}
             call_id = str(call_id)
             
-            # Get call data first
-            call_data = self.dialpad_client.call.get_info(call_id=call_id)
-            if 'error' in call_data:
-                current_app.logger.error(f"Error getting call data: {call_data['error']}")
-                return {"error": f"Error getting call data: {call_data['error']}"}
-            
-            # Get transcript data
-            transcript = self.dialpad_client.transcript.get(call_id=call_id)
+            # Call data and transcript are independent, so fetch them together
+            with ThreadPoolExecutor(max_workers=2, thread_name_prefix='dialpad-fetch') as executor:
+                call_data_future = executor.submit(self.dialpad_client.call.get_info, call_id=call_id)
+                transcript_future = executor.submit(self.dialpad_client.transcript.get, call_id=call_id)
+                call_data = call_data_future.result()
+                if 'error' in call_data:
+                    current_app.logger.error(f"Error getting call data: {call_data['error']}")
+                    return {"error": f"Error getting call data: {call_data['error']}"}
+                transcript = transcript_future.result()
+
             lines = transcript.get("lines")
             if not lines:
                 current_app.logger.error(f"No transcript found for call_id: {call_id}")
@@ -172,22 +179,41 @@ class DialpadAPIManager(BaseAPIManager):
         formatted_lines.append(f"Call Date: {date_started.strftime('%Y-%m-%d %H:%M:%S') if date_started else 'Unknown'}")
         formatted_lines.append(f"Call ID: {call_id}")
 
-        for entry in transcript_entries:
-            time_str = entry.get('time', '')
-            try:
-                time_obj = datetime.fromisoformat(time_str).replace(tzinfo=pytz.UTC).astimezone(local_timezone)
-                timestamp = time_obj.strftime("[%H:%M:%S]")
-            except ValueError:
-                timestamp = "[Unknown Time]"
-
-            speaker = entry.get('name', 'Unknown Speaker')
-            content = entry.get('content', 'N/A')
-
-            formatted_line = f"{timestamp} {speaker}: {content}"
-            formatted_lines.append(formatted_line)
+        # Every line is converted with the offset in effect when the call
+        # started, instead of converting each timestamp separately
+        utc_offset = None
+        if local_timezone is not pytz.UTC:
+            reference = date_started
+            if reference is None and transcript_entries:
+                first_time = self._parse_line_time(transcript_entries[0].get('time', ''))
+                reference = first_time.replace(tzinfo=pytz.UTC) if first_time and first_time.tzinfo is None else first_time
+            if reference is not None:
+                utc_offset = reference.astimezone(local_timezone).utcoffset()
+
+        formatted_lines.extend(
+            f"{self._line_timestamp(entry.get('time', ''), utc_offset)} {entry.get('name', 'Unknown Speaker')}: {entry.get('content', 'N/A')}"
+            for entry in transcript_entries
+        )
 
         return "\n".join(formatted_lines)
     
+    @staticmethod
+    def _parse_line_time(time_str: str) -> Optional[datetime]:
+        try:
+            return datetime.fromisoformat(time_str)
+        except (ValueError, TypeError):
+            return None
+
+    def _line_timestamp(self, time_str: str, utc_offset: Optional[timedelta]) -> str:
+        time_obj = self._parse_line_time(time_str)
+        if time_obj is None:
+            return "[Unknown Time]"
+        if time_obj.tzinfo is not None:
+            time_obj = time_obj.astimezone(pytz.UTC)
+        if utc_offset:
+            time_obj += utc_offset
+        return f"[{time_obj:%H:%M:%S}]"
+
     def _get_call_participants(self, call_data: dict) -> dict:
         guest = {
             "name": call_data.get("contact", {}).get("name", "Unknown Caller"),
@@ -17,6 +17,10 @@ class FirefliesAPIManager(BaseManualAPIManager, metaclass=ABCMeta):
             r.headers["Authorization"] = f"Bearer {self.api_key}"
             return r
 
+    @classmethod
+    def from_credentials(cls, credentials) -> "FirefliesAPIManager":
+        return cls({"api_key": credentials.fireflies_api_key})
+
     def authenticator(self) -> AuthBase:
         return self.FirefliesAuthenticator(self.api_config["api_key"])
 
@@ -27,45 +31,81 @@ class FirefliesAPIManager(BaseManualAPIManager, metaclass=ABCMeta):
     def api_url(self, api_context: Optional[dict] = None) -> str:
         return "https://api.fireflies.ai/graphql"
 
+    # Named selections of transcript fields. Sentences dominate the size of a
+    # long meeting's response, so only request the parts of them you use.
+    TRANSCRIPT_PROJECTIONS = {
+        "full": """
+            id
+            dateString
+            privacy
+            speakers { id name }
+            sentences { index speaker_name speaker_id text raw_text start_time end_time }
+            title
+            host_email
+            organizer_email
+            calendar_id
+            date
+            transcript_url
+            duration
+            meeting_attendees { displayName email phoneNumber name location }
+            cal_id
+            calendar_type
+            meeting_link
+        """,
+        # What transcript() needs to build the prompt and the attendee lists
+        "prompt": """
+            title
+            date
+            organizer_email
+            meeting_attendees { displayName email name }
+            sentences { speaker_name raw_text start_time }
+        """,
+        "attendees": """
+            id
+            title
+            date
+            organizer_email
+            meeting_attendees { displayName email name }
+        """,
+        "sentences_text": """
+            id
+            sentences { speaker_name text }
+        """,
+    }
+    # Transcripts requested per aliased query by transcripts()
+    TRANSCRIPT_BATCH_SIZE = 10
+
+    @classmethod
+    def _selection(cls, fields) -> str:
+        """
+        Resolve a projection name from ``TRANSCRIPT_PROJECTIONS``, or a list of
+        field selections such as ``["title", "speakers { name }"]``.
+        """
+        if isinstance(fields, str):
+            if fields not in cls.TRANSCRIPT_PROJECTIONS:
+                raise ValueError(f"Unknown Fireflies transcript projection: {fields}")
+            return cls.TRANSCRIPT_PROJECTIONS[fields]
+        return " ".join(fields)
+
     def https_payload(self, api_context: Optional[dict] = None) -> Optional[dict]:
-        query_string = """
-        query Transcript($transcriptId: String!) {
-            transcript(id: $transcriptId) {
-                id
-                dateString
-                privacy
-                speakers {
-                    id
-                    name
-                }
-                sentences {
-                    index
-                    speaker_name
-                    speaker_id
-                    text
-                    raw_text
-                    start_time
-                    end_time
-                }
-                title
-                host_email
-                organizer_email
-                calendar_id
-                date
-                transcript_url
-                duration
-                meeting_attendees {
-                    displayName
-                    email
-                    phoneNumber
-                    name
-                    location
-                }
-                cal_id
-                calendar_type
-                meeting_link
+        selection = self._selection(api_context.get("fields", "full")) # type: ignore
+        if "transcript_ids" in api_context: # type: ignore
+            # One aliased transcript field per id, so a batch is one request
+            transcript_ids = api_context["transcript_ids"] # type: ignore
+            variables = ", ".join(f"$id{index}: String!" for index in range(len(transcript_ids)))
+            aliases = " ".join(
+                f"t{index}: transcript(id: $id{index}) {{ {selection} }}"
+                for index in range(len(transcript_ids))
+            )
+            return {
+                "query": f"query Transcripts({variables}) {{ {aliases} }}",
+                "variables": {f"id{index}": transcript_id for index, transcript_id in enumerate(transcript_ids)},
             }
-        }
+
+        query_string = f"""
+        query Transcript($transcriptId: String!) {{
+            transcript(id: $transcriptId) {{ {selection} }}
+        }}
         """
         return {
             "query": query_string,
@@ -83,18 +123,47 @@ class FirefliesAPIManager(BaseManualAPIManager, metaclass=ABCMeta):
         AI prompt, a list of emails present in the transcript, a list of
         names present in the transcript, and the organizer's email.
         """
-        response : Response = self.get_response({"transcript_id": transcript_id})
-        current_app.logger.debug(f"get_transcript: {response.status_code}")
-        
-        transcript_object = response.json()
-
-        current_app.logger.debug(f"Transcript object: {transcript_object}")
+        transcript_object = self.transcript_object(transcript_id, fields="prompt")
         pretty_transcript = self._pretty_transcript_from_transcript_object(transcript_object)
         emails = self._emails_from_transcript_object(transcript_object)
         names = self._names_from_transcript_object(transcript_object)
         organizer_email = self._organizer_email_from_transcript_object(transcript_object)
         return pretty_transcript, emails, names, organizer_email
 
+    def transcript_object(self, transcript_id: str, fields="full") -> dict:
+        """
+        Returns the GraphQL response for one transcript, limited to ``fields``
+        (a projection name or a list of field selections, see ``_selection``).
+        """
+        response : Response = self.get_response({"transcript_id": transcript_id, "fields": fields})
+        current_app.logger.debug(f"get_transcript: {response.status_code}, {len(response.content)} bytes")
+        return response.json()
+
+    def transcripts(self, transcript_ids: list[str], fields="attendees") -> dict[str, Optional[dict]]:
+        """
+        Fetch many transcripts for backfills, ``TRANSCRIPT_BATCH_SIZE`` per
+        aliased query with the batches sent concurrently. Returns each
+        transcript's data by id, or None for ids Fireflies could not return.
+        """
+        transcript_ids = list(dict.fromkeys(transcript_ids))
+        batches = [
+            transcript_ids[start:start + self.TRANSCRIPT_BATCH_SIZE]
+            for start in range(0, len(transcript_ids), self.TRANSCRIPT_BATCH_SIZE)
+        ]
+        responses = self.get_responses(
+            {"transcript_ids": batch, "fields": fields} for batch in batches
+        )
+
+        results: dict[str, Optional[dict]] = {}
+        for batch, response in zip(batches, responses):
+            batch_object = response.json()
+            if batch_object.get("errors"):
+                current_app.logger.warning(f"GraphQL Errors: {batch_object['errors']}")
+            data = batch_object.get("data") or {}
+            for index, transcript_id in enumerate(batch):
+                results[transcript_id] = data.get(f"t{index}")
+        return results
+
     def _emails_from_transcript_object(self, transcript: dict) -> list[str]:
         transcript_data: dict = transcript.get("data", {}).get("transcript", {})
         meeting_attendees: list[dict] = transcript_data.get("meeting_attendees", [])
@@ -1,5 +1,8 @@
+from datetime import datetime
 from flask import current_app
 from standard_pipelines.api.services import BaseAPIManager
+from standard_pipelines.api.oauth_tokens import oauth_token_broker
+from standard_pipelines.data_flow.exceptions import OAuthRefreshError
 from email.message import EmailMessage
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
@@ -8,23 +11,65 @@ from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 from email.utils import getaddresses
 import base64
+import threading
+
+class BrokeredCredentials(Credentials):
+    """Google credentials that refresh through the shared OAuth token broker."""
+
+    def __init__(self, credential_cls, credential_id, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._credential_identity = (credential_cls, credential_id)
+
+    def refresh(self, request) -> None:
+        try:
+            access_token = oauth_token_broker.access_token(*self._credential_identity)
+        except OAuthRefreshError as e:
+            raise RefreshError(str(e)) from e
+        self.token = access_token.token
+        self.expiry = datetime.utcfromtimestamp(access_token.expires_at)
 
 class GmailAPIManager(BaseAPIManager):
-    def __init__(self, api_config: dict) -> None:
+    def __init__(self, api_config: dict, credentials=None) -> None:
         super().__init__(api_config)
-        self.google_credentials = Credentials(
-                token = None,
-                refresh_token = api_config['refresh_token'],
-                token_uri = "https://oauth2.googleapis.com/token",
-                client_id = current_app.config['GOOGLE_CLIENT_ID'],
-                client_secret = current_app.config['GOOGLE_CLIENT_SECRET'],
-                scopes = current_app.config['GOOGLE_SCOPES'].split()
+        google_kwargs = dict(
+            refresh_token = api_config['refresh_token'],
+            token_uri = "https://oauth2.googleapis.com/token",
+            client_id = current_app.config['GOOGLE_CLIENT_ID'],
+            client_secret = current_app.config['GOOGLE_CLIENT_SECRET'],
+            scopes = current_app.config['GOOGLE_SCOPES'].split()
+        )
+        if credentials is not None:
+            # Start from the cached access token instead of refreshing on first use
+            access_token = oauth_token_broker.access_token_for(credentials)
+            self.google_credentials = BrokeredCredentials(
+                type(credentials), credentials.id,
+                token = access_token.token,
+                expiry = datetime.utcfromtimestamp(access_token.expires_at),
+                **google_kwargs
             )
-        self.gmail_service = build('gmail', 'v1', credentials=self.google_credentials)
+        else:
+            self.google_credentials = Credentials(token = None, **google_kwargs)
+        self._thread_local = threading.local()
+
+    @classmethod
+    def from_credentials(cls, credentials) -> "GmailAPIManager":
+        return cls({'refresh_token': credentials.refresh_token}, credentials=credentials)
 
     @property
     def required_config(self) -> list[str]:
         return ['refresh_token']
+
+    @property
+    def gmail_service(self):
+        """
+        The Gmail service for the calling thread. Pooled managers are shared
+        between threads, but googleapiclient services and their httplib2
+        transport are not thread-safe.
+        """
+        service = getattr(self._thread_local, 'gmail_service', None)
+        if service is None:
+            service = self._thread_local.gmail_service = build('gmail', 'v1', credentials=self.google_credentials)
+        return service
     
     @property
     def refresh_token(self):
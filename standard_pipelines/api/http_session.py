@@ -0,0 +1,62 @@
+"""
+Process-wide pooled ``requests`` session.
+
+Module-level ``requests.post`` / ``requests.request`` open a new TCP and TLS
+connection for every call. Managers that talk HTTP through ``requests``
+share this session instead, so connections to each provider stay alive
+between calls, data flow runs and manager instances. Authentication is
+applied per request, and cookies are never stored, so nothing leaks from one
+client's calls into another's.
+"""
+
+import os
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from typing import Optional
+
+import requests
+from flask import current_app, has_app_context
+from requests.adapters import HTTPAdapter
+
+
+class PooledSession(requests.Session):
+
+    # (connect, read) seconds, for callers that do not pass a timeout
+    DEFAULT_TIMEOUT = (5, 60)
+
+    def __init__(self, pool_connections: int, pool_maxsize: int) -> None:
+        super().__init__()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+        self.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.DEFAULT_TIMEOUT
+        return super().request(method, url, **kwargs)
+
+
+DEFAULT_POOL_CONNECTIONS = 20
+DEFAULT_POOL_MAXSIZE = 20
+
+_session: Optional[PooledSession] = None
+_session_pid: Optional[int] = None
+_lock = threading.Lock()
+
+
+def get_shared_session() -> PooledSession:
+    """Return this process's pooled session, creating it on first use."""
+    global _session, _session_pid
+    # Sockets must not be shared with a parent process after fork
+    if _session is not None and _session_pid == os.getpid():
+        return _session
+    with _lock:
+        if _session is None or _session_pid != os.getpid():
+            config = current_app.config if has_app_context() else {}
+            _session = PooledSession(
+                pool_connections=int(config.get('HTTP_POOL_CONNECTIONS', DEFAULT_POOL_CONNECTIONS)),
+                pool_maxsize=int(config.get('HTTP_POOL_MAXSIZE', DEFAULT_POOL_MAXSIZE)),
+            )
+            _session_pid = os.getpid()
+    return _session
@@ -60,6 +60,11 @@ class HubSpotCredentials(OAuthCredentialMixin):
             description='Connect to HubSpot to sync contacts and deals'
         )
     
+    def get_oauth_client_credentials(self):
+        """Prefer the client credentials stored on the row (legacy support)."""
+        default_id, default_secret = super().get_oauth_client_credentials()
+        return (self.hubspot_client_id or default_id, self.hubspot_client_secret or default_secret)
+
     @classmethod
     def from_oauth_callback(cls, client_id, token, user_info=None):
         """Override to store client credentials from config."""
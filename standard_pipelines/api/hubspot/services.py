@@ -2,17 +2,28 @@ from __future__ import annotations
 
 from flask import current_app
 from standard_pipelines.api.services import BaseAPIManager
-from standard_pipelines.data_flow.exceptions import APIError
+from standard_pipelines.data_flow.exceptions import APIError, ObjectNotFoundError
+from standard_pipelines.api.oauth_tokens import OAuthTokenBroker, oauth_token_broker
+from standard_pipelines.api.pagination import paginate
+from standard_pipelines.api.rate_limit import RateLimitKey, credential_fingerprint
+from standard_pipelines.api.read_cache import cached_read
+from standard_pipelines.api.hubspot.models import HubSpotCredentials
 
 from hubspot import HubSpot
 from hubspot.crm.associations import BatchInputPublicObjectId
 from hubspot.crm.contacts import SimplePublicObject as ContactObject, SimplePublicObjectWithAssociations as ContactObjectWithAssociations
+from hubspot.crm.contacts import Filter, FilterGroup, PublicObjectSearchRequest
 from hubspot.crm.deals import SimplePublicObject as DealObject, SimplePublicObjectWithAssociations as DealObjectWithAssociations
+from hubspot.crm.deals import BatchReadInputSimplePublicObjectId
 from hubspot.crm.objects.meetings import SimplePublicObject as MeetingObject
 from hubspot.crm.objects.notes import SimplePublicObject as NoteObject
 from hubspot.crm.associations.v4 import AssociationSpec
 from hubspot.files import ApiException
+from urllib3.util.retry import Retry
 
+import json
+import re
+import time
 import typing as t
 from types import MappingProxyType
 
@@ -22,29 +33,115 @@ from abc import ABCMeta, abstractmethod
 
 class HubSpotAPIManager(BaseAPIManager, metaclass=ABCMeta):
 
-    def __init__(self, api_config: dict) -> None:
+    CONTACT_SEARCH_PROPERTIES = ["firstname", "lastname", "email"]
+    # Search requests accept at most this many OR-ed filter groups
+    MAX_SEARCH_FILTER_GROUPS = 5
+    SEARCH_PAGE_SIZE = 100
+    # Objects per page of a list endpoint, HubSpot's maximum
+    LIST_PAGE_SIZE = 100
+    # Inputs per batch create, upsert or association request
+    BATCH_LIMIT = 100
+    # (connect, read) seconds for batch requests
+    BATCH_TIMEOUT = (5, 60)
+    # Only retry requests HubSpot never processed (connection failures and
+    # 429s), so POSTs that create objects are never sent twice
+    SDK_RETRY = Retry(
+        total=3, connect=3, read=0, status=3, status_forcelist=(429,),
+        allowed_methods=None, backoff_factor=1, respect_retry_after_header=True,
+    )
+
+    def __init__(self, api_config: dict, credentials: t.Optional[HubSpotCredentials] = None) -> None:
         super().__init__(api_config)
-        self._api_client = HubSpot()
-        self._api_client.access_token = self.access_token
+        # Managers can outlive the request that loaded the credentials, so only
+        # the row's identity is kept and tokens are looked up through the broker.
+        self._credentials_identity = None
+        if credentials is not None:
+            self._credentials_identity = (type(credentials), credentials.id)
+            oauth_token_broker.access_token_for(credentials)
+        self._hubspot = HubSpot(retry=self.SDK_RETRY)
+        self._access_token_expires_at = 0.0
+
+    @classmethod
+    def from_credentials(cls, credentials: HubSpotCredentials) -> HubSpotAPIManager:
+        return cls({
+            "client_id": credentials.hubspot_client_id,
+            "client_secret": credentials.hubspot_client_secret,
+            "refresh_token": credentials.hubspot_refresh_token
+        }, credentials=credentials)
 
     @property
     def required_config(self) -> list[str]:
         return ["client_id", "client_secret", "refresh_token"]
 
+    @property
+    def rate_limit_key(self) -> t.Optional[RateLimitKey]:
+        if self._credentials_identity is not None:
+            return ("hubspot", str(self._credentials_identity[1]))
+        return ("hubspot", credential_fingerprint(self.api_config["refresh_token"]))
+
+    @property
+    def _api_client(self) -> HubSpot:
+        # Every SDK call goes through here, so this is where calls are metered
+        self.throttle()
+        if time.time() >= self._access_token_expires_at - OAuthTokenBroker.EXPIRY_MARGIN:
+            self._hubspot.access_token = self.access_token
+        return self._hubspot
+
     @property
     def access_token(self) -> str:
-        return self._api_client.oauth.tokens_api.create(
+        if self._credentials_identity is not None:
+            token = oauth_token_broker.access_token(*self._credentials_identity)
+            self._access_token_expires_at = token.expires_at
+            return token.token
+
+        response = self._hubspot.oauth.tokens_api.create(
             grant_type="refresh_token",
             client_id=self.api_config["client_id"],
             client_secret=self.api_config["client_secret"],
             refresh_token=self.api_config["refresh_token"],
-        ).access_token #type: ignore
+        )
+        self._access_token_expires_at = time.time() + response.expires_in #type: ignore
+        return response.access_token #type: ignore
 
     def all_contacts(self) -> list[dict]:
-        return [contact.to_dict() for contact in self._api_client.crm.contacts.get_all()]
+        return list(self.iter_contacts())
+
+    def iter_contacts(self, properties: t.Optional[list[str]] = None, prefetch: bool = True) -> t.Iterator[dict]:
+        """Yield every contact of the portal page by page, fetching the next page in the background."""
+        def fetch_page(after: t.Optional[str]):
+            page = self._api_client.crm.contacts.basic_api.get_page(
+                limit=self.LIST_PAGE_SIZE, after=after, properties=properties
+            ).to_dict() #type: ignore
+            return page["results"], ((page.get("paging") or {}).get("next") or {}).get("after")
+
+        return paginate(fetch_page, prefetch=prefetch)
     
     def all_owners(self) -> list[dict]:
-        return self._api_client.settings.users.users_api.get_page(limit=100).to_dict()["results"] #type: ignore
+        return list(self.owners_directory()["by_id"].values())
+
+    # Shared by every flow on the portal and refreshed in the background
+    @cached_read(ttl=600, stale_ttl=3600)
+    def owners_directory(self) -> dict:
+        """
+        Every user of the portal, indexed by id and by lowercased email. An
+        email maps to a list, so duplicates can still be reported.
+        """
+        def fetch_page(after: t.Optional[str]):
+            page = self._api_client.settings.users.users_api.get_page(limit=self.LIST_PAGE_SIZE, after=after).to_dict() #type: ignore
+            return page["results"], ((page.get("paging") or {}).get("next") or {}).get("after")
+
+        by_id = {}
+        by_email = {}
+        for user in paginate(fetch_page):
+            by_id[str(user["id"])] = user
+            if user.get("email") is None:
+                current_app.logger.warning(f"Hubspot user {user['id']} has no email.")
+            else:
+                by_email.setdefault(user["email"].lower(), []).append(user)
+        return {"by_id": by_id, "by_email": by_email}
+
+    def owner_by_id(self, owner_id: str) -> t.Optional[dict]:
+        return self.owners_directory()["by_id"].get(str(owner_id))
     
     def all_users(self) -> list[dict]:
         return [user.to_dict() for user in self._api_client.crm.objects.get_all(object_type="user")]
@@ -58,13 +155,7 @@ class HubSpotAPIManager(BaseAPIManager, metaclass=ABCMeta):
         return deal.to_dict()
 
     def user_by_email(self, email: str) -> dict:
-        all_users = self.all_owners()
-        matching_users = []
-        for user in all_users:
-            if user.get("email") == None:
-                current_app.logger.warning(f"Hubspot user {user['properties']['hs_object_id']} has no email.")
-            elif user["email"] == email:
-                matching_users.append(user)
+        matching_users = self.owners_directory()["by_email"].get(email.lower(), [])
         if len(matching_users) > 1:
             error_msg = f"Multiple users found for email {email}."
             raise APIError(error_msg)
@@ -73,20 +164,74 @@ class HubSpotAPIManager(BaseAPIManager, metaclass=ABCMeta):
             raise APIError(error_msg)
         return matching_users[0]
 
-    # TODO: This seems like it queries the entire hubspot database. May fail on larger inputs?
+    def search_contacts(self, filter_groups: list[FilterGroup], properties: list[str]) -> list[dict]:
+        """Run a CRM contact search and return the results from every page."""
+        results = []
+        after = None
+        while True:
+            request = PublicObjectSearchRequest(
+                filter_groups=filter_groups,
+                properties=properties,
+                limit=self.SEARCH_PAGE_SIZE,
+                after=after,
+            )
+            page = self._api_client.crm.contacts.search_api.do_search(public_object_search_request=request).to_dict() #type: ignore
+            results.extend(page["results"])
+            after = ((page.get("paging") or {}).get("next") or {}).get("after")
+            if not after:
+                return results
+
+    def _contact_name_filter_groups(self, name: str) -> list[FilterGroup]:
+        # Search can only compare firstname and lastname separately, so try
+        # every way of splitting the full name between the two.
+        tokens = name.split(" ")
+        filter_groups = [
+            FilterGroup(filters=[
+                Filter(property_name="firstname", operator="EQ", value=name),
+                Filter(property_name="lastname", operator="NOT_HAS_PROPERTY"),
+            ]),
+            FilterGroup(filters=[
+                Filter(property_name="lastname", operator="EQ", value=name),
+                Filter(property_name="firstname", operator="NOT_HAS_PROPERTY"),
+            ]),
+        ]
+        for split in range(1, len(tokens)):
+            filter_groups.append(FilterGroup(filters=[
+                Filter(property_name="firstname", operator="EQ", value=" ".join(tokens[:split])),
+                Filter(property_name="lastname", operator="EQ", value=" ".join(tokens[split:])),
+            ]))
+        return filter_groups
+
+    @staticmethod
+    def _contact_matches(contact: dict, name: t.Optional[str], email: t.Optional[str]) -> bool:
+        properties = contact.get("properties") or {}
+        contact_full_name = f"{properties.get('firstname') or ''} {properties.get('lastname') or ''}".strip()
+        contact_email = properties.get("email") or ""
+        return (
+            name is not None and contact_full_name == name
+            or email is not None and contact_email == email
+        )
+
+    # Only found contacts are cached, so a contact created after a miss is picked up
+    @cached_read(ttl=300)
     def contact_by_name_or_email(self, name: t.Optional[str] = None, email: t.Optional[str] = None) -> dict:
-        all_contacts = self.all_contacts()
-        matching_contacts = []
-        for contact in all_contacts:
-            contact_first_name = contact.get("properties", {}).get("firstname", "")
-            contact_last_name = contact.get("properties", {}).get("lastname", "")
-            contact_full_name = f"{contact_first_name} {contact_last_name}".strip()
-            contact_email = contact.get("properties", {}).get("email", "")
-            if (
-                name is not None and contact_full_name == name
-                or email is not None and contact_email == email
-            ):
-                matching_contacts.append(contact)
+        filter_groups = []
+        if email:
+            filter_groups.append(FilterGroup(filters=[Filter(property_name="email", operator="EQ", value=email)]))
+        if name:
+            filter_groups.extend(self._contact_name_filter_groups(name))
+
+        candidates = {}
+        for start in range(0, len(filter_groups), self.MAX_SEARCH_FILTER_GROUPS):
+            chunk = filter_groups[start:start + self.MAX_SEARCH_FILTER_GROUPS]
+            for contact in self.search_contacts(chunk, self.CONTACT_SEARCH_PROPERTIES):
+                candidates[contact["id"]] = contact
+
+        # Search matches case-insensitively, while lookups have always been exact
+        matching_contacts = [
+            contact for contact in candidates.values()
+            if self._contact_matches(contact, name, email)
+        ]
         if len(matching_contacts) > 1: # TODO: better error handling
             error_msg = f"Multiple contacts found for {email} or {name}."
             raise APIError(error_msg)
@@ -96,31 +241,68 @@ class HubSpotAPIManager(BaseAPIManager, metaclass=ABCMeta):
         return matching_contacts[0]
 
     def deal_by_contact_id(self, contact_id: str) -> dict:
-        batch_ids = BatchInputPublicObjectId([{"id": contact_id}])
-        deal_associations = self._api_client.crm.associations.batch_api.read(
-            from_object_type="contacts",
-            to_object_type="deals",
-            batch_input_public_object_id=batch_ids,
-        ).to_dict()["results"] #type: ignore
-        if len(deal_associations) > 1:
-            error_msg = f"Multiple deals found for contact {contact_id}."
-            raise APIError(error_msg)
-        if len(deal_associations) == 0:
-            error_msg = f"No deal found for contact {contact_id}."
-            raise APIError(error_msg)
-        deal_association_to = deal_associations[0]["to"]
-        contact_to_deal_associations = []
-        for deal_association in deal_association_to:
-            if deal_association["type"] == "contact_to_deal":
-                contact_to_deal_associations.append(deal_association)
-        if len(contact_to_deal_associations) > 1:
-            error_msg = f"Multiple deals found for contact {contact_id}."
-            raise APIError(error_msg)
-        if len(contact_to_deal_associations) == 0:
-            error_msg = f"No deal found for contact {contact_id}."
-            raise APIError(error_msg)
-        deal_id = contact_to_deal_associations[0]["id"]
-        return self.deal_by_deal_id(deal_id)
+        deal = self.deals_by_contact_ids([contact_id])[str(contact_id)]
+        if isinstance(deal, APIError):
+            raise deal
+        return deal
+
+    def deals_by_contact_ids(self, contact_ids: list[str], properties: t.Optional[list[str]] = None) -> dict[str, t.Union[dict, APIError]]:
+        """
+        Resolve the single deal of each contact with one batch association
+        read and one batch deal read, however many contacts there are.
+
+        Returns a mapping from contact ID to either the deal or the APIError
+        ``deal_by_contact_id`` raises for that contact when it has no deal or
+        several.
+        """
+        contact_ids = list(dict.fromkeys(str(contact_id) for contact_id in contact_ids))
+        associations: dict[str, list[dict]] = {contact_id: [] for contact_id in contact_ids}
+        for chunk in self._batch_chunks([{"id": contact_id} for contact_id in contact_ids]):
+            results = self._api_client.crm.associations.batch_api.read(
+                from_object_type="contacts",
+                to_object_type="deals",
+                batch_input_public_object_id=BatchInputPublicObjectId(chunk),
+            ).to_dict()["results"] #type: ignore
+            for result in results:
+                associations[str(result["_from"]["id"])].append(result)
+
+        deal_ids: dict[str, t.Union[str, APIError]] = {}
+        for contact_id, deal_associations in associations.items():
+            if len(deal_associations) > 1:
+                deal_ids[contact_id] = APIError(f"Multiple deals found for contact {contact_id}.")
+                continue
+            if len(deal_associations) == 0:
+                deal_ids[contact_id] = APIError(f"No deal found for contact {contact_id}.")
+                continue
+            contact_to_deal_associations = [
+                deal_association for deal_association in deal_associations[0]["to"]
+                if deal_association["type"] == "contact_to_deal"
+            ]
+            if len(contact_to_deal_associations) > 1:
+                deal_ids[contact_id] = APIError(f"Multiple deals found for contact {contact_id}.")
+            elif len(contact_to_deal_associations) == 0:
+                deal_ids[contact_id] = APIError(f"No deal found for contact {contact_id}.")
+            else:
+                deal_ids[contact_id] = str(contact_to_deal_associations[0]["id"])
+
+        distinct_deal_ids = list(dict.fromkeys(deal_id for deal_id in deal_ids.values() if isinstance(deal_id, str)))
+        deals: dict[str, dict] = {}
+        for chunk in self._batch_chunks([{"id": deal_id} for deal_id in distinct_deal_ids]):
+            batch_read = BatchReadInputSimplePublicObjectId(properties=properties or [], inputs=chunk)
+            results = self._api_client.crm.deals.batch_api.read(
+                batch_read_input_simple_public_object_id=batch_read,
+            ).to_dict()["results"] #type: ignore
+            deals.update({str(deal["id"]): deal for deal in results})
+
+        resolved: dict[str, t.Union[dict, APIError]] = {}
+        for contact_id, deal_id in deal_ids.items():
+            if isinstance(deal_id, APIError):
+                resolved[contact_id] = deal_id
+            elif deal_id not in deals:
+                resolved[contact_id] = APIError(f"Deal {deal_id} of contact {contact_id} could not be read.")
+            else:
+                resolved[contact_id] = deals[deal_id]
+        return resolved
 
     def hubspot_association_object(self, to_id: str, association_id: str, association_category: str = "HUBSPOT_DEFINED") -> dict:
         return {
@@ -150,6 +332,169 @@ class HubSpotAPIManager(BaseAPIManager, metaclass=ABCMeta):
     def create_note(self, note_object: CreatableNoteHubSpotObject) -> ExtantNoteHubSpotObject:
         note: NoteObject = self._api_client.crm.objects.notes.basic_api.create(note_object.hubspot_object_dict)
         return ExtantNoteHubSpotObject(note.to_dict(), self)
+
+    def create_notes(self, note_objects: list[CreatableNoteHubSpotObject]) -> list[t.Union[ExtantNoteHubSpotObject, APIError]]:
+        """
+        Create notes, with their inline associations, through the batch
+        endpoint. The result for each note is the created note or its error,
+        in the order of ``note_objects``: the note HubSpot rejected, or every
+        note of a request that failed as a whole.
+        """
+        results: list[t.Union[ExtantNoteHubSpotObject, APIError]] = []
+        for chunk in self._batch_chunks(note_objects):
+            try:
+                created = self.batch_create_each("note", [note_object.hubspot_object_dict for note_object in chunk])
+                results.extend(note if isinstance(note, APIError) else ExtantNoteHubSpotObject(note, self) for note in created)
+            except Exception as e:
+                current_app.logger.error(f"Error creating a batch of {len(chunk)} notes: {str(e)}")
+                error = e if isinstance(e, APIError) else APIError(f"Failed to create note: {str(e)}")
+                results.extend(error for _ in chunk)
+        return results
+
+    def batch_create(self, object_type: str, inputs: list[dict]) -> list[dict]:
+        """
+        Create objects of one type through the batch endpoint, BATCH_LIMIT per
+        request. Each input is a create body ({"properties", "associations"})
+        and the created objects are returned in input order.
+        """
+        results = self.batch_create_each(object_type, inputs)
+        errors = [result for result in results if isinstance(result, APIError)]
+        if errors:
+            raise APIError(f"HubSpot batch {object_type} create failed for {len(errors)} of {len(inputs)} inputs: {errors[0]}")
+        return results
+
+    def batch_create_each(self, object_type: str, inputs: list[dict]) -> list[t.Union[dict, APIError]]:
+        """
+        Like ``batch_create``, but when HubSpot rejects some inputs of a
+        request (207 Multi-Status) the others are still returned: the result
+        for each input is the created object or the APIError of that input.
+        """
+        results: list[t.Union[dict, APIError]] = []
+        for chunk in self._batch_chunks(inputs):
+            traced = [dict(object_input, objectWriteTraceId=str(index)) for index, object_input in enumerate(chunk)]
+            response = self._batch_request(f"{object_type} create", self._batch_api(object_type).create, traced, partial=True)
+            results.extend(self._traced_results(object_type, response, len(chunk)))
+        return results
+
+    def batch_upsert(self, object_type: str, id_property: str, inputs: list[dict]) -> list[dict]:
+        """
+        Create or update objects of one type keyed by a unique property, e.g.
+        contacts by email, so an object created since we last looked is
+        updated instead of duplicated. Upserts cannot carry associations.
+        """
+        results = []
+        for chunk in self._batch_chunks(inputs):
+            upserts = [
+                {"idProperty": id_property, "id": object_input["properties"][id_property], "properties": object_input["properties"]}
+                for object_input in chunk
+            ]
+            response = self._batch_request(f"{object_type} upsert", self._batch_api(object_type).upsert, upserts)
+            results.extend(self._ordered_results(
+                response, chunk,
+                lambda _, object_input: str(object_input["properties"][id_property]).lower(),
+                lambda result: str((result.get("properties") or {}).get(id_property) or "").lower(),
+            ))
+        return results
+
+    def batch_associate(self, from_type: str, to_type: str, pairs: list[tuple[str, str]]) -> None:
+        """Associate (from_id, to_id) pairs with the default association type between the two object types."""
+        association_type_id = HubSpotObject.ASSOCIATION_TYPES[(from_type, to_type)]
+        inputs = [
+            {
+                "from": {"id": from_id},
+                "to": {"id": to_id},
+                "types": [{"associationCategory": "HUBSPOT_DEFINED", "associationTypeId": association_type_id}],
+            }
+            for from_id, to_id in pairs
+        ]
+        from_path, to_path = self._object_path(from_type), self._object_path(to_type)
+        for chunk in self._batch_chunks(inputs):
+            batch_api = self._api_client.crm.associations.v4.batch_api
+            self._batch_request(
+                f"{from_type} to {to_type} association",
+                lambda body, **kwargs: batch_api.create(from_path, to_path, body, **kwargs),
+                chunk,
+            )
+
+    def _batch_chunks(self, inputs: list) -> t.Iterator[list]:
+        for start in range(0, len(inputs), self.BATCH_LIMIT):
+            yield inputs[start:start + self.BATCH_LIMIT]
+
+    def _batch_api(self, object_type: str):
+        if object_type == "contact":
+            return self._api_client.crm.contacts.batch_api
+        elif object_type == "deal":
+            return self._api_client.crm.deals.batch_api
+        elif object_type == "meeting":
+            return self._api_client.crm.objects.meetings.batch_api
+        elif object_type == "note":
+            return self._api_client.crm.objects.notes.batch_api
+        raise ValueError(f"No HubSpot batch API for object type {object_type}.")
+
+    def _batch_request(self, description: str, call: t.Callable[..., t.Any], inputs: list[dict], partial: bool = False) -> dict:
+        """
+        Send one batch request through the SDK. The raw JSON is read instead
+        of the SDK's models, which drop objectWriteTraceId from results.
+        Unless ``partial`` is set, errors for some of the inputs raise.
+        """
+        try:
+            response = call({"inputs": inputs}, _preload_content=False, _request_timeout=self.BATCH_TIMEOUT)
+        except Exception as e:
+            status = getattr(e, "status", None)
+            if status:
+                self.observe_rate_limit(status, getattr(e, "headers", None) or {})
+            raise APIError(f"HubSpot batch {description} failed with status {status}: {getattr(e, 'body', None) or e}") from e
+        self.observe_rate_limit(response.status, response.headers)
+        body = json.loads(response.data) if response.data else {}
+        # 207 Multi-Status: some inputs went through and some did not
+        if body.get("errors") and not partial:
+            raise APIError(f"HubSpot batch {description} partially failed: {body['errors']}")
+        return body
+
+    @staticmethod
+    def _traced_results(object_type: str, response: dict, input_count: int) -> list[t.Union[dict, APIError]]:
+        """Match the results and errors of a traced batch create to its inputs by objectWriteTraceId."""
+        results = response.get("results") or []
+        errors = response.get("errors") or []
+        by_trace = {str(result.get("objectWriteTraceId")): result for result in results}
+        errors_by_trace: dict[str, APIError] = {}
+        for error in errors:
+            trace_ids = error.get("objectWriteTraceId") or (error.get("context") or {}).get("objectWriteTraceId") or []
+            for trace_id in [trace_ids] if isinstance(trace_ids, str) else trace_ids:
+                errors_by_trace[str(trace_id)] = APIError(f"HubSpot rejected the {object_type}: {error.get('message') or error}")
+
+        if not errors and len(results) == input_count and not any(str(index) in by_trace for index in range(input_count)):
+            # No trace ids echoed back, fall back to response order
+            return list(results)
+        unmatched = APIError(f"HubSpot batch {object_type} create returned no result for this input: {errors}")
+        return [
+            by_trace.get(str(index)) or errors_by_trace.get(str(index), unmatched)
+            for index in range(input_count)
+        ]
+
+    @staticmethod
+    def _ordered_results(
+        response: dict,
+        inputs: list[dict],
+        input_key: t.Callable[[int, dict], str],
+        result_key: t.Union[str, t.Callable[[dict], str]],
+    ) -> list[dict]:
+        # Batch results are not guaranteed to come back in input order
+        results = response.get("results") or []
+        if isinstance(result_key, str):
+            field = result_key
+            result_key = lambda result: str(result.get(field))
+        by_key = {result_key(result): result for result in results}
+        ordered = [by_key.get(input_key(index, object_input)) for index, object_input in enumerate(inputs)]
+        if any(result is None for result in ordered):
+            if len(results) != len(inputs):
+                raise APIError(f"HubSpot batch returned {len(results)} results for {len(inputs)} inputs")
+            return results
+        return ordered
+
+    @staticmethod
+    def _object_path(object_type: str) -> str:
+        return HubSpotObject.OBJECT_PATHS.get(object_type, object_type)
         
     def update_field(self, object_type: str, object_id: int, field_name: str, field_value: str) -> dict:
         """Update a field in a HubSpot object.
@@ -167,27 +512,88 @@ class HubSpotAPIManager(BaseAPIManager, metaclass=ABCMeta):
             APIError: If the object doesn't exist or the field update fails
         """
         try:
-            # Create a simple object with just the properties to update
-            properties = {"properties": {field_name: field_value}}
-            
-            # Use the appropriate API based on object type
-            if object_type == "contact":
-                updated_object = self._api_client.crm.contacts.basic_api.update(str(object_id), properties)
-            elif object_type == "deal":
-                updated_object = self._api_client.crm.deals.basic_api.update(str(object_id), properties)
-            elif object_type == "meeting":
-                updated_object = self._api_client.crm.objects.meetings.basic_api.update(str(object_id), properties)
-            elif object_type == "note":
-                updated_object = self._api_client.crm.objects.notes.basic_api.update(str(object_id), properties)
-            else:
-                # Generic object update for other types
-                updated_object = self._api_client.crm.objects.basic_api.update(object_type, str(object_id), properties)
-                
-            return updated_object.to_dict()
+            return self._update_object(object_type, object_id, {field_name: field_value})
         except Exception as e:
             current_app.logger.error(f"Error updating {object_type} field {field_name}: {str(e)}")
             raise APIError(f"Failed to update {field_name} for {object_type} with ID {object_id}: {str(e)}")
 
+    def update_fields(self, object_type: str, object_id: int, properties: dict[str, str]) -> dict:
+        """Update several fields of a HubSpot object with a single PATCH.
+
+        HubSpot rejects the whole PATCH when any property is invalid, listing
+        the offending properties in its error. Those are reported as
+        failures and the remaining properties are sent again together.
+
+        Args:
+            object_type: The type of object (e.g., "contacts", "deals")
+            object_id: The ID of the object to update
+            properties: New values by property name
+
+        Returns:
+            A dictionary with the updated object (None if no property could be
+            updated) and the failures, mapping property names to the HubSpot
+            error code and message
+
+        Raises:
+            ObjectNotFoundError: If the object doesn't exist
+            APIError: If the update fails for a reason other than invalid
+            properties
+        """
+        remaining = dict(properties)
+        failures = {}
+        while remaining:
+            try:
+                updated_object = self._update_object(object_type, object_id, remaining)
+                return {"updated_object": updated_object, "failures": failures}
+            except Exception as e:
+                if getattr(e, "status", None) == 404:
+                    raise ObjectNotFoundError(f"{object_type.capitalize()} with ID {object_id} not found")
+                invalid = {
+                    name: details for name, details in self._invalid_properties(e).items()
+                    if name in remaining
+                }
+                if not invalid:
+                    current_app.logger.error(f"Error updating {object_type} fields {list(remaining)}: {str(e)}")
+                    raise APIError(f"Failed to update fields for {object_type} with ID {object_id}: {str(e)}")
+                for name, details in invalid.items():
+                    del remaining[name]
+                    failures[name] = details
+        return {"updated_object": None, "failures": failures}
+
+    def _update_object(self, object_type: str, object_id: int, properties: dict[str, str]) -> dict:
+        payload = {"properties": properties}
+
+        # Use the appropriate API based on object type
+        if object_type == "contact":
+            updated_object = self._api_client.crm.contacts.basic_api.update(str(object_id), payload)
+        elif object_type == "deal":
+            updated_object = self._api_client.crm.deals.basic_api.update(str(object_id), payload)
+        elif object_type == "meeting":
+            updated_object = self._api_client.crm.objects.meetings.basic_api.update(str(object_id), payload)
+        elif object_type == "note":
+            updated_object = self._api_client.crm.objects.notes.basic_api.update(str(object_id), payload)
+        else:
+            # Generic object update for other types
+            updated_object = self._api_client.crm.objects.basic_api.update(object_type, str(object_id), payload)
+
+        return updated_object.to_dict()
+
+    @staticmethod
+    def _invalid_properties(error: Exception) -> dict[str, dict]:
+        """Property-level validation errors from a failed update, by property name."""
+        try:
+            body = json.loads(getattr(error, "body", None) or "{}")
+        except (TypeError, ValueError):
+            return {}
+        invalid = {}
+        for detail in body.get("errors") or []:
+            names = (detail.get("context") or {}).get("propertyName") or []
+            if not names:
+                names = re.findall(r'Property "([^"]+)"', detail.get("message") or "")
+            for name in names:
+                invalid[name] = {"code": detail.get("code"), "message": detail.get("message")}
+        return invalid
+
 class HubSpotObject(metaclass=ABCMeta):
 
     # Magic numbers to associate various types of HubSpot objects
@@ -200,6 +606,14 @@ class HubSpotObject(metaclass=ABCMeta):
         ("note", "contact"): 202,  # Added note to contact association
     })
 
+    # Object type names as they appear in CRM API paths
+    OBJECT_PATHS = MappingProxyType({
+        "contact": "contacts",
+        "deal": "deals",
+        "meeting": "meetings",
+        "note": "notes",
+    })
+
     def __init__(self, hubspot_object_dict: dict, api_manager: HubSpotAPIManager):
         self.hubspot_object_dict = hubspot_object_dict
         self.api_manager = api_manager
@@ -302,7 +716,7 @@ class CreatableMeetingHubSpotObject(CreatableHubSpotObject[ExtantMeetingHubSpotO
 
     hubspot_type: str = "meeting"
 
-    def add_owner_from_deal(self, deal: ExtantDealHubSpotObject) -> None:
+    def add_owner_from_deal(self, deal: ExtantDealHubSpotObject | CreatableDealHubSpotObject) -> None:
         self.hubspot_object_dict["properties"]["hubspot_owner_id"] = deal.hubspot_object_dict["properties"]["hubspot_owner_id"]
 
     @property
@@ -313,10 +727,122 @@ class CreatableNoteHubSpotObject(CreatableHubSpotObject[ExtantNoteHubSpotObject]
 
     hubspot_type: str = "note"
 
-    def add_owner_from_deal(self, deal: ExtantDealHubSpotObject) -> None:
+    def add_owner_from_deal(self, deal: ExtantDealHubSpotObject | CreatableDealHubSpotObject) -> None:
         self.hubspot_object_dict["properties"]["hubspot_owner_id"] = deal.hubspot_object_dict["properties"]["hubspot_owner_id"]
 
     @property
     def creation_function(self) -> t.Callable[[CreatableNoteHubSpotObject], ExtantNoteHubSpotObject]:
         return self.api_manager.create_note
 
+
+EXTANT_HUBSPOT_OBJECT_TYPES: MappingProxyType[str, type[ExtantHubSpotObject]] = MappingProxyType({
+    "contact": ExtantContactHubSpotObject,
+    "deal": ExtantDealHubSpotObject,
+    "meeting": ExtantMeetingHubSpotObject,
+    "note": ExtantNoteHubSpotObject,
+})
+
+class HubSpotUnitOfWork:
+    """
+    Collects the creates and associations of a graph of HubSpot objects and
+    writes them with HubSpot's batch endpoints instead of one call per object
+    and per association.
+
+    ``flush`` creates objects in rounds: an object waits for the objects it
+    is associated with that were added before it, so every association to an
+    object that already exists goes inline with the create. Each round is one
+    batch request per object type. Associations that could not go inline are
+    then sent in one batch request per pair of object types.
+    """
+
+    def __init__(self, api_manager: HubSpotAPIManager) -> None:
+        self.api_manager = api_manager
+        self._objects: list[HubSpotObject] = []
+        self._upsert_by: dict[int, str] = {}
+        self._associations: list[tuple[HubSpotObject, HubSpotObject]] = []
+        self._resolved: dict[int, ExtantHubSpotObject] = {}
+
+    def add(self, hubspot_object: HubSpotObject, upsert_by: t.Optional[str] = None) -> None:
+        """
+        Register an object. A creatable object with ``upsert_by`` set is
+        upserted on that unique property instead of created.
+        """
+        if any(registered is hubspot_object for registered in self._objects):
+            return
+        self._objects.append(hubspot_object)
+        if isinstance(hubspot_object, CreatableHubSpotObject) and upsert_by is not None \
+                and hubspot_object.hubspot_object_dict["properties"].get(upsert_by):
+            self._upsert_by[id(hubspot_object)] = upsert_by
+
+    def associate(self, from_object: HubSpotObject, to_object: HubSpotObject) -> None:
+        from_object.association_type_id(from_object.hubspot_type, to_object.hubspot_type)
+        self.add(from_object)
+        self.add(to_object)
+        self._associations.append((from_object, to_object))
+
+    def resolve(self, hubspot_object: HubSpotObject) -> ExtantHubSpotObject:
+        """The existing object a registered object became once flushed."""
+        if isinstance(hubspot_object, ExtantHubSpotObject):
+            return hubspot_object
+        return self._resolved[id(hubspot_object)]
+
+    def flush(self) -> None:
+        order = {id(hubspot_object): index for index, hubspot_object in enumerate(self._objects)}
+        for hubspot_object in self._objects:
+            if isinstance(hubspot_object, ExtantHubSpotObject):
+                self._resolved[id(hubspot_object)] = hubspot_object
+        pending = [hubspot_object for hubspot_object in self._objects if id(hubspot_object) not in self._resolved]
+        inlined: set[int] = set()
+
+        while pending:
+            pending_ids = {id(hubspot_object) for hubspot_object in pending}
+            ready = [
+                hubspot_object for hubspot_object in pending
+                if not any(
+                    id(partner) in pending_ids and order[id(partner)] < order[id(hubspot_object)]
+                    for partner in self._partners(hubspot_object)
+                )
+            ]
+            for hubspot_object in ready:
+                if id(hubspot_object) in self._upsert_by:
+                    continue
+                for index, (from_object, to_object) in enumerate(self._associations):
+                    if from_object is hubspot_object and id(to_object) in self._resolved:
+                        hubspot_object.add_association(self._resolved[id(to_object)])
+                        inlined.add(index)
+            self._create(ready)
+            pending = [hubspot_object for hubspot_object in pending if id(hubspot_object) not in self._resolved]
+
+        pairs: dict[tuple[str, str], list[tuple[str, str]]] = {}
+        for index, (from_object, to_object) in enumerate(self._associations):
+            if index in inlined:
+                continue
+            pairs.setdefault((from_object.hubspot_type, to_object.hubspot_type), []).append((
+                self._resolved[id(from_object)].hubspot_object_dict["id"],
+                self._resolved[id(to_object)].hubspot_object_dict["id"],
+            ))
+        for (from_type, to_type), type_pairs in pairs.items():
+            self.api_manager.batch_associate(from_type, to_type, type_pairs)
+
+    def _partners(self, hubspot_object: HubSpotObject) -> t.Iterator[HubSpotObject]:
+        for from_object, to_object in self._associations:
+            if from_object is hubspot_object:
+                yield to_object
+            elif to_object is hubspot_object:
+                yield from_object
+
+    def _create(self, hubspot_objects: list[HubSpotObject]) -> None:
+        batches: dict[tuple[str, t.Optional[str]], list[HubSpotObject]] = {}
+        for hubspot_object in hubspot_objects:
+            upsert_by = self._upsert_by.get(id(hubspot_object))
+            batches.setdefault((hubspot_object.hubspot_type, upsert_by), []).append(hubspot_object)
+
+        for (hubspot_type, upsert_by), batch in batches.items():
+            inputs = [hubspot_object.hubspot_object_dict for hubspot_object in batch]
+            if upsert_by is None:
+                results = self.api_manager.batch_create(hubspot_type, inputs)
+            else:
+                results = self.api_manager.batch_upsert(hubspot_type, upsert_by, inputs)
+            extant_type = EXTANT_HUBSPOT_OBJECT_TYPES[hubspot_type]
+            for hubspot_object, result in zip(batch, results):
+                self._resolved[id(hubspot_object)] = extant_type(result, self.api_manager)
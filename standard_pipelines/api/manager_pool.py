@@ -0,0 +1,187 @@
+"""
+Process-level pool of API managers.
+
+Building a manager decrypts the client's credentials and usually creates a
+fresh SDK client / HTTP session, so doing it for every webhook throws away
+warm connections and access tokens. The pool keeps managers alive between
+data flow runs, keyed by (provider, client_id, credential version), where the
+version is the credential row's id and ``config_version``. That counter only
+moves when config or secrets change, not when an access token is refreshed,
+so token refreshes keep pooled managers warm while any other change produces
+a new key. In-process config writes (OAuth callback, admin and user credential
+forms) also evict the old entry eagerly.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple, Type, TypeVar
+
+from flask import current_app
+from sqlalchemy import event, inspect
+
+from standard_pipelines.auth.models import BaseCredentials
+from standard_pipelines.extensions import db
+
+ManagerType = TypeVar('ManagerType')
+
+# (provider, client_id, (credential_id, config_version))
+PoolKey = Tuple[str, str, Tuple[Hashable, Hashable]]
+
+
+class APIManagerPool:
+    """Thread-safe LRU of API managers with an idle TTL."""
+
+    DEFAULT_MAXSIZE = 64
+    DEFAULT_IDLE_TTL = 900  # seconds
+
+    def __init__(self, maxsize: Optional[int] = None, idle_ttl: Optional[float] = None) -> None:
+        self._maxsize = maxsize
+        self._idle_ttl = idle_ttl
+        # key -> (manager, expires_at, last_used)
+        self._entries: 'OrderedDict[PoolKey, Tuple[Any, float, float]]' = OrderedDict()
+        self._lock = threading.RLock()
+
+    @property
+    def maxsize(self) -> int:
+        if self._maxsize is not None:
+            return self._maxsize
+        return int(current_app.config.get('API_MANAGER_POOL_SIZE', self.DEFAULT_MAXSIZE))
+
+    @property
+    def idle_ttl(self) -> float:
+        if self._idle_ttl is not None:
+            return self._idle_ttl
+        return float(current_app.config.get('API_MANAGER_POOL_IDLE_TTL', self.DEFAULT_IDLE_TTL))
+
+    @staticmethod
+    def provider_name(credential_cls: Type[BaseCredentials]) -> str:
+        return credential_cls.__tablename__
+
+    def get(
+        self,
+        credential_cls: Type[BaseCredentials],
+        client_id,
+        factory: Callable[[Any], ManagerType],
+        max_age: Optional[float] = None,
+    ) -> ManagerType:
+        """
+        Return a pooled manager for the client's credentials of the given type,
+        building it with ``factory(credentials)`` on a miss.
+
+        Only the id and ``config_version`` of the credential row are read on a
+        hit, so nothing is decrypted unless the manager has to be rebuilt.
+        ``max_age`` bounds how long a manager is reused regardless of activity,
+        for managers holding an access token that they do not refresh.
+        """
+        version_row = db.session.query(
+            credential_cls.id, credential_cls.config_version
+        ).filter_by(client_id=client_id).first()
+        if version_row is None:
+            self.invalidate(credential_cls, client_id)
+            raise ValueError(f"No {credential_cls.__name__} found for client {client_id}")
+
+        key = self._key(credential_cls, client_id, (version_row.id, version_row.config_version))
+        manager = self._lookup(key)
+        if manager is not None:
+            return manager
+
+        credentials = db.session.get(credential_cls, version_row.id)
+        return self._store(key, factory(credentials), max_age)
+
+    def get_for_credentials(
+        self,
+        credentials: BaseCredentials,
+        factory: Callable[[Any], ManagerType],
+        max_age: Optional[float] = None,
+    ) -> ManagerType:
+        """Like ``get`` but for a credential row the caller has already loaded."""
+        credential_cls = type(credentials)
+        key = self._key(credential_cls, credentials.client_id, (credentials.id, credentials.config_version))
+        manager = self._lookup(key)
+        if manager is not None:
+            return manager
+        return self._store(key, factory(credentials), max_age)
+
+    def invalidate(self, credential_cls: Type[BaseCredentials], client_id=None) -> int:
+        """
+        Drop every pooled manager for the provider, optionally limited to a
+        single client. Returns the number of evicted managers.
+        """
+        provider = self.provider_name(credential_cls)
+        with self._lock:
+            stale = [
+                key for key in self._entries
+                if key[0] == provider and (client_id is None or key[1] == str(client_id))
+            ]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _key(self, credential_cls: Type[BaseCredentials], client_id, version: Tuple[Hashable, Hashable]) -> PoolKey:
+        return (self.provider_name(credential_cls), str(client_id), version)
+
+    def _lookup(self, key: PoolKey) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            manager, expires_at, _ = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries[key] = (manager, expires_at, now)
+            self._entries.move_to_end(key)
+            return manager
+
+    def _store(self, key: PoolKey, manager: ManagerType, max_age: Optional[float] = None) -> ManagerType:
+        provider, client_id, (credential_id, _) = key
+        now = time.monotonic()
+        expires_at = now + max_age if max_age is not None else float('inf')
+        with self._lock:
+            # Older versions of the same credential can never be hit again
+            stale_keys = [
+                k for k in self._entries
+                if k[:2] == (provider, client_id) and k[2][0] == credential_id and k != key
+            ]
+            for stale in stale_keys:
+                del self._entries[stale]
+            self._entries[key] = (manager, expires_at, now)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return manager
+
+    def _evict_idle(self, now: float) -> None:
+        cutoff = now - self.idle_ttl
+        # Entries are kept in least-recently-used order, so the idle ones are at the front
+        while self._entries:
+            key, (_, _, last_used) = next(iter(self._entries.items()))
+            if last_used >= cutoff:
+                break
+            del self._entries[key]
+
+
+api_manager_pool = APIManagerPool()
+
+
+@event.listens_for(BaseCredentials, 'after_insert', propagate=True)
+@event.listens_for(BaseCredentials, 'after_delete', propagate=True)
+def invalidate_pooled_managers(mapper, connection, target):
+    api_manager_pool.invalidate(type(target), target.client_id)
+
+
+@event.listens_for(BaseCredentials, 'after_update', propagate=True)
+def invalidate_reconfigured_managers(mapper, connection, target):
+    # Access-token refreshes leave config_version alone and keep the managers
+    if inspect(target).attrs.config_version.history.has_changes():
+        api_manager_pool.invalidate(type(target), target.client_id)
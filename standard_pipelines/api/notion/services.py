@@ -1,12 +1,14 @@
 """
 Notion API service for making authenticated requests.
 """
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterator, Optional, List
 import requests
 from datetime import datetime, timedelta
 from flask import current_app
 
 from standard_pipelines.api.services import BaseAPIManager
+from standard_pipelines.api.http_session import get_shared_session
+from standard_pipelines.api.pagination import paginate
 from standard_pipelines.api.notion.models import NotionCredentials
 
 
@@ -34,7 +36,7 @@ class NotionAPIManager(BaseAPIManager):
         url = f"{self.BASE_URL}/{endpoint}"
         headers = self._get_headers()
         
-        response = requests.request(
+        response = get_shared_session().request(
             method=method,
             url=url,
             headers=headers,
@@ -64,27 +66,22 @@ class NotionAPIManager(BaseAPIManager):
     
     def get_databases(self) -> List[Dict[str, Any]]:
         """Get all databases in the workspace."""
-        results = []
-        has_more = True
-        start_cursor = None
-        
-        while has_more:
-            data = {}
+        return list(self.iter_databases())
+    
+    def iter_databases(self, prefetch: bool = False) -> Iterator[Dict[str, Any]]:
+        """Yield the databases in the workspace page by page."""
+        def fetch_page(start_cursor: Optional[str]):
+            data = {"filter": {"property": "object", "value": "database"}}
             if start_cursor:
                 data["start_cursor"] = start_cursor
             
-            response = self._make_request("POST", "search", json={
-                "filter": {"property": "object", "value": "database"},
-                **data
-            })
+            response = self._make_request("POST", "search", json=data)
             response.raise_for_status()
             
             result = response.json()
-            results.extend(result.get("results", []))
-            has_more = result.get("has_more", False)
-            start_cursor = result.get("next_cursor")
+            return result.get("results", []), result.get("next_cursor") if result.get("has_more") else None
         
-        return results
+        return paginate(fetch_page, prefetch=prefetch)
     
     def get_database(self, database_id: str) -> Dict[str, Any]:
         """Get a specific database by ID."""
@@ -105,29 +102,38 @@ class NotionAPIManager(BaseAPIManager):
         Returns:
             List of database entries
         """
+        return list(self.iter_database(database_id, filter_obj, sorts))
+    
+    def iter_database(self, database_id: str, filter_obj: Optional[Dict] = None,
+                      sorts: Optional[List[Dict]] = None, prefetch: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the entries of a database query page by page, fetching the next
+        page while the current one is consumed.
+        
+        Args:
+            database_id: The database ID to query
+            filter_obj: Optional filter object
+            sorts: Optional list of sort objects
+            prefetch: Fetch the next page in the background
+            
+        Returns:
+            Iterator over database entries
+        """
         data = {}
         if filter_obj:
             data["filter"] = filter_obj
         if sorts:
             data["sorts"] = sorts
         
-        results = []
-        has_more = True
-        start_cursor = None
-        
-        while has_more:
-            if start_cursor:
-                data["start_cursor"] = start_cursor
-            
-            response = self._make_request("POST", f"databases/{database_id}/query", json=data)
+        def fetch_page(start_cursor: Optional[str]):
+            body = dict(data, start_cursor=start_cursor) if start_cursor else data
+            response = self._make_request("POST", f"databases/{database_id}/query", json=body)
             response.raise_for_status()
             
             result = response.json()
-            results.extend(result.get("results", []))
-            has_more = result.get("has_more", False)
-            start_cursor = result.get("next_cursor")
+            return result.get("results", []), result.get("next_cursor") if result.get("has_more") else None
         
-        return results
+        return paginate(fetch_page, prefetch=prefetch)
     
     def create_page(self, parent: Dict[str, Any], properties: Dict[str, Any], 
                    children: Optional[List[Dict]] = None) -> Dict[str, Any]:
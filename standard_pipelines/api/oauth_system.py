@@ -19,7 +19,10 @@ from functools import wraps
 import inspect
 
 from standard_pipelines.extensions import db, oauth
+from standard_pipelines.data_flow.exceptions import OAuthRefreshError, OAuthGrantRevokedError
 from standard_pipelines.auth.models import BaseCredentials
+from standard_pipelines.api.http_session import get_shared_session
+from standard_pipelines.api.manager_pool import api_manager_pool
 from standard_pipelines.data_flow.models import Client
 
 
@@ -40,6 +43,8 @@ class OAuthConfig:
     user_info_fields: Dict[str, str] = field(default_factory=dict)
     extra_authorize_params: Dict[str, Any] = field(default_factory=dict)
     token_endpoint_auth_method: str = 'client_secret_post'
+    # Pacing for the background token pre-refresh sweep
+    max_refreshes_per_second: float = 2.0
 
 
 # Global registry of OAuth-enabled credential models
@@ -95,42 +100,98 @@ class OAuthCredentialMixin(BaseCredentials):
         """
         return []
     
-    def sync_to_n8n(self, user_email: str) -> bool:
+    def get_oauth_client_credentials(self) -> Tuple[Optional[str], Optional[str]]:
         """
-        Sync this credential to N8N.
+        Return the OAuth app's (client_id, client_secret) used to refresh this
+        credential. Defaults to the app configuration; models that store their
+        own client credentials override this.
+        """
+        config = self.get_oauth_config()
+        return (
+            current_app.config.get(config.client_id_env),
+            current_app.config.get(config.client_secret_env),
+        )
+
+    def refresh_oauth_token(self) -> Dict[str, Any]:
+        """
+        Exchange the stored refresh token for a new access token.
+
+        Returns the provider's token response, which contains at least
+        ``access_token`` and usually ``expires_in`` and a rotated ``refresh_token``.
+        Raises OAuthGrantRevokedError when the provider rejects the refresh token.
+        """
+        config = self.get_oauth_config()
+        client_id, client_secret = self.get_oauth_client_credentials()
+        if not self.oauth_refresh_token:
+            raise OAuthGrantRevokedError(f"No refresh token stored for {self.__class__.__name__} {self.id}")
+
+        try:
+            response = requests.post(
+                config.access_token_url,
+                data={
+                    'grant_type': 'refresh_token',
+                    'client_id': client_id,
+                    'client_secret': client_secret,
+                    'refresh_token': self.oauth_refresh_token,
+                },
+                timeout=30,
+            )
+        except requests.RequestException as e:
+            raise OAuthRefreshError(f"Token refresh request to {config.display_name} failed: {e}") from e
+
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = {}
+
+        # Some providers (Zoho) report grant errors with a 200 status
+        error = payload.get('error')
+        if error in ('invalid_grant', 'invalid_code', 'unauthorized_client'):
+            raise OAuthGrantRevokedError(f"{config.display_name} rejected the refresh token: {error}")
+        if response.status_code != 200 or error or not payload.get('access_token'):
+            raise OAuthRefreshError(
+                f"{config.display_name} token refresh failed: {response.status_code} - {error or response.text}"
+            )
+        return payload
+
+    def sync_to_n8n(self, user_email: str, n8n_types: Optional[List[str]] = None) -> List[str]:
+        """
+        Sync this credential to N8N, pushing every credential type in one pass
+        over a shared HTTP session.
         
         Args:
             user_email: Email of the user who completed the OAuth flow
+            n8n_types: Subset of get_n8n_credential_types() to sync, defaults to all
             
         Returns:
-            True if successful, False otherwise.
+            The credential types that failed with a retriable error (empty on success).
         """
         from standard_pipelines.data_flow.models import Client
         
-        n8n_types = self.get_n8n_credential_types()
+        n8n_types = self.get_n8n_credential_types() if n8n_types is None else n8n_types
         if not n8n_types:
-            return True  # No N8N sync needed
+            return []  # No N8N sync needed
+        
+        # Get client info for naming
+        client = Client.query.get(self.client_id)
+        if not client:
+            current_app.logger.error(f"Client {self.client_id} not found for N8N sync")
+            return []
         
+        service_name = self.get_oauth_config().display_name if self.get_oauth_config() else self.__class__.__name__
+        credential_name = f"{client.name} - {user_email} - {service_name}"
+        return _sync_credential_to_n8n(self, n8n_types, credential_name)
+
+    def queue_n8n_sync(self, user_email: str) -> None:
+        """Sync this credential to N8N in the background, see sync_oauth_credential_to_n8n."""
+        if not self.get_n8n_credential_types():
+            return
+        from standard_pipelines.celery.tasks import sync_oauth_credential_to_n8n
         try:
-            # Get client info for naming
-            client = Client.query.get(self.client_id)
-            if not client:
-                current_app.logger.error(f"Client {self.client_id} not found for N8N sync")
-                return False
-            
-            service_name = self.get_oauth_config().display_name if self.get_oauth_config() else self.__class__.__name__
-            
-            success = True
-            for n8n_type in n8n_types:
-                credential_name = f"{client.name} - {user_email} - {service_name}"
-                if not _sync_credential_to_n8n(self, n8n_type, credential_name):
-                    success = False
-            
-            return success
-            
+            sync_oauth_credential_to_n8n.delay(self.get_oauth_config().name, str(self.id), user_email)
         except Exception as e:
-            current_app.logger.error(f"Error syncing {self.__class__.__name__} to N8N: {e}")
-            return False
+            # The broker being down must not fail the OAuth flow itself
+            current_app.logger.error(f"Failed to queue N8N sync for {self.__class__.__name__} {self.id}: {e}")
     
     @classmethod
     def from_oauth_callback(cls, client_id, token: Dict[str, Any], user_info: Optional[Dict[str, Any]] = None) -> 'OAuthCredentialMixin':
@@ -255,6 +316,8 @@ def create_oauth_routes() -> Blueprint:
     @login_required
     def oauth_callback(provider):
         """Handle OAuth callback for any provider."""
+        from standard_pipelines.api.oauth_tokens import oauth_token_broker
+
         if provider not in _oauth_registry:
             return jsonify({'error': 'Invalid provider'}), 404
         
@@ -304,20 +367,24 @@ def create_oauth_routes() -> Blueprint:
                             setattr(existing, attr_name, user_info[info_key])
                 
                 db.session.commit()
+                api_manager_pool.invalidate(credential_cls, client.id)
+                oauth_token_broker.forget(credential_cls, existing.id)
+                oauth_token_broker.clear_grant_revoked(credential_cls, existing.id)
                 current_app.logger.info(f"Updated {provider} credentials for client: {client.name}")
                 
                 # Sync updated credentials to N8N
-                existing.sync_to_n8n(current_user.email)
+                existing.queue_n8n_sync(current_user.email)
                 
             else:
                 # Create new credentials
                 new_creds = credential_cls.from_oauth_callback(client.id, token, user_info)
                 db.session.add(new_creds)
                 db.session.commit()
+                api_manager_pool.invalidate(credential_cls, client.id)
                 current_app.logger.info(f"Created new {provider} credentials for client: {client.name}")
                 
                 # Sync new credentials to N8N
-                new_creds.sync_to_n8n(current_user.email)
+                new_creds.queue_n8n_sync(current_user.email)
             
             # Render success page
             return render_template('auth/oauth_success.html', service=config.display_name if config else provider)
@@ -333,82 +400,157 @@ def create_oauth_routes() -> Blueprint:
     return oauth_bp
 
 
-def _sync_credential_to_n8n(credential: OAuthCredentialMixin, n8n_type: str, credential_name: str) -> bool:
+# Connect and read timeouts for N8N API calls
+N8N_TIMEOUT = (5, 30)
+# Credentials per page when listing N8N credentials
+N8N_PAGE_SIZE = 100
+
+
+class N8NUnavailableError(Exception):
+    """N8N could not be reached or answered with a 429 or 5xx."""
+
+
+def _n8n_request(session, method: str, url: str, headers: Dict[str, str], **kwargs) -> requests.Response:
+    try:
+        response = session.request(method, url, headers=headers, timeout=N8N_TIMEOUT, **kwargs)
+    except requests.RequestException as e:
+        raise N8NUnavailableError(str(e)) from e
+    if response.status_code == 429 or response.status_code >= 500:
+        raise N8NUnavailableError(f"{response.status_code} - {response.text}")
+    return response
+
+
+def _find_n8n_credential_ids(session, n8n_endpoint: str, headers: Dict[str, str], credential_name: str, n8n_type: str) -> Optional[List[str]]:
+    """
+    Ids of the N8N credentials with this name and type, or None if this N8N
+    version cannot list credentials.
+    """
+    credential_ids = []
+    params: Dict[str, Any] = {'limit': N8N_PAGE_SIZE}
+    while True:
+        response = _n8n_request(session, 'GET', n8n_endpoint, headers, params=params)
+        if response.status_code != 200:
+            current_app.logger.warning(f"Could not list N8N credentials: {response.status_code} - {response.text}")
+            return None
+        payload = response.json()
+        credential_ids.extend(
+            str(existing['id']) for existing in payload.get('data') or []
+            if existing.get('name') == credential_name and existing.get('type') == n8n_type
+        )
+        if not payload.get('nextCursor'):
+            return credential_ids
+        params['cursor'] = payload['nextCursor']
+
+def _n8n_credential_data(credential: OAuthCredentialMixin, oauth_config: OAuthConfig, n8n_type: str, credential_name: str) -> Dict[str, Any]:
+    """Build the N8N credential payload for a single credential type."""
+    if n8n_type == 'microsoftOutlookOAuth2Api':
+        # Microsoft Outlook OAuth2 API expects specific format
+        return {
+            'name': credential_name,
+            'type': n8n_type,
+            'data': {
+                'clientId': current_app.config.get(oauth_config.client_id_env),
+                'clientSecret': current_app.config.get(oauth_config.client_secret_env),
+                'userPrincipalName': getattr(credential, 'user_principal_name', ''),
+            }
+        }
+
+    # Generic OAuth2 format for other services
+    credential_data = {
+        'name': credential_name,
+        'type': n8n_type,
+        'data': {
+            'clientId': current_app.config.get(oauth_config.client_id_env),
+            'clientSecret': current_app.config.get(oauth_config.client_secret_env),
+            'accessToken': credential.oauth_access_token,
+            'refreshToken': credential.oauth_refresh_token,
+        }
+    }
+
+    # Add expires information if available
+    if credential.oauth_token_expires_at:
+        credential_data['data']['expiresAt'] = credential.oauth_token_expires_at
+    return credential_data
+
+
+def _sync_credential_to_n8n(credential: OAuthCredentialMixin, n8n_types: List[str], credential_name: str) -> List[str]:
     """
-    Sync a single credential to N8N.
+    Sync a credential to N8N as each of the given credential types.
+    
+    Creating an N8N credential is not idempotent, and a POST that timed out
+    may still have gone through, so an existing credential with the same
+    name and type is updated instead; where N8N cannot update it in place,
+    it is deleted and created again.
     
     Args:
         credential: The OAuth credential instance
-        n8n_type: The N8N credential type (e.g., 'gmailOAuth2Api')
+        n8n_types: The N8N credential types (e.g., ['gmailOAuth2Api'])
         credential_name: The name to use in N8N
         
     Returns:
-        True if successful, False otherwise
+        The credential types that failed with a retriable error. Failures that
+        retrying cannot fix (bad configuration, rejected payloads) are logged
+        and not returned.
     """
-    try:
-        n8n_endpoint = current_app.config.get('N8N_ENDPOINT')
-        n8n_api_key = current_app.config.get('N8N_API_KEY')
-        
-        if not n8n_api_key or not n8n_endpoint:
-            current_app.logger.warning("N8N_API_KEY not configured, skipping N8N sync")
-            return False
-        
-        # Get OAuth config
-        oauth_config = credential.get_oauth_config()
-        if not oauth_config:
-            current_app.logger.error(f"No OAuth config found for {credential.__class__.__name__}")
-            return False
-        
-        # Prepare credential data for N8N based on credential type
-        if n8n_type == 'microsoftOutlookOAuth2Api':
-            # Microsoft Outlook OAuth2 API expects specific format
-            credential_data = {
-                'name': credential_name,
-                'type': n8n_type,
-                'data': {
-                    'clientId': current_app.config.get(oauth_config.client_id_env),
-                    'clientSecret': current_app.config.get(oauth_config.client_secret_env),
-                    'userPrincipalName': getattr(credential, 'user_principal_name', ''),
-                }
-            }
-        else:
-            # Generic OAuth2 format for other services
-            credential_data = {
-                'name': credential_name,
-                'type': n8n_type,
-                'data': {
-                    'clientId': current_app.config.get(oauth_config.client_id_env),
-                    'clientSecret': current_app.config.get(oauth_config.client_secret_env),
-                    'accessToken': credential.oauth_access_token,
-                    'refreshToken': credential.oauth_refresh_token,
-                }
-            }
-            
-            # Add expires information if available
-            if credential.oauth_token_expires_at:
-                credential_data['data']['expiresAt'] = credential.oauth_token_expires_at
-        
-        headers = {
-            'Content-Type': 'application/json',
-            'X-N8N-API-KEY': n8n_api_key
-        }
-        
-        response = requests.post(n8n_endpoint, json=credential_data, headers=headers)
+    n8n_endpoint = current_app.config.get('N8N_ENDPOINT')
+    n8n_api_key = current_app.config.get('N8N_API_KEY')
+    
+    if not n8n_api_key or not n8n_endpoint:
+        current_app.logger.warning("N8N_API_KEY not configured, skipping N8N sync")
+        return []
+    
+    # Get OAuth config
+    oauth_config = credential.get_oauth_config()
+    if not oauth_config:
+        current_app.logger.error(f"No OAuth config found for {credential.__class__.__name__}")
+        return []
+    
+    headers = {
+        'Content-Type': 'application/json',
+        'X-N8N-API-KEY': n8n_api_key
+    }
+    session = get_shared_session()
+    
+    retry_types = []
+    for n8n_type in n8n_types:
+        credential_data = _n8n_credential_data(credential, oauth_config, n8n_type, credential_name)
+        try:
+            response = _upsert_n8n_credential(session, n8n_endpoint, headers, credential_data)
+        except N8NUnavailableError as e:
+            current_app.logger.warning(f"N8N unavailable syncing {credential_name} as {n8n_type}: {e}")
+            retry_types.append(n8n_type)
+            continue
         
         if response.status_code in [200, 201]:
             current_app.logger.info(f"Successfully synced {credential_name} to N8N as {n8n_type}")
-            return True
         else:
             current_app.logger.error(f"Failed to sync to N8N: {response.status_code} - {response.text}")
-            return False
-            
-    except Exception as e:
-        current_app.logger.error(f"Error syncing credential to N8N: {e}")
-        return False
+    
+    return retry_types
+
+
+def _upsert_n8n_credential(session, n8n_endpoint: str, headers: Dict[str, str], credential_data: Dict[str, Any]) -> requests.Response:
+    """Update the N8N credential with this payload's name and type, creating it if there is none."""
+    existing_ids = _find_n8n_credential_ids(
+        session, n8n_endpoint, headers, credential_data['name'], credential_data['type']
+    ) or []
+    if existing_ids:
+        credential_url = f"{n8n_endpoint.rstrip('/')}/{existing_ids[0]}"
+        response = _n8n_request(session, 'PATCH', credential_url, headers, json=credential_data)
+        if response.status_code not in (404, 405):
+            return response
+        # This N8N version cannot update credentials, replace them instead
+        for credential_id in existing_ids:
+            response = _n8n_request(session, 'DELETE', f"{n8n_endpoint.rstrip('/')}/{credential_id}", headers)
+            if response.status_code not in (200, 204, 404):
+                return response
+    return _n8n_request(session, 'POST', n8n_endpoint, headers, json=credential_data)
 
 
 def get_oauth_services_status(client_id) -> Dict[str, Dict[str, Any]]:
     """Get the status of all OAuth services for a client."""
+    from standard_pipelines.api.oauth_tokens import oauth_token_broker
+
     services = {}
     
     for name, credential_cls in _oauth_registry.items():
@@ -424,12 +566,15 @@ def get_oauth_services_status(client_id) -> Dict[str, Dict[str, Any]]:
             current_app.config.get(client_secret_env)
         )
         
-        # Check if connected
-        connected = credential_cls.query.filter_by(client_id=client_id).first() is not None
+        # Check if connected, and whether the stored grant still works
+        credential = db.session.query(credential_cls.id).filter_by(client_id=client_id).first()
+        connected = credential is not None
+        needs_reauth = connected and oauth_token_broker.is_grant_revoked(credential_cls, credential.id)
         
         services[name] = {
             'enabled': enabled,
             'connected': connected,
+            'needs_reauth': needs_reauth,
             'icon': url_for('static', filename=config.icon_path),
             'description': config.description,
             'display_name': config.display_name
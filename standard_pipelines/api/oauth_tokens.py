@@ -0,0 +1,286 @@
+"""
+OAuth access-token broker.
+
+Managers ask the broker for an access token instead of running a refresh-token
+grant every time they are built. The broker hands out the token stored on the
+credential row while it is still valid, and refreshes it shortly before it
+expires. Refreshes are single-flight across workers through a Redis lock, and
+the new token is written back to ``oauth_access_token`` /
+``oauth_token_expires_at`` so every other process picks it up as well.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Tuple, Type
+
+from flask import current_app
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from standard_pipelines.api.oauth_system import OAuthCredentialMixin, _oauth_registry
+from standard_pipelines.data_flow.exceptions import OAuthRefreshError, OAuthGrantRevokedError
+from standard_pipelines.extensions import db
+
+CredentialKey = Tuple[str, str]
+
+
+class AccessToken(NamedTuple):
+    token: str
+    expires_at: int  # epoch seconds
+
+    def is_fresh(self, margin: int) -> bool:
+        return bool(self.token) and self.expires_at - margin > time.time()
+
+
+class OAuthTokenBroker:
+
+    # Refresh this many seconds before the provider's expiry
+    EXPIRY_MARGIN = 300
+    # Used when a provider does not return expires_in
+    DEFAULT_EXPIRES_IN = 3600
+    LOCK_TIMEOUT = 30
+    LOCK_WAIT = 20
+    # Concurrent refreshes across all providers during a sweep
+    SWEEP_WORKERS = 8
+    # Sweeps only refresh credentials handed out within this many seconds, so
+    # clients that stopped running flows are not refreshed forever
+    RECENT_USE_WINDOW = 24 * 3600
+    # Seconds between a process's writes of one credential's use marker
+    USE_MARK_INTERVAL = 300
+
+    def __init__(self) -> None:
+        self._tokens: Dict[CredentialKey, AccessToken] = {}
+        self._use_marked: Dict[CredentialKey, float] = {}
+        self._lock = threading.Lock()
+
+    def access_token(self, credential_cls: Type[OAuthCredentialMixin], credential_id) -> AccessToken:
+        """Return a valid access token for the credential row, refreshing it if needed."""
+        key = self._key(credential_cls, credential_id)
+        self._mark_used(key)
+        cached = self._tokens.get(key)
+        if cached is not None and cached.is_fresh(self.EXPIRY_MARGIN):
+            return cached
+        return self.refresh(credential_cls, credential_id)
+
+    def access_token_for(self, credentials: OAuthCredentialMixin) -> AccessToken:
+        """Like ``access_token`` but seeded from an already loaded credential row."""
+        self._remember(credentials)
+        return self.access_token(type(credentials), credentials.id)
+
+    def refresh(self, credential_cls: Type[OAuthCredentialMixin], credential_id, force: bool = False) -> AccessToken:
+        """
+        Refresh the credential's access token under the cross-worker lock.
+
+        Unless ``force`` is set, a token that another worker refreshed while we
+        were waiting for the lock is returned as is.
+        """
+        key = self._key(credential_cls, credential_id)
+        lock = self._redis_lock(key)
+        acquired = False
+        if lock is not None:
+            try:
+                acquired = lock.acquire()
+            except Exception as e:
+                current_app.logger.warning(f"Could not acquire token refresh lock for {key}: {e}")
+            if not acquired:
+                current_app.logger.warning(f"Timed out waiting for token refresh lock for {key}, refreshing anyway")
+
+        try:
+            # Use a private session so persisting the token never commits
+            # whatever the calling flow has pending in db.session.
+            with Session(db.engine) as session:
+                credentials = session.get(credential_cls, credential_id)
+                if credentials is None:
+                    raise OAuthRefreshError(f"{credential_cls.__name__} {credential_id} no longer exists")
+
+                stored = self._remember(credentials)
+                if not force and stored.is_fresh(self.EXPIRY_MARGIN):
+                    return stored
+
+                current_app.logger.info(f"Refreshing {key[0]} access token for credential {credential_id}")
+                try:
+                    payload = credentials.refresh_oauth_token()
+                except OAuthGrantRevokedError:
+                    self.mark_grant_revoked(credential_cls, credential_id)
+                    raise
+
+                expires_at = int(time.time()) + int(payload.get('expires_in') or self.DEFAULT_EXPIRES_IN)
+                credentials.oauth_access_token = payload['access_token']
+                credentials.oauth_token_expires_at = expires_at
+                if payload.get('refresh_token'):
+                    credentials.oauth_refresh_token = payload['refresh_token']
+                session.commit()
+
+                token = AccessToken(payload['access_token'], expires_at)
+                with self._lock:
+                    self._tokens[key] = token
+                self._update_identity_map(credential_cls, credential_id, payload, expires_at)
+                return token
+        finally:
+            if acquired:
+                try:
+                    lock.release()
+                except Exception as e:
+                    current_app.logger.warning(f"Failed to release token refresh lock for {key}: {e}")
+
+    def refresh_expiring(self, window: int) -> Dict[str, Dict[str, int]]:
+        """
+        Refresh every OAuth credential whose access token expires within
+        ``window`` seconds and that was used within RECENT_USE_WINDOW, so
+        flows start with a hot token. Idle credentials are refreshed on their
+        next use instead.
+
+        Refreshes run concurrently, but each provider is paced to its
+        ``OAuthConfig.max_refreshes_per_second``. Grants the provider rejects
+        are flagged (see ``is_grant_revoked``) and skipped by later sweeps.
+        Returns per-provider counts of refreshed, failed and revoked credentials.
+        """
+        deadline = int(time.time()) + window
+        scheduled: List[Tuple[float, Type[OAuthCredentialMixin], Any]] = []
+        for provider_name, credential_cls in _oauth_registry.items():
+            config = credential_cls.get_oauth_config()
+            rows = db.session.query(credential_cls.id).filter(
+                credential_cls.oauth_token_expires_at.isnot(None),
+                credential_cls.oauth_token_expires_at < deadline,
+            ).all()
+            due = [
+                row.id for row in rows
+                if self.was_recently_used(credential_cls, row.id) and not self.is_grant_revoked(credential_cls, row.id)
+            ]
+            # Spread each provider's refreshes out instead of bursting them
+            interval = 1.0 / config.max_refreshes_per_second
+            scheduled.extend((i * interval, credential_cls, credential_id) for i, credential_id in enumerate(due))
+
+        summary: Dict[str, Dict[str, int]] = {}
+        if not scheduled:
+            return summary
+
+        app = current_app._get_current_object()
+        started = time.monotonic()
+
+        def refresh_one(start_offset: float, credential_cls, credential_id) -> str:
+            time.sleep(max(0.0, start_offset - (time.monotonic() - started)))
+            with app.app_context():
+                try:
+                    self.refresh(credential_cls, credential_id)
+                    return 'refreshed'
+                except OAuthGrantRevokedError as e:
+                    app.logger.warning(f"OAuth grant revoked for {credential_cls.__name__} {credential_id}: {e}")
+                    return 'revoked'
+                except Exception as e:
+                    app.logger.error(f"Failed to pre-refresh {credential_cls.__name__} {credential_id}: {e}")
+                    return 'failed'
+
+        scheduled.sort(key=lambda item: item[0])
+        with ThreadPoolExecutor(max_workers=self.SWEEP_WORKERS) as executor:
+            futures = [
+                (credential_cls, executor.submit(refresh_one, offset, credential_cls, credential_id))
+                for offset, credential_cls, credential_id in scheduled
+            ]
+            for credential_cls, future in futures:
+                counts = summary.setdefault(credential_cls.get_oauth_config().name, {'refreshed': 0, 'failed': 0, 'revoked': 0})
+                counts[future.result()] += 1
+        return summary
+
+    def mark_grant_revoked(self, credential_cls: Type[OAuthCredentialMixin], credential_id) -> None:
+        self.forget(credential_cls, credential_id)
+        redis_client = getattr(current_app, 'redis_client', None)
+        if redis_client is None:
+            return
+        try:
+            redis_client.set(self._revoked_key(credential_cls, credential_id), int(time.time()))
+        except Exception as e:
+            current_app.logger.warning(f"Could not flag revoked grant for {credential_cls.__name__} {credential_id}: {e}")
+
+    def clear_grant_revoked(self, credential_cls: Type[OAuthCredentialMixin], credential_id) -> None:
+        redis_client = getattr(current_app, 'redis_client', None)
+        if redis_client is None:
+            return
+        try:
+            redis_client.delete(self._revoked_key(credential_cls, credential_id))
+        except Exception as e:
+            current_app.logger.warning(f"Could not clear revoked grant flag for {credential_cls.__name__} {credential_id}: {e}")
+
+    def is_grant_revoked(self, credential_cls: Type[OAuthCredentialMixin], credential_id) -> bool:
+        redis_client = getattr(current_app, 'redis_client', None)
+        if redis_client is None:
+            return False
+        try:
+            return bool(redis_client.exists(self._revoked_key(credential_cls, credential_id)))
+        except Exception:
+            return False
+
+    def was_recently_used(self, credential_cls: Type[OAuthCredentialMixin], credential_id) -> bool:
+        redis_client = getattr(current_app, 'redis_client', None)
+        if redis_client is None:
+            return True
+        try:
+            return bool(redis_client.exists(self._used_key(self._key(credential_cls, credential_id))))
+        except Exception:
+            return True
+
+    def _mark_used(self, key: CredentialKey) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._use_marked.get(key, float('-inf')) < self.USE_MARK_INTERVAL:
+                return
+            self._use_marked[key] = now
+        redis_client = getattr(current_app, 'redis_client', None)
+        if redis_client is None:
+            return
+        try:
+            redis_client.set(self._used_key(key), int(time.time()), ex=self.RECENT_USE_WINDOW)
+        except Exception as e:
+            current_app.logger.warning(f"Could not mark {key} as used: {e}")
+
+    def forget(self, credential_cls: Type[OAuthCredentialMixin], credential_id) -> None:
+        with self._lock:
+            self._tokens.pop(self._key(credential_cls, credential_id), None)
+
+    def _key(self, credential_cls: Type[OAuthCredentialMixin], credential_id) -> CredentialKey:
+        return (credential_cls.get_oauth_config().name, str(credential_id))
+
+    def _remember(self, credentials: OAuthCredentialMixin) -> AccessToken:
+        token = AccessToken(credentials.oauth_access_token or '', int(credentials.oauth_token_expires_at or 0))
+        if token.is_fresh(self.EXPIRY_MARGIN):
+            with self._lock:
+                self._tokens[self._key(type(credentials), credentials.id)] = token
+        return token
+
+    def _revoked_key(self, credential_cls: Type[OAuthCredentialMixin], credential_id) -> str:
+        provider_name, credential_id = self._key(credential_cls, credential_id)
+        return f"oauth-grant-revoked:{provider_name}:{credential_id}"
+
+    @staticmethod
+    def _used_key(key: CredentialKey) -> str:
+        return f"oauth-token-used:{key[0]}:{key[1]}"
+
+    def _redis_lock(self, key: CredentialKey):
+        redis_client = getattr(current_app, 'redis_client', None)
+        if redis_client is None:
+            return None
+        return redis_client.lock(
+            f"oauth-token-refresh:{key[0]}:{key[1]}",
+            timeout=self.LOCK_TIMEOUT,
+            blocking_timeout=self.LOCK_WAIT,
+        )
+
+    @staticmethod
+    def _update_identity_map(credential_cls, credential_id, payload: dict, expires_at: int) -> None:
+        # Keep an instance already loaded in the request's session in step with
+        # the database without marking it dirty.
+        instance = db.session.identity_map.get(db.session.identity_key(credential_cls, credential_id))
+        if instance is None:
+            return
+        try:
+            set_committed_value(instance, 'oauth_access_token', payload['access_token'])
+            set_committed_value(instance, 'oauth_token_expires_at', expires_at)
+            if payload.get('refresh_token'):
+                set_committed_value(instance, 'oauth_refresh_token', payload['refresh_token'])
+        except KeyError:
+            # Models that shadow the token columns with hybrids (Zoho) just reload them
+            db.session.expire(instance)
+
+
+oauth_token_broker = OAuthTokenBroker()
@@ -1,12 +1,14 @@
 from standard_pipelines.api.services import BaseAPIManager
+from standard_pipelines.api.rate_limit import RateLimitKey, credential_fingerprint
 from standard_pipelines.data_flow.exceptions import APIError
 
 
-from openai import OpenAI, OpenAIError
+from openai import OpenAI, OpenAIError, RateLimitError
 from openai.types.chat.chat_completion import ChatCompletion
 
 
 from abc import ABCMeta
+import typing as t
 
 
 class OpenAIAPIManager(BaseAPIManager, metaclass=ABCMeta):
@@ -15,20 +17,32 @@ class OpenAIAPIManager(BaseAPIManager, metaclass=ABCMeta):
         super().__init__(api_config)
         self.api_client = OpenAI(api_key=self.api_config["api_key"])
 
+    @classmethod
+    def from_credentials(cls, credentials) -> "OpenAIAPIManager":
+        return cls({"api_key": credentials.openai_api_key})
+
     @property
     def required_config(self) -> list[str]:
         return ["api_key"]
 
+    @property
+    def rate_limit_key(self) -> t.Optional[RateLimitKey]:
+        return ("openai", credential_fingerprint(self.api_config["api_key"]))
+
     def chat(self, prompt: str, model: str) -> ChatCompletion:
         if prompt is None or model is None:
             raise ValueError("Prompt and model cannot be None.")
         if not prompt.strip() or not model.strip():
             raise ValueError("Prompt and model cannot be empty strings.")
         try:
+            self.throttle()
             return self.api_client.chat.completions.create(
                 model=model,
                 messages=[{"role": "user", "content": prompt}],
             )
+        except RateLimitError as e:
+            self.observe_rate_limit(429, e.response.headers)
+            raise APIError(f"Error during OpenAI API call: {str(e)}") from e
         except OpenAIError as e:
             error_msg = f"Error during OpenAI API call: {str(e)}"
             raise APIError(error_msg) from e
\ No newline at end of file
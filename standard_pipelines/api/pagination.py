@@ -0,0 +1,63 @@
+"""
+Lazy pagination over list endpoints.
+
+List methods used to collect every page into one list before returning, so
+memory grew with the size of the portal or database and callers waited for
+the last page before seeing the first record. ``iter_pages`` and
+``paginate`` are generators over a ``fetch_page(cursor)`` callable instead:
+records are yielded page by page, and with ``prefetch`` the next page is
+requested in the background while the caller works through the current one.
+Only the page being consumed and the one in flight are held in memory.
+"""
+
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from flask import current_app, has_app_context
+
+RecordType = TypeVar('RecordType')
+
+# fetch_page(cursor) -> (records, next cursor or None on the last page)
+PageFetcher = Callable[[Optional[Any]], Tuple[Iterable[RecordType], Optional[Any]]]
+
+
+def iter_pages(fetch_page: PageFetcher, cursor: Optional[Any] = None, prefetch: bool = False) -> Iterator[List[RecordType]]:
+    """
+    Yield the records of each page, starting at ``cursor``, until
+    ``fetch_page`` returns no next cursor.
+
+    With ``prefetch`` the next page is fetched on a background thread, in the
+    caller's app context and context variables, while the current page is
+    being consumed. Closing the generator early drops the page in flight.
+    """
+    if not prefetch:
+        while True:
+            records, cursor = fetch_page(cursor)
+            yield list(records)
+            if not cursor:
+                return
+
+    app = current_app._get_current_object() if has_app_context() else None
+
+    def fetch(next_cursor):
+        if app is None:
+            return fetch_page(next_cursor)
+        with app.app_context():
+            return fetch_page(next_cursor)
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='paginate-prefetch')
+    try:
+        pending: Optional[Future] = executor.submit(contextvars.copy_context().run, fetch, cursor)
+        while pending is not None:
+            records, cursor = pending.result()
+            pending = executor.submit(contextvars.copy_context().run, fetch, cursor) if cursor else None
+            yield list(records)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def paginate(fetch_page: PageFetcher, cursor: Optional[Any] = None, prefetch: bool = False) -> Iterator[RecordType]:
+    """Yield every record of every page, see ``iter_pages``."""
+    for records in iter_pages(fetch_page, cursor, prefetch):
+        yield from records
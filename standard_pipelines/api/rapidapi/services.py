@@ -1,4 +1,6 @@
 from standard_pipelines.api.services import BaseManualAPIManager
+from standard_pipelines.api.rate_limit import RateLimitKey, credential_fingerprint
+from standard_pipelines.api.read_cache import read_cache
 from standard_pipelines.data_flow.exceptions import APIError
 from typing import Optional, Dict, Any, List
 from flask import current_app
@@ -8,10 +10,18 @@ import json
 
 class RapidAPIManager(BaseManualAPIManager):
     """Manager for RapidAPI services."""
+
+    # GET responses (mostly LinkedIn profiles) change rarely
+    GET_CACHE_TTL = 6 * 60 * 60
+    GET_CACHE_STALE_TTL = 24 * 60 * 60
     
     @property
     def required_config(self) -> list[str]:
         return ["rapidapi_key", "rapidapi_host"]
+
+    @property
+    def rate_limit_key(self) -> Optional[RateLimitKey]:
+        return ("rapidapi", credential_fingerprint(self.api_config['rapidapi_key']))
     
     def api_url(self, api_context: Optional[dict] = None) -> str:
         """Get the RapidAPI URL based on the context."""
@@ -36,7 +46,7 @@ class RapidAPIManager(BaseManualAPIManager):
             return api_context['params']
         return None
     
-    def make_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None, method: str = 'GET') -> Dict[str, Any]:
+    def make_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None, method: str = 'GET', bypass_cache: bool = False) -> Dict[str, Any]:
         """
         Make a request to a RapidAPI endpoint.
         
@@ -44,6 +54,7 @@ class RapidAPIManager(BaseManualAPIManager):
             endpoint: The endpoint path to append to the base URL
             params: Query parameters for the request
             method: HTTP method (GET, POST, etc.)
+            bypass_cache: Fetch GET responses live instead of from the read cache
             
         Returns:
             Dict[str, Any]: The JSON response as a dictionary
@@ -53,7 +64,21 @@ class RapidAPIManager(BaseManualAPIManager):
             'params': params,
             'method': method
         }
-        
+        if method.upper() != 'GET':
+            return self._request_json(api_context)
+
+        name = f"{RapidAPIManager.__qualname__}.make_request"
+        key = read_cache.make_key(name, self.cache_scope, (self.api_config['rapidapi_host'], endpoint, params))
+        return read_cache.load(
+            name,
+            key,
+            lambda: self._request_json(api_context),
+            ttl=self.GET_CACHE_TTL,
+            stale_ttl=self.GET_CACHE_STALE_TTL,
+            bypass=bypass_cache,
+        )
+
+    def _request_json(self, api_context: dict) -> Dict[str, Any]:
         try:
             response = self.get_response(api_context)
             return response.json()
@@ -0,0 +1,239 @@
+"""
+Token-bucket rate limiting shared across workers.
+
+Providers throttle per account, so each (provider, credential) pair gets one
+bucket in Redis that every web and Celery worker draws from before calling
+out. Buckets refill continuously at the provider's sustained rate up to its
+burst size. When a provider answers 429 anyway, its ``Retry-After`` blocks
+the bucket for everyone until it has passed, instead of each worker finding
+out on its own. Without Redis the limiter falls back to per-process buckets.
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from flask import current_app
+
+from standard_pipelines.data_flow.exceptions import RetriableAPIError
+
+RateLimitKey = Tuple[str, str]
+
+
+class RateLimit(NamedTuple):
+    rate: float  # tokens added per second
+    burst: int  # bucket capacity
+
+
+# Conservative defaults below each provider's documented per-account ceiling
+DEFAULT_RATE_LIMITS: Dict[str, RateLimit] = {
+    'hubspot': RateLimit(rate=10.0, burst=100),  # 100 requests / 10s
+    'sharpspring': RateLimit(rate=5.0, burst=10),
+    'zoho': RateLimit(rate=5.0, burst=20),
+    'rapidapi': RateLimit(rate=5.0, burst=5),
+    'openai': RateLimit(rate=8.0, burst=20),
+}
+
+# Returns the number of seconds to wait before retrying, "0" once a token was taken.
+_ACQUIRE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts', 'blocked_until')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+local blocked_until = tonumber(state[3]) or 0
+if blocked_until > now then
+    return tostring(blocked_until - now)
+end
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 60)
+return tostring(wait)
+"""
+
+_PENALIZE_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local blocked_until = now + tonumber(ARGV[1])
+local current = tonumber(redis.call('HGET', KEYS[1], 'blocked_until')) or 0
+if blocked_until > current then
+    redis.call('HSET', KEYS[1], 'tokens', '0', 'ts', tostring(blocked_until), 'blocked_until', tostring(blocked_until))
+    redis.call('EXPIRE', KEYS[1], math.ceil(tonumber(ARGV[1])) + 60)
+end
+return 1
+"""
+
+
+def credential_fingerprint(*secrets) -> str:
+    """Stable, non-reversible bucket id for credentials without a row id."""
+    return hashlib.sha256('\0'.join(str(secret) for secret in secrets).encode()).hexdigest()[:16]
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a ``Retry-After`` header given either in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class _LocalBucket:
+
+    def __init__(self, limit: RateLimit) -> None:
+        self.tokens = float(limit.burst)
+        self.ts = time.monotonic()
+        self.blocked_until = 0.0
+
+
+class RateLimiter:
+
+    # Longest a caller waits for a token before giving up with RetriableAPIError
+    MAX_WAIT = 30.0
+    # Used when a 429 carries no usable Retry-After
+    DEFAULT_RETRY_AFTER = 10.0
+
+    def __init__(self, limits: Optional[Dict[str, RateLimit]] = None) -> None:
+        self._limits = dict(DEFAULT_RATE_LIMITS if limits is None else limits)
+        self._local: Dict[RateLimitKey, _LocalBucket] = {}
+        self._lock = threading.Lock()
+        self._scripts: Dict[Tuple[int, str], tuple] = {}
+
+    def limit_for(self, provider: str) -> Optional[RateLimit]:
+        return self._limits.get(provider)
+
+    def acquire(self, provider: str, credential: str, max_wait: Optional[float] = None) -> float:
+        """
+        Block until a token is available for the bucket and take it.
+        Returns the time spent waiting.
+        """
+        max_wait = self.MAX_WAIT if max_wait is None else max_wait
+        waited = 0.0
+        while True:
+            wait = self._try_acquire(provider, credential)
+            if wait <= 0:
+                return waited
+            self._check_wait(provider, waited + wait, max_wait)
+            time.sleep(wait)
+            waited += wait
+
+    async def aacquire(self, provider: str, credential: str, max_wait: Optional[float] = None) -> float:
+        """
+        Async ``acquire`` that yields to the event loop while waiting. The
+        Redis round trips run in a worker thread so they never block the loop.
+        """
+        max_wait = self.MAX_WAIT if max_wait is None else max_wait
+        waited = 0.0
+        while True:
+            wait = await asyncio.to_thread(self._try_acquire, provider, credential)
+            if wait <= 0:
+                return waited
+            self._check_wait(provider, waited + wait, max_wait)
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def penalize(self, provider: str, credential: str, retry_after: Optional[float] = None) -> None:
+        """Empty the bucket and hold it shut for ``retry_after`` seconds."""
+        if self.limit_for(provider) is None:
+            return
+        retry_after = self.DEFAULT_RETRY_AFTER if retry_after is None else retry_after
+        current_app.logger.warning(f"{provider} rate limited, pausing its bucket for {retry_after:.1f}s")
+        redis_client = self._redis_client()
+        if redis_client is not None:
+            try:
+                self._script(redis_client, _PENALIZE_SCRIPT)(keys=[self._redis_key(provider, credential)], args=[retry_after])
+                return
+            except Exception as e:
+                current_app.logger.warning(f"Redis rate limiter unavailable, penalizing locally: {e}")
+        with self._lock:
+            bucket = self._local_bucket(provider, credential)
+            blocked_until = time.monotonic() + retry_after
+            if blocked_until > bucket.blocked_until:
+                bucket.tokens, bucket.ts, bucket.blocked_until = 0.0, blocked_until, blocked_until
+
+    def observe(self, provider: str, credential: str, status_code: int, headers) -> None:
+        """Feed a provider response back into the bucket."""
+        if status_code == 429:
+            self.penalize(provider, credential, parse_retry_after(headers.get('Retry-After')))
+
+    async def aobserve(self, provider: str, credential: str, status_code: int, headers) -> None:
+        """Async ``observe``, penalizing the bucket off the event loop."""
+        if status_code == 429:
+            await asyncio.to_thread(self.observe, provider, credential, status_code, headers)
+
+    def _try_acquire(self, provider: str, credential: str) -> float:
+        limit = self.limit_for(provider)
+        if limit is None:
+            return 0.0
+        redis_client = self._redis_client()
+        if redis_client is not None:
+            try:
+                script = self._script(redis_client, _ACQUIRE_SCRIPT)
+                return float(script(keys=[self._redis_key(provider, credential)], args=[limit.rate, limit.burst]))
+            except Exception as e:
+                current_app.logger.warning(f"Redis rate limiter unavailable, limiting locally: {e}")
+        return self._try_acquire_local(provider, credential, limit)
+
+    def _try_acquire_local(self, provider: str, credential: str, limit: RateLimit) -> float:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._local_bucket(provider, credential)
+            if bucket.blocked_until > now:
+                return bucket.blocked_until - now
+            bucket.tokens = min(limit.burst, bucket.tokens + max(0.0, now - bucket.ts) * limit.rate)
+            bucket.ts = now
+            if bucket.tokens >= 1:
+                bucket.tokens -= 1
+                return 0.0
+            return (1 - bucket.tokens) / limit.rate
+
+    def _local_bucket(self, provider: str, credential: str) -> _LocalBucket:
+        key = (provider, credential)
+        bucket = self._local.get(key)
+        if bucket is None:
+            bucket = self._local[key] = _LocalBucket(self._limits[provider])
+        return bucket
+
+    def _check_wait(self, provider: str, total_wait: float, max_wait: float) -> None:
+        if total_wait > max_wait:
+            raise RetriableAPIError(f"{provider} rate limit would delay the call by {total_wait:.1f}s")
+
+    def _script(self, redis_client, source: str):
+        # Registered scripts are bound to a client, cache them per client and source
+        cache_key = (id(redis_client), source)
+        with self._lock:
+            entry = self._scripts.get(cache_key)
+            if entry is None or entry[0] is not redis_client:
+                entry = self._scripts[cache_key] = (redis_client, redis_client.register_script(source))
+        return entry[1]
+
+    @staticmethod
+    def _redis_client():
+        return getattr(current_app, 'redis_client', None)
+
+    @staticmethod
+    def _redis_key(provider: str, credential: str) -> str:
+        return f"rate-limit:{provider}:{credential}"
+
+
+rate_limiter = RateLimiter()
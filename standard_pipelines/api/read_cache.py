@@ -0,0 +1,424 @@
+"""
+Read-through cache for idempotent API manager reads.
+
+Lookups such as owner directories, custom field ids and deal stages return
+the same data run after run, so managers can wrap them with ``cached_read``.
+Entries live in an in-process LRU and, when Redis is available and the value
+is JSON-serializable, in Redis as well so every worker shares them. Keys are
+scoped to the manager's credential (``BaseAPIManager.cache_scope``), so two
+accounts of the same provider never see each other's data.
+
+Each read has a ``ttl`` during which it is served from cache and an optional
+``stale_ttl`` after that during which the stale value is still served while a
+background thread refreshes it. Callers that need live data pass
+``bypass_cache=True`` or run inside ``read_cache.bypass()``; bypassed reads
+still refresh the cache with what they fetched.
+
+Reads declared ``invalidatable`` carry a generation counter kept in Redis.
+``invalidate`` bumps it, so every worker drops its in-process copy on the
+next lookup instead of serving it until the TTL runs out.
+"""
+
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from flask import current_app, has_app_context
+
+CacheScope = Tuple[str, str]
+
+_bypass: ContextVar[bool] = ContextVar('read_cache_bypass', default=False)
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    fresh_until: float  # epoch seconds
+    stale_until: float  # epoch seconds
+    # Invalidation generation the value was loaded under, None if not invalidatable
+    generation: Optional[int] = None
+
+
+class ReadCache:
+
+    DEFAULT_MAXSIZE = 1024
+    # How long one worker may hold the right to revalidate a stale entry
+    REFRESH_LOCK_TIMEOUT = 60
+    # Hit and miss counters are written to Redis at most this often
+    STATS_FLUSH_INTERVAL = 30
+
+    def __init__(self, maxsize: Optional[int] = None) -> None:
+        self._maxsize = maxsize
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._stats: Dict[str, Counter] = {}
+        self._unflushed_stats: Dict[str, Counter] = {}
+        self._stats_flushed_at = time.monotonic()
+        self._refreshing: set = set()
+        self._lock = threading.RLock()
+
+    @property
+    def maxsize(self) -> int:
+        if self._maxsize is not None:
+            return self._maxsize
+        return int(current_app.config.get('READ_CACHE_SIZE', self.DEFAULT_MAXSIZE))
+
+    @staticmethod
+    def make_key(name: str, scope: CacheScope, args: tuple = (), kwargs: Optional[dict] = None) -> str:
+        arguments = json.dumps([list(args), kwargs or {}], sort_keys=True, default=str)
+        digest = hashlib.sha256(arguments.encode()).hexdigest()[:16]
+        provider, credential = scope
+        return f"{name}|{provider}:{credential}|{digest}"
+
+    @contextmanager
+    def bypass(self):
+        """Skip cached values for every read made inside the block."""
+        token = _bypass.set(True)
+        try:
+            yield
+        finally:
+            _bypass.reset(token)
+
+    def load(
+        self,
+        name: str,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: float,
+        stale_ttl: float = 0,
+        cache_if: Optional[Callable[[Any], bool]] = None,
+        bypass: bool = False,
+        invalidatable: bool = False,
+    ) -> Any:
+        """
+        Return the cached value for ``key``, calling ``loader`` when it is
+        missing or expired. Only ``invalidatable`` reads are dropped across
+        workers by ``invalidate``; this costs one Redis read per lookup.
+        """
+        generation = self.generation(key) if invalidatable else None
+        if bypass or _bypass.get():
+            self._count(name, 'bypasses')
+            return self._load_and_store(key, loader, ttl, stale_ttl, cache_if, generation)
+
+        entry = self.lookup(key, generation)
+        now = time.time()
+        if entry is not None and entry.fresh_until > now:
+            self._count(name, 'hits')
+            return copy.deepcopy(entry.value)
+        if entry is not None and entry.stale_until > now:
+            self._count(name, 'stale_hits')
+            self._revalidate(key, loader, ttl, stale_ttl, cache_if, invalidatable)
+            return copy.deepcopy(entry.value)
+
+        self._count(name, 'misses')
+        return self._load_and_store(key, loader, ttl, stale_ttl, cache_if, generation)
+
+    def load_many(
+        self,
+        name: str,
+        keys: List[str],
+        loader: Callable[[List[int]], List[Any]],
+        ttl: float,
+        stale_ttl: float = 0,
+        cache_if: Optional[Callable[[Any], bool]] = None,
+        bypass: bool = False,
+    ) -> List[Any]:
+        """
+        ``load`` for several keys at once. ``loader`` receives the positions
+        of the keys that missed and returns their values in the same order,
+        so the misses can be fetched together.
+        """
+        bypassing = bypass or _bypass.get()
+        values: List[Any] = [None] * len(keys)
+        missing: List[int] = []
+        now = time.time()
+        for index, key in enumerate(keys):
+            entry = None if bypassing else self.lookup(key)
+            if entry is not None and entry.fresh_until > now:
+                self._count(name, 'hits')
+                values[index] = copy.deepcopy(entry.value)
+            elif entry is not None and entry.stale_until > now:
+                self._count(name, 'stale_hits')
+                self._revalidate(key, lambda index=index: loader([index])[0], ttl, stale_ttl, cache_if)
+                values[index] = copy.deepcopy(entry.value)
+            else:
+                self._count(name, 'bypasses' if bypassing else 'misses')
+                missing.append(index)
+
+        if missing:
+            for index, value in zip(missing, loader(missing)):
+                values[index] = value
+                if cache_if is None or cache_if(value):
+                    self.store(keys[index], copy.deepcopy(value), ttl, stale_ttl)
+        return values
+
+    def lookup(self, key: str, generation: Optional[int] = None) -> Optional[CacheEntry]:
+        """
+        The entry for ``key``, if any. With a ``generation``, entries loaded
+        under another generation count as missing.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.stale_until > now and self._current(entry, generation):
+                    self._entries.move_to_end(key)
+                    return entry
+                del self._entries[key]
+
+        redis_client = self._redis_client()
+        if redis_client is None:
+            return None
+        try:
+            raw = redis_client.get(self._redis_key(key))
+        except Exception as e:
+            current_app.logger.warning(f"Read cache could not reach Redis: {e}")
+            return None
+        if raw is None:
+            return None
+        entry = CacheEntry(*json.loads(raw))
+        if not self._current(entry, generation):
+            return None
+        self._store_local(key, entry)
+        return entry
+
+    def store(self, key: str, value: Any, ttl: float, stale_ttl: float = 0, generation: Optional[int] = None) -> None:
+        now = time.time()
+        entry = CacheEntry(value, now + ttl, now + ttl + stale_ttl, generation)
+        self._store_local(key, entry)
+
+        redis_client = self._redis_client()
+        if redis_client is None:
+            return
+        try:
+            # Values that are not JSON-serializable stay in this process only
+            raw = json.dumps(entry)
+        except (TypeError, ValueError):
+            return
+        try:
+            redis_client.set(self._redis_key(key), raw, ex=max(1, int(ttl + stale_ttl)))
+        except Exception as e:
+            current_app.logger.warning(f"Read cache could not write to Redis: {e}")
+
+    def invalidate(self, name: Optional[str] = None, scope: Optional[CacheScope] = None) -> None:
+        """Drop cached reads, optionally limited to one method and/or one credential."""
+        name_part = name if name is not None else '*'
+        scope_part = f"{scope[0]}:{scope[1]}" if scope is not None else '*'
+        with self._lock:
+            stale = [
+                key for key in self._entries
+                if self._matches(key, name, scope)
+            ]
+            for key in stale:
+                del self._entries[key]
+
+        redis_client = self._redis_client()
+        if redis_client is None:
+            return
+        try:
+            # Bump the generations first, so no worker re-stores an old value
+            # under the new one after the entries are gone
+            generation_keys = (
+                [self._generation_key(f"{name}|{scope_part}")] if name is not None and scope is not None
+                else list(redis_client.scan_iter(match=self._generation_key(f"{name_part}|{scope_part}")))
+            )
+            for generation_key in generation_keys:
+                redis_client.incr(generation_key)
+            keys = list(redis_client.scan_iter(match=self._redis_key(f"{name_part}|{scope_part}|*")))
+            if keys:
+                redis_client.delete(*keys)
+        except Exception as e:
+            current_app.logger.warning(f"Read cache could not invalidate Redis entries: {e}")
+
+    def generation(self, key: str) -> Optional[int]:
+        """
+        The invalidation generation of the method and credential of ``key``,
+        or None when it cannot be read (no Redis).
+        """
+        redis_client = self._redis_client()
+        if redis_client is None:
+            return None
+        generation_key = self._generation_key(key.rsplit('|', 1)[0])
+        try:
+            generation = redis_client.get(generation_key)
+            if generation is None:
+                # Created on first use so wildcard invalidations can find it
+                redis_client.set(generation_key, 0, nx=True)
+                generation = redis_client.get(generation_key)
+            return int(generation or 0)
+        except Exception as e:
+            current_app.logger.warning(f"Read cache could not read the generation of {key}: {e}")
+            return None
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit and miss counters per cached method, across all workers when Redis is available."""
+        self._flush_stats()
+        redis_client = self._redis_client()
+        if redis_client is not None:
+            try:
+                return {
+                    stats_key.split(':', 1)[1]: {field: int(count) for field, count in redis_client.hgetall(stats_key).items()}
+                    for stats_key in redis_client.scan_iter(match='read-cache-stats:*')
+                }
+            except Exception as e:
+                current_app.logger.warning(f"Read cache could not read stats from Redis: {e}")
+        with self._lock:
+            return {name: dict(counter) for name, counter in self._stats.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _load_and_store(self, key, loader, ttl, stale_ttl, cache_if, generation=None) -> Any:
+        # The generation is read before loading, so a value loaded across an
+        # invalidation is stored under the old generation and never served
+        value = loader()
+        if cache_if is None or cache_if(value):
+            self.store(key, copy.deepcopy(value), ttl, stale_ttl, generation)
+        return value
+
+    def _revalidate(self, key, loader, ttl, stale_ttl, cache_if, invalidatable=False) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        redis_client = self._redis_client()
+        if redis_client is not None:
+            try:
+                claimed = redis_client.set(f"read-cache-refresh:{key}", 1, nx=True, ex=self.REFRESH_LOCK_TIMEOUT)
+            except Exception:
+                claimed = True
+            if not claimed:
+                # Another worker is already refreshing this entry
+                with self._lock:
+                    self._refreshing.discard(key)
+                return
+
+        app = current_app._get_current_object()
+
+        def refresh():
+            with app.app_context():
+                try:
+                    generation = self.generation(key) if invalidatable else None
+                    self._load_and_store(key, loader, ttl, stale_ttl, cache_if, generation)
+                except Exception as e:
+                    app.logger.warning(f"Background refresh of cached read {key} failed: {e}")
+                finally:
+                    with self._lock:
+                        self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name='read-cache-refresh', daemon=True).start()
+
+    def _store_local(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _count(self, name: str, field: str) -> None:
+        with self._lock:
+            self._stats.setdefault(name, Counter())[field] += 1
+            self._unflushed_stats.setdefault(name, Counter())[field] += 1
+            due = time.monotonic() - self._stats_flushed_at >= self.STATS_FLUSH_INTERVAL
+        if due:
+            self._flush_stats()
+
+    def _flush_stats(self) -> None:
+        """Add the counts since the last flush to the shared counters in one round trip."""
+        with self._lock:
+            unflushed, self._unflushed_stats = self._unflushed_stats, {}
+            self._stats_flushed_at = time.monotonic()
+        redis_client = self._redis_client()
+        if redis_client is None or not unflushed:
+            return
+        try:
+            pipeline = redis_client.pipeline(transaction=False)
+            for name, counter in unflushed.items():
+                for field, count in counter.items():
+                    pipeline.hincrby(f"read-cache-stats:{name}", field, count)
+            pipeline.execute()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _current(entry: CacheEntry, generation: Optional[int]) -> bool:
+        return generation is None or entry.generation == generation
+
+    @staticmethod
+    def _matches(key: str, name: Optional[str], scope: Optional[CacheScope]) -> bool:
+        key_name, key_scope, _ = key.split('|', 2)
+        if name is not None and key_name != name:
+            return False
+        return scope is None or key_scope == f"{scope[0]}:{scope[1]}"
+
+    @staticmethod
+    def _redis_client():
+        if not has_app_context():
+            return None
+        if str(current_app.config.get('READ_CACHE_REDIS', True)).lower() not in ('true', '1', 'yes', 'on'):
+            return None
+        return getattr(current_app, 'redis_client', None)
+
+    @staticmethod
+    def _redis_key(key: str) -> str:
+        return f"read-cache:{key}"
+
+    @staticmethod
+    def _generation_key(name_and_scope: str) -> str:
+        return f"read-cache-generation:{name_and_scope}"
+
+
+read_cache = ReadCache()
+
+
+def cached_read(
+    ttl: float,
+    stale_ttl: float = 0,
+    cache_if: Optional[Callable[[Any], bool]] = None,
+    invalidatable: bool = False,
+):
+    """
+    Cache an API manager read method per credential.
+
+    The wrapped method accepts an extra ``bypass_cache`` keyword. Managers
+    whose ``cache_scope`` is None are never cached. Set ``invalidatable`` for
+    reads that are passed to ``read_cache.invalidate`` after a write.
+    """
+    def decorator(method):
+        name = method.__qualname__
+
+        @wraps(method)
+        def wrapper(self, *args, bypass_cache: bool = False, **kwargs):
+            scope = self.cache_scope
+            if scope is None:
+                return method(self, *args, **kwargs)
+            return read_cache.load(
+                name,
+                read_cache.make_key(name, scope, args, kwargs),
+                lambda: method(self, *args, **kwargs),
+                ttl,
+                stale_ttl,
+                cache_if=cache_if,
+                bypass=bypass_cache,
+                invalidatable=invalidatable,
+            )
+
+        def is_cached(self, *args, **kwargs) -> bool:
+            """Whether a call with these arguments would be answered from cache."""
+            scope = self.cache_scope
+            if scope is None or _bypass.get():
+                return False
+            key = read_cache.make_key(name, scope, args, kwargs)
+            return read_cache.lookup(key, read_cache.generation(key) if invalidatable else None) is not None
+
+        wrapper.cache_name = name
+        wrapper.is_cached = is_cached
+        return wrapper
+    return decorator
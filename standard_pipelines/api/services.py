@@ -1,13 +1,20 @@
 from abc import ABCMeta, abstractmethod
 
+from standard_pipelines.api.async_http import async_http_engine
+from standard_pipelines.api.circuit_breaker import CircuitKey, circuit_breaker
+from standard_pipelines.api.http_session import get_shared_session
+from standard_pipelines.api.rate_limit import RateLimitKey, rate_limiter
+from standard_pipelines.api.read_cache import CacheScope
 from standard_pipelines.data_flow.exceptions import APIError, RetriableAPIError
 
 from flask import current_app
 from requests.auth import AuthBase
 from enum import Enum
 from functools import cached_property
+import asyncio
+import httpx
 import requests
-from typing import Optional
+from typing import Iterable, Optional
 import backoff
 
 class BaseAPIManager(metaclass=ABCMeta):
@@ -30,6 +37,53 @@ class BaseAPIManager(metaclass=ABCMeta):
     def required_config(self) -> list[str]:
         pass
 
+    @property
+    def rate_limit_key(self) -> Optional[RateLimitKey]:
+        """
+        The (provider, credential) bucket this manager draws from before each
+        call, or None to leave its calls unthrottled.
+        """
+        return None
+
+    @property
+    def cache_scope(self) -> Optional[CacheScope]:
+        """
+        Scope of ``cached_read`` entries, so reads are never shared between
+        credentials. Defaults to the rate limit bucket, which already
+        identifies the provider account; None disables caching.
+        """
+        return self.rate_limit_key
+
+    def circuit_key(self, endpoint_class: str = "default") -> Optional[CircuitKey]:
+        """
+        The circuit breaker guarding calls of ``endpoint_class``. Breakers are
+        per provider rather than per credential, since outages are too.
+        """
+        key = self.rate_limit_key
+        if key is None:
+            return None
+        return (key[0], endpoint_class)
+
+    def throttle(self) -> None:
+        key = self.rate_limit_key
+        if key is not None:
+            rate_limiter.acquire(*key)
+
+    async def athrottle(self) -> None:
+        key = self.rate_limit_key
+        if key is not None:
+            await rate_limiter.aacquire(*key)
+
+    def observe_rate_limit(self, status_code: int, headers) -> None:
+        key = self.rate_limit_key
+        if key is not None:
+            rate_limiter.observe(*key, status_code, headers)
+
+    async def aobserve_rate_limit(self, status_code: int, headers) -> None:
+        key = self.rate_limit_key
+        if key is not None:
+            await rate_limiter.aobserve(*key, status_code, headers)
+
 
 # TODO: clunky abstraction, works for now and not a priority, but this smells
 class BaseManualAPIManager(BaseAPIManager, metaclass=ABCMeta):
@@ -43,10 +97,13 @@ class BaseManualAPIManager(BaseAPIManager, metaclass=ABCMeta):
         DATA = "data"
 
     @cached_property
-    def _requests_session(self):
-        session = requests.Session()
-        session.auth = self.authenticator()
-        return session
+    def _authenticator(self) -> AuthBase:
+        return self.authenticator()
+
+    @property
+    def _requests_session(self) -> requests.Session:
+        # Shared by all managers so connections stay warm; auth is per request
+        return get_shared_session()
 
     @property
     def payload_type(self) -> PayloadType:
@@ -116,6 +173,21 @@ class BaseManualAPIManager(BaseAPIManager, metaclass=ABCMeta):
         if status_code >= 400:
             raise APIError(f"Client Error: {error_msg}")
 
+    def endpoint_class(self, api_context: Optional[dict] = None) -> str:
+        """Groups calls that share a circuit breaker, see ``circuit_key``."""
+        return "default"
+
+    def prepare_request(self, api_context: Optional[dict] = None) -> requests.PreparedRequest:
+        request = requests.Request(
+            method=self.https_method,
+            url=self.api_url(api_context),
+            params=self.https_parameters(api_context),
+            headers=self.https_headers(api_context),
+            auth=self._authenticator,
+            **{self.payload_type.value: self.https_payload(api_context)},
+        )
+        return self._requests_session.prepare_request(request)
+
     @backoff.on_exception(
         backoff.expo,
         (
@@ -126,16 +198,54 @@ class BaseManualAPIManager(BaseAPIManager, metaclass=ABCMeta):
         max_tries=5,
     )
     def get_response(self, api_context: Optional[dict] = None):
-        request = requests.Request(
-            method=self.https_method,
-            url=self.api_url(api_context),
-            params=self.https_parameters(api_context),
-            headers=self.https_headers(api_context),
-            **{self.payload_type.value: self.https_payload(api_context)},
-        )
-        response = self._requests_session.send(
-            request=self._requests_session.prepare_request(request),
-            timeout=self.timeout,
-        )
+        prepared = self.prepare_request(api_context)
+        circuit = self.circuit_key(self.endpoint_class(api_context))
+        circuit_breaker.before_call(circuit)
+        self.throttle()
+        with circuit_breaker.recording_failures(circuit):
+            response = self._requests_session.send(
+                request=prepared,
+                timeout=self.timeout,
+            )
+        circuit_breaker.record_result(circuit, response.status_code)
+        self.observe_rate_limit(response.status_code, response.headers)
+        self.validate_response(response)
+        return response
+
+    @backoff.on_exception(
+        backoff.expo,
+        (
+            RetriableAPIError,
+            httpx.TransportError,
+        ),
+        max_tries=5,
+    )
+    async def aget_response(self, api_context: Optional[dict] = None) -> httpx.Response:
+        """
+        Async counterpart of ``get_response`` on the shared pooled client.
+
+        The request is built by the same hooks and checked by the same
+        ``validate_response``, so subclasses need no changes to use it.
+        """
+        prepared = self.prepare_request(api_context)
+        circuit = self.circuit_key(self.endpoint_class(api_context))
+        await circuit_breaker.abefore_call(circuit)
+        await self.athrottle()
+        async with circuit_breaker.arecording_failures(circuit):
+            response = await async_http_engine.send(prepared, self.timeout)
+        await circuit_breaker.arecord_result(circuit, response.status_code)
+        await self.aobserve_rate_limit(response.status_code, response.headers)
         self.validate_response(response)
-        return response
\ No newline at end of file
+        return response
+
+    def get_responses(self, api_contexts: Iterable[Optional[dict]]) -> list:
+        """
+        Fetch several responses concurrently from synchronous code.
+
+        Responses are returned in the order of ``api_contexts``; the first
+        failed call raises, as it would with sequential ``get_response`` calls.
+        """
+        async def gather():
+            return await asyncio.gather(*(self.aget_response(api_context) for api_context in api_contexts))
+
+        return list(async_http_engine.run(gather()))
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""
+Local index of SharpSpring leads for contact matching.
+
+Matching a caller against SharpSpring used to mean one API search per phone
+and email format, or paging through recent leads and scanning them in Python.
+The index keeps every client's leads in Postgres under keyed hashes of their
+normalized phone, email and name, refreshed by a delta sync on SharpSpring's
+update timestamps, so resolving a contact is an indexed query and no contact
+details are stored. Matches are still
+confirmed against SharpSpring by id, which also returns the current
+transcript; a miss falls back to the API searches, since leads created since
+the last sync are not indexed yet.
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from flask import current_app
+from sqlalchemy import func, or_
+from sqlalchemy.dialects.postgresql import insert
+
+from standard_pipelines.api.sharpspring.models import SharpSpringCredentials, SharpSpringLead
+from standard_pipelines.api.sharpspring.services import SharpSpringAPIManager
+from standard_pipelines.data_flow.exceptions import APIError
+from standard_pipelines.database.models import lookup_digest
+from standard_pipelines.extensions import db
+
+# Re-read this much before the newest indexed update, in case of clock skew
+# or leads updated while the previous sync was paging
+SYNC_OVERLAP = timedelta(minutes=10)
+# Where the first sync of a client starts
+FULL_SYNC_START = datetime(2000, 1, 1)
+# Seconds one worker may hold a client's sync before another may start it
+SYNC_LOCK_TIMEOUT = 3600
+
+
+def normalize_phone(phone_number: Optional[str]) -> Optional[str]:
+    digits = re.sub(r"\D", "", phone_number or "")
+    return digits if 7 <= len(digits) <= 15 else None
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    email = (email or "").strip().lower()
+    return email or None
+
+
+def normalize_name(name: Optional[str]) -> Optional[str]:
+    name = re.sub(r"\s+", " ", (name or "").strip().lower())
+    return name or None
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S") if value else None
+    except ValueError:
+        return None
+
+
+def _lead_row(client_id, lead: dict) -> dict:
+    full_name = f"{lead.get('firstName') or ''} {lead.get('lastName') or ''}"
+    return {
+        "client_id": client_id,
+        "lead_id": str(lead["id"]),
+        "email_key": lookup_digest(client_id, normalize_email(lead.get("emailAddress"))),
+        "phone_key": lookup_digest(client_id, normalize_phone(lead.get("phoneNumber"))),
+        "mobile_phone_key": lookup_digest(client_id, normalize_phone(lead.get("mobilePhoneNumber"))),
+        "name_key": lookup_digest(client_id, normalize_name(full_name)),
+        "lead_updated_at": _parse_timestamp(lead.get("updateTimestamp")),
+    }
+
+
+def _upsert(rows: list[dict]) -> None:
+    # A lead updated while we page can show up twice, and Postgres refuses
+    # to update the same row twice in one statement
+    rows = list({row["lead_id"]: row for row in rows}.values())
+    statement = insert(SharpSpringLead).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=["client_id", "lead_id"],
+        set_={
+            "email_key": statement.excluded.email_key,
+            "phone_key": statement.excluded.phone_key,
+            "mobile_phone_key": statement.excluded.mobile_phone_key,
+            "name_key": statement.excluded.name_key,
+            "lead_updated_at": statement.excluded.lead_updated_at,
+            "modified_at": func.now(),
+        },
+    )
+    db.session.execute(statement)
+    db.session.commit()
+
+
+def sync_leads(client_id, manager: SharpSpringAPIManager) -> int:
+    """
+    Pull every lead updated since the newest one in the client's index and
+    upsert it. The first sync of a client indexes all of its leads.
+    Returns the number of leads written.
+    """
+    newest = db.session.query(func.max(SharpSpringLead.lead_updated_at)).filter(
+        SharpSpringLead.client_id == client_id
+    ).scalar()
+    since = newest - SYNC_OVERLAP if newest else FULL_SYNC_START
+    until = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    synced = 0
+    offset = 0
+    while offset is not None:
+        page = manager.get_leads_updated_since(since, until, offset)
+        if "error" in page:
+            raise APIError(f"Failed to sync SharpSpring leads: {page['error']}")
+        rows = [_lead_row(client_id, lead) for lead in page["leads"] if lead.get("id")]
+        if rows:
+            _upsert(rows)
+            synced += len(rows)
+        offset = page["next_offset"]
+    return synced
+
+
+def sync_client_leads(client_id) -> int:
+    """Sync one client's index unless another worker is already doing so."""
+    credentials = SharpSpringCredentials.query.filter_by(client_id=client_id).first()
+    if credentials is None:
+        current_app.logger.warning(f"No SharpSpring credentials for client {client_id}, skipping lead sync")
+        return 0
+
+    lock_key = f"sharpspring-lead-sync:{client_id}"
+    redis_client = getattr(current_app, 'redis_client', None)
+    if redis_client is not None:
+        try:
+            if not redis_client.set(lock_key, 1, nx=True, ex=SYNC_LOCK_TIMEOUT):
+                current_app.logger.debug(f"SharpSpring lead sync for client {client_id} already running")
+                return 0
+        except Exception as e:
+            current_app.logger.warning(f"Could not take SharpSpring lead sync lock, syncing anyway: {e}")
+            redis_client = None
+
+    try:
+        synced = sync_leads(client_id, SharpSpringAPIManager.from_credentials(credentials))
+        current_app.logger.info(f"Synced {synced} SharpSpring leads for client {client_id}")
+        return synced
+    finally:
+        if redis_client is not None:
+            try:
+                redis_client.delete(lock_key)
+            except Exception:
+                pass
+
+
+def find_lead_id(client_id, phone_number: str = "", email: Optional[str] = None, name: Optional[str] = None) -> Optional[str]:
+    """
+    Look a contact up in the index in the same priority as
+    ``SharpSpringAPIManager.get_contact``: email, then phone. A name is only
+    used as a last resort, and only when exactly one lead carries it.
+    """
+    query = SharpSpringLead.query.filter(SharpSpringLead.client_id == client_id).order_by(
+        SharpSpringLead.lead_updated_at.desc().nulls_last()
+    )
+
+    email_key = lookup_digest(client_id, normalize_email(email))
+    if email_key:
+        lead = query.filter(SharpSpringLead.email_key == email_key).first()
+        if lead is not None:
+            return lead.lead_id
+
+    phone_key = lookup_digest(client_id, normalize_phone(phone_number))
+    if phone_key:
+        lead = query.filter(or_(SharpSpringLead.phone_key == phone_key, SharpSpringLead.mobile_phone_key == phone_key)).first()
+        if lead is not None:
+            return lead.lead_id
+
+    name_key = lookup_digest(client_id, normalize_name(name))
+    if name_key:
+        leads = query.filter(SharpSpringLead.name_key == name_key).limit(2).all()
+        if len(leads) == 1:
+            return leads[0].lead_id
+
+    return None
+
+
+def record_lead(client_id, lead_id: str, full_name: str = None, email: str = None, phone_number: str = None) -> None:
+    """Index a lead we just created, so the next call matches it before the next sync."""
+    _upsert([{
+        "client_id": client_id,
+        "lead_id": str(lead_id),
+        "email_key": lookup_digest(client_id, normalize_email(email)),
+        "phone_key": lookup_digest(client_id, normalize_phone(phone_number)),
+        "mobile_phone_key": None,
+        "name_key": lookup_digest(client_id, normalize_name(full_name)),
+        # Left empty so the delta sync does not skip past leads it has not seen
+        "lead_updated_at": None,
+    }])
+
+
+def forget_lead(client_id, lead_id: str) -> None:
+    """Drop a lead that no longer exists in SharpSpring."""
+    SharpSpringLead.query.filter_by(client_id=client_id, lead_id=str(lead_id)).delete()
+    db.session.commit()
@@ -1,7 +1,10 @@
 from standard_pipelines.auth.models import BaseCredentials
-from sqlalchemy import String
+from standard_pipelines.database.models import BaseMixin
+from sqlalchemy import DateTime, ForeignKey, Index, String, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from typing import Optional
 
 
 class SharpSpringCredentials(BaseCredentials):
@@ -15,4 +18,33 @@ class SharpSpringCredentials(BaseCredentials):
         self.client_id = client_id
         self.account_id = account_id
         self.secret_key = secret_key
-        super().__init__(**kwargs)
\ No newline at end of file
+        super().__init__(**kwargs)
+
+
+class SharpSpringLead(BaseMixin):
+    """
+    Local index entry for a SharpSpring lead, holding keyed hashes of the
+    normalized keys contacts are matched on. Kept up to date by a delta sync
+    on the lead's update timestamp.
+    """
+    __tablename__ = 'sharpspring_lead'
+
+    client_id: Mapped[UUID] = mapped_column(UUID, ForeignKey('client.id', ondelete='CASCADE'), nullable=False)
+    lead_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    email_key: Mapped[Optional[str]] = mapped_column(String(64))
+    phone_key: Mapped[Optional[str]] = mapped_column(String(64))
+    mobile_phone_key: Mapped[Optional[str]] = mapped_column(String(64))
+    name_key: Mapped[Optional[str]] = mapped_column(String(64))
+    lead_updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
+    __table_args__ = (
+        UniqueConstraint('client_id', 'lead_id'),
+        Index('ix_sharpspring_lead_client_email', 'client_id', 'email_key'),
+        Index('ix_sharpspring_lead_client_phone', 'client_id', 'phone_key'),
+        Index('ix_sharpspring_lead_client_mobile_phone', 'client_id', 'mobile_phone_key'),
+        Index('ix_sharpspring_lead_client_name', 'client_id', 'name_key'),
+        Index('ix_sharpspring_lead_client_updated', 'client_id', 'lead_updated_at'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<SharpSpringLead {self.lead_id}>"
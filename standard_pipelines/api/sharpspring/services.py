@@ -1,7 +1,17 @@
 from flask import current_app
 from standard_pipelines.api.services import BaseAPIManager
-from requests.exceptions import HTTPError, RequestException, JSONDecodeError
-import requests
+from standard_pipelines.api.async_http import async_http_engine
+from standard_pipelines.data_flow.exceptions import CircuitOpenError
+from standard_pipelines.api.circuit_breaker import circuit_breaker
+from standard_pipelines.api.http_session import get_shared_session
+from standard_pipelines.api.rate_limit import RateLimitKey
+from standard_pipelines.api.read_cache import cached_read, read_cache
+from requests import PreparedRequest, Request
+from requests.exceptions import HTTPError, RequestException
+import asyncio
+import copy
+import httpx
+import json
 import uuid
 from datetime import datetime, timedelta, timezone
 from dateutil.relativedelta import relativedelta
@@ -9,6 +19,11 @@ import re  # Used for phone number formatting and other string manipulations
 
 class SharpSpringAPIManager(BaseAPIManager):
     MAX_QUERIES = 500
+    LEAD_INDEX_FIELDS = ["id", "firstName", "lastName", "phoneNumber", "mobilePhoneNumber", "emailAddress", "updateTimestamp"]
+    # Account metadata (custom fields, deal stages, owners) is cached per
+    # account_id across workers; it is served stale for a day while refreshing
+    METADATA_CACHE_TTL = 3600
+    METADATA_CACHE_STALE_TTL = 86400
 
     def __init__(self, api_config: dict) -> None:
         super().__init__(api_config)
@@ -18,11 +33,24 @@ class SharpSpringAPIManager(BaseAPIManager):
             "secretKey": self.api_config["secret_key"]
         }
         self.gathered_data = {}
+        # Read results fetched ahead by `prefetch`, keyed by `_call_key`
+        self._prefetched = {}
+
+    @classmethod
+    def from_credentials(cls, credentials) -> "SharpSpringAPIManager":
+        return cls({
+            "account_id": credentials.account_id,
+            "secret_key": credentials.secret_key
+        })
 
     @property
     def required_config(self) -> list[str]:
         return ['account_id', 'secret_key']
 
+    @property
+    def rate_limit_key(self) -> RateLimitKey:
+        return ('sharpspring', str(self.api_config["account_id"]))
+
     #=============================== API functions ========================================#
     #====== Opportunity functions ======#
     def create_opportunity(self, owner_email: str, client_name: str, contact_id: str) -> dict:
@@ -127,6 +155,7 @@ class SharpSpringAPIManager(BaseAPIManager):
             return {'error': 'An unexpected error occurred while getting opportunity id'}
         
     #====== Contact functions ======# 
+    @cached_read(ttl=METADATA_CACHE_TTL, stale_ttl=METADATA_CACHE_STALE_TTL, cache_if=lambda result: "error" not in result)
     def get_account_owner_id(self, email: str) -> dict:
         try:
             param_check_response = self._check_for_required_params([("email", email, str)])
@@ -138,10 +167,7 @@ class SharpSpringAPIManager(BaseAPIManager):
             if existing_data:
                 return {"owner_id": existing_data}
             
-            params = {
-                "where": {"isActive":1, "emailAddress": email},  
-                "limit": 1
-            }
+            params = self._owner_profile_params(email)
             result = self._make_api_call("getUserProfiles", params)
             if "error" in result:
                 return result
@@ -270,11 +296,7 @@ class SharpSpringAPIManager(BaseAPIManager):
             # First priority: Search by email (if provided)
             if email and email.strip():
                 current_app.logger.debug(f"Searching for contact by email: {email}")
-                params = {
-                    "where": {"emailAddress": email.strip().lower()},
-                    "limit": 1,
-                    "fields": ["id", "firstName", "lastName", "phoneNumber", "emailAddress", system_name]
-                }
+                params = self._lead_search_params({"emailAddress": email.strip().lower()}, system_name)
 
                 result = self._make_api_call("getLeads", params)
                 if "error" not in result:
@@ -292,11 +314,7 @@ class SharpSpringAPIManager(BaseAPIManager):
                 formatted_phone = re.sub(r"\D", "", phone_number)
                 if formatted_phone:
                     current_app.logger.debug(f"Searching for contact by phone: {formatted_phone}")
-                    params = {
-                        "where": {"phoneNumber": formatted_phone},
-                        "limit": 1,
-                        "fields": ["id", "firstName", "lastName", "phoneNumber", "emailAddress", system_name]
-                    }
+                    params = self._lead_search_params({"phoneNumber": formatted_phone}, system_name)
 
                     result = self._make_api_call("getLeads", params)
                     if "error" not in result:
@@ -316,6 +334,79 @@ class SharpSpringAPIManager(BaseAPIManager):
             current_app.logger.exception(f"An unexpected error occurred while getting contact: {e}")
             return {'error': f'An unexpected error occurred while getting contact: {e}'}
         
+    def get_contact_by_id(self, contact_id: str) -> dict:
+        """
+        Gets a contact and its transcript by SharpSpring lead id.
+
+        Args:
+            contact_id (str): The SharpSpring lead id
+
+        Returns:
+            dict: The contact id and transcript, both None if the lead no longer exists, or an error message
+        """
+        try:
+            param_check_response = self._check_for_required_params([("contact_id", contact_id, str)])
+            if "error" in param_check_response:
+                current_app.logger.error(f"Invalid parameters for get_contact_by_id: {param_check_response['error']}")
+                return param_check_response
+
+            transcript_field_name = self.get_transcript_field()
+            if "error" in transcript_field_name:
+                return transcript_field_name
+
+            system_name = transcript_field_name.get("system_name")
+            result = self._make_api_call("getLeads", self._lead_search_params({"id": contact_id}, system_name))
+            if "error" in result:
+                return result
+
+            leads = result.get("result", {}).get("lead", [])
+            if not leads:
+                return {"contact_id": None, "transcript": None}
+
+            return {"contact_id": leads[0].get("id"), "transcript": leads[0].get(system_name)}
+
+        except Exception as e:
+            current_app.logger.exception(f"An unexpected error occurred while getting contact by id: {e}")
+            return {'error': f'An unexpected error occurred while getting contact by id: {e}'}
+
+    def get_leads_updated_since(self, since: datetime, until: datetime, offset: int = 0) -> dict:
+        """
+        Gets one page of leads created or updated in a time range, for syncing the local lead index.
+
+        Args:
+            since (datetime): Start of the range (UTC)
+            until (datetime): End of the range (UTC), fixed across pages so paging stays stable
+            offset (int, optional): Offset of the page to fetch
+
+        Returns:
+            dict: The leads on the page and the offset of the next page (None on the last page), or an error message
+        """
+        try:
+            param_check_response = self._check_for_required_params([("since", since, datetime), ("until", until, datetime), ("offset", offset, int)], positive_only=True)
+            if "error" in param_check_response:
+                current_app.logger.error(f"Invalid parameters for get_leads_updated_since: {param_check_response['error']}")
+                return param_check_response
+
+            params = {
+                "startDate": since.strftime("%Y-%m-%d %H:%M:%S"),
+                "endDate": until.strftime("%Y-%m-%d %H:%M:%S"),
+                "timestamp": "update",
+                "limit": self.MAX_QUERIES,
+                "offset": offset,
+                "fields": self.LEAD_INDEX_FIELDS
+            }
+            result = self._make_api_call("getLeadsDateRange", params)
+            if "error" in result:
+                return result
+
+            leads = result.get("result", {}).get("lead", [])
+            next_offset = offset + self.MAX_QUERIES if len(leads) >= self.MAX_QUERIES else None
+            return {"leads": leads, "next_offset": next_offset}
+
+        except Exception as e:
+            current_app.logger.exception(f"An unexpected error occurred while getting updated leads: {e}")
+            return {'error': f'An unexpected error occurred while getting updated leads: {e}'}
+
     def create_contact(self, full_name: str, email: str, phone_number: str, owner_id: str) -> dict:
         try:
             param_check_response = self._check_for_required_params([("full_name", full_name, str), ("email", email, str), ("phone_number", phone_number, str), ("owner_id", owner_id, str)])
@@ -392,6 +483,13 @@ class SharpSpringAPIManager(BaseAPIManager):
             return {'error': f'An unexpected error occurred while updating contact transcript: {e}'}
 
     #====== Field functions ======#
+    # A missing field is not cached, so the field created right after the lookup is picked up
+    @cached_read(
+        ttl=METADATA_CACHE_TTL,
+        stale_ttl=METADATA_CACHE_STALE_TTL,
+        cache_if=lambda result: "error" not in result and bool(result.get("field_id")),
+        invalidatable=True,
+    )
     def get_transcript_field(self) -> dict:
         try:
             # Check if we already have the system_name cached
@@ -406,7 +504,7 @@ class SharpSpringAPIManager(BaseAPIManager):
                 }
 
             # Otherwise, look up the field from SharpSpring
-            params = {"where": {"label": "Call Transcripts"}}
+            params = self._transcript_field_params()
             result = self._make_api_call("getFields", params)
             if "error" in result:
                 return result
@@ -465,6 +563,11 @@ class SharpSpringAPIManager(BaseAPIManager):
             creates_list = result.get("result", {}).get("creates", []) 
             if not creates_list:
                 return {"error": "No transcript field created"}
+
+            # Every worker must look the new field up again to learn its system name
+            self.gathered_data.pop("field_id", None)
+            self.gathered_data.pop("system_name", None)
+            read_cache.invalidate(SharpSpringAPIManager.get_transcript_field.cache_name, self.cache_scope)
             
             created_id = creates_list[0].get("id")
             return {"field_id": created_id}
@@ -474,6 +577,7 @@ class SharpSpringAPIManager(BaseAPIManager):
             return {'error': 'An unexpected error occurred while creating transcript field'}
         
     #====== Deal functions ======#
+    @cached_read(ttl=METADATA_CACHE_TTL, stale_ttl=METADATA_CACHE_STALE_TTL, cache_if=lambda result: "error" not in result)
     def get_first_deal_stage_id(self) -> dict:
         try:
             existing_data = self.gathered_data.get("first_deal_stage_id")
@@ -508,32 +612,132 @@ class SharpSpringAPIManager(BaseAPIManager):
             current_app.logger.exception(f"Unexpected error retrieving deal stages: {e}")
             return {'error': f'Unexpected error retrieving deal stages: {e}'}
 
+    #====== Batched calls ======#
+    def make_api_calls(self, calls: list[tuple[str, dict]]) -> list[dict]:
+        """
+        Sends several API calls at once and returns what `_make_api_call` would
+        have returned for each, in the same order.
+
+        SharpSpring does not accept JSON-RPC batch arrays, so the calls are
+        pipelined concurrently over the shared async client instead, and each
+        response is matched back to its call by the JSON-RPC id.
+
+        Args:
+            calls (list[tuple[str, dict]]): (method, params) pairs
+
+        Returns:
+            list[dict]: One result or error dictionary per call
+        """
+        if not calls:
+            return []
+
+        async def send_all():
+            return await asyncio.gather(*(self._amake_api_call(method, params) for method, params in calls))
+
+        try:
+            return async_http_engine.run(send_all())
+        except Exception as e:
+            current_app.logger.exception(f"Unexpected error sending batched calls: {e}")
+            return [{'error': f'Unexpected error in {method}'} for method, _ in calls]
+
+    def prefetch(self, calls: list[tuple[str, dict]]) -> None:
+        """
+        Sends independent read calls concurrently ahead of the methods that
+        need them. Until the next write, `_make_api_call` answers identical
+        reads from these results instead of calling out again.
+        """
+        pending = {}
+        for method, params in calls:
+            key = self._call_key(method, params)
+            if key not in self._prefetched:
+                pending[key] = (method, params)
+
+        pending_calls = list(pending.values())
+        for key, result in zip(pending, self.make_api_calls(pending_calls)):
+            if "error" not in result:
+                self._prefetched[key] = result
+
+    def prefetch_contact_lookups(self, owner_email: str, phone_number: str = "", email: str = None) -> None:
+        """
+        Fetches the reads a transcript sync starts with in two concurrent round
+        trips: the owner profile and transcript field first, then the lead
+        searches by email and phone, which need the field's system name.
+        `get_account_owner_id`, `get_transcript_field` and `get_contact` then
+        use these results.
+
+        Args:
+            owner_email (str): The email of the SharpSpring user owning the call
+            phone_number (str, optional): The contact phone number
+            email (str, optional): The contact email
+        """
+        first_round = []
+        if owner_email and not self.gathered_data.get("owner_id") and not SharpSpringAPIManager.get_account_owner_id.is_cached(self, owner_email):
+            first_round.append(("getUserProfiles", self._owner_profile_params(owner_email)))
+        if not SharpSpringAPIManager.get_transcript_field.is_cached(self):
+            first_round.append(("getFields", self._transcript_field_params()))
+        self.prefetch(first_round)
+
+        transcript_field = self.get_transcript_field()
+        if "error" in transcript_field:
+            return
+        system_name = transcript_field.get("system_name")
+
+        second_round = []
+        if email and email.strip():
+            second_round.append(("getLeads", self._lead_search_params({"emailAddress": email.strip().lower()}, system_name)))
+        formatted_phone = re.sub(r"\D", "", phone_number or "")
+        if formatted_phone:
+            second_round.append(("getLeads", self._lead_search_params({"phoneNumber": formatted_phone}, system_name)))
+        self.prefetch(second_round)
+
     #================================= Helper functions ========================================#
+    def _owner_profile_params(self, email: str) -> dict:
+        return {
+            "where": {"isActive":1, "emailAddress": email},  
+            "limit": 1
+        }
+
+    def _lead_search_params(self, where: dict, system_name: str) -> dict:
+        return {
+            "where": where,
+            "limit": 1,
+            "fields": ["id", "firstName", "lastName", "phoneNumber", "emailAddress", system_name]
+        }
+
+    def _transcript_field_params(self) -> dict:
+        return {"where": {"label": "Call Transcripts"}}
+
     def _make_api_call(self, method: str, params: dict) -> dict:
         try:
             param_check_response = self._check_for_required_params([("method", method, str), ("params", params, dict)])
             if "error" in param_check_response:
                 current_app.logger.error(f"Invalid parameters for _make_api_call: {param_check_response['error']}")
                 return param_check_response
+
+            if self._is_read(method):
+                prefetched = self._prefetched.get(self._call_key(method, params))
+                if prefetched is not None:
+                    return copy.deepcopy(prefetched)
+            else:
+                # Anything read ahead may be out of date once we write
+                self._prefetched.clear()
             
-            data = {"method": method, "params": params, "id": str(uuid.uuid4())}
-            response = requests.post(
-                self.api_endpoint, 
-                json=data, 
-                params=self.query_params, 
-                headers={"Content-Type": "application/json"},
-                timeout=30
-            )
+            request_id = str(uuid.uuid4())
+            # Reads and writes fail independently often enough to break separately
+            circuit = self.circuit_key("read" if self._is_read(method) else "write")
+            circuit_breaker.before_call(circuit)
+            self.throttle()
+            with circuit_breaker.recording_failures(circuit):
+                response = get_shared_session().send(self._prepare_rpc(method, params, request_id), timeout=30)
+            circuit_breaker.record_result(circuit, response.status_code)
+            self.observe_rate_limit(response.status_code, response.headers)
             response.raise_for_status()
 
-            try:
-                result = response.json()
-            except JSONDecodeError as e:
-                current_app.logger.error(f"JSON decode error in {method}: {e}")
-                return {'error': f'JSON decode error in {method}: {e}'}
-
-            return self._check_for_errors(result)
+            return self._parse_rpc_response(method, response, request_id)
 
+        except CircuitOpenError as e:
+            current_app.logger.warning(f"Skipping {method}: {e}")
+            return {'error': str(e)}
         except HTTPError as e:
             current_app.logger.error(f"HTTP error in {method}: {e}")
             return {'error': f'HTTP error in {method}: {e}'}
@@ -543,6 +747,71 @@ class SharpSpringAPIManager(BaseAPIManager):
         except Exception as e:
             current_app.logger.exception(f"Unexpected error in {method}: {e}")
             return {'error': f'Unexpected error in {method}'}
+
+    async def _amake_api_call(self, method: str, params: dict) -> dict:
+        try:
+            param_check_response = self._check_for_required_params([("method", method, str), ("params", params, dict)])
+            if "error" in param_check_response:
+                current_app.logger.error(f"Invalid parameters for _amake_api_call: {param_check_response['error']}")
+                return param_check_response
+
+            request_id = str(uuid.uuid4())
+            circuit = self.circuit_key("read" if self._is_read(method) else "write")
+            await circuit_breaker.abefore_call(circuit)
+            await self.athrottle()
+            async with circuit_breaker.arecording_failures(circuit):
+                response = await async_http_engine.send(self._prepare_rpc(method, params, request_id), 30)
+            await circuit_breaker.arecord_result(circuit, response.status_code)
+            await self.aobserve_rate_limit(response.status_code, response.headers)
+            if response.status_code >= 400:
+                current_app.logger.error(f"HTTP error in {method}: {response.status_code} {response.reason_phrase}")
+                return {'error': f'HTTP error in {method}: {response.status_code} {response.reason_phrase}'}
+
+            return self._parse_rpc_response(method, response, request_id)
+
+        except CircuitOpenError as e:
+            current_app.logger.warning(f"Skipping {method}: {e}")
+            return {'error': str(e)}
+        except httpx.TransportError as e:
+            current_app.logger.error(f"Request error in {method}: {e}")
+            return {'error': 'Network error while communicating with API'}
+        except Exception as e:
+            current_app.logger.exception(f"Unexpected error in {method}: {e}")
+            return {'error': f'Unexpected error in {method}'}
+
+    def _prepare_rpc(self, method: str, params: dict, request_id: str) -> PreparedRequest:
+        data = {"method": method, "params": params, "id": request_id}
+        request = Request(
+            "POST",
+            self.api_endpoint,
+            json=data,
+            params=self.query_params,
+            headers={"Content-Type": "application/json"}
+        )
+        return get_shared_session().prepare_request(request)
+
+    def _parse_rpc_response(self, method: str, response, request_id: str) -> dict:
+        # Works for both requests and httpx responses
+        try:
+            result = response.json()
+        except ValueError as e:
+            current_app.logger.error(f"JSON decode error in {method}: {e}")
+            return {'error': f'JSON decode error in {method}: {e}'}
+
+        # Responses are matched to their call by the JSON-RPC id
+        if isinstance(result, dict) and result.get("id") not in (None, request_id):
+            current_app.logger.error(f"Response to {method} carries id {result.get('id')}, expected {request_id}")
+            return {'error': f'Mismatched response id in {method}'}
+
+        return self._check_for_errors(result)
+
+    @staticmethod
+    def _is_read(method: str) -> bool:
+        return method.startswith("get")
+
+    @staticmethod
+    def _call_key(method: str, params: dict) -> str:
+        return json.dumps([method, params], sort_keys=True, default=str)
         
     def _check_for_required_params(self, params: list[tuple[str, any, type]], positive_only: bool = False) -> dict:
         for param_name, param_value, expected_type in params:
@@ -1,10 +1,13 @@
-from sqlalchemy import String, Integer
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, ForeignKey, Index, String, Integer, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.ext.hybrid import hybrid_property
 
 from standard_pipelines.api.oauth_system import OAuthCredentialMixin, OAuthConfig
-from standard_pipelines.database.models import unencrypted_mapped_column
+from standard_pipelines.database.models import BaseMixin, unencrypted_mapped_column
 
 
 class ZohoCredentials(OAuthCredentialMixin):
@@ -62,6 +65,7 @@ class ZohoCredentials(OAuthCredentialMixin):
                 'ZohoCRM.users.ALL',
                 'ZohoCRM.settings.ALL',
                 'ZohoCRM.modules.ALL',
+                'ZohoCRM.coql.READ',
                 'ZohoSearch.securesearch.READ',
                 'ZohoCRM.org.ALL'
             ],
@@ -86,4 +90,35 @@ class ZohoCredentials(OAuthCredentialMixin):
             instance.oauth_expires_at = token['expires_at']
             instance.oauth_token_expires_at = token['expires_at']
         
-        return instance
\ No newline at end of file
+        return instance
+
+
+class ZohoIndexedRecord(BaseMixin):
+    """
+    Local index entry for a Zoho lead or contact, holding keyed hashes of the
+    normalized keys callers are matched on; the record itself is fetched from
+    Zoho on a match. Kept up to date by a delta sync on the record's modified
+    time.
+    """
+    __tablename__ = 'zoho_indexed_record'
+
+    client_id: Mapped[UUID] = mapped_column(UUID, ForeignKey('client.id', ondelete='CASCADE'), nullable=False)
+    module: Mapped[str] = mapped_column(String(32), nullable=False)
+    record_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    email_key: Mapped[Optional[str]] = mapped_column(String(64))
+    phone_key: Mapped[Optional[str]] = mapped_column(String(64))
+    mobile_phone_key: Mapped[Optional[str]] = mapped_column(String(64))
+    name_key: Mapped[Optional[str]] = mapped_column(String(64))
+    record_modified_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
+    __table_args__ = (
+        UniqueConstraint('client_id', 'module', 'record_id'),
+        Index('ix_zoho_indexed_record_client_email', 'client_id', 'email_key'),
+        Index('ix_zoho_indexed_record_client_phone', 'client_id', 'phone_key'),
+        Index('ix_zoho_indexed_record_client_mobile_phone', 'client_id', 'mobile_phone_key'),
+        Index('ix_zoho_indexed_record_client_name', 'client_id', 'name_key'),
+        Index('ix_zoho_indexed_record_client_modified', 'client_id', 'module', 'record_modified_at'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<ZohoIndexedRecord {self.module} {self.record_id}>"
\ No newline at end of file
@@ -0,0 +1,243 @@
+"""
+Local index of Zoho leads and contacts for caller matching.
+
+Every Dialpad call used to search Zoho live for the caller's phone and email,
+spending API credits on lookups that return the same records call after
+call. The index mirrors each client's Leads and Contacts in Postgres under
+keyed hashes of their normalized email, E.164 phone and name, refreshed by a
+delta sync on Zoho's modified times and deleted records, so no contact
+details are stored. Resolving a caller is then an indexed query followed by
+a fetch of the one matching record; a miss falls back to the live search,
+since records created since the last sync are not indexed yet.
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from flask import current_app
+from sqlalchemy import func, or_
+from sqlalchemy.dialects.postgresql import insert
+
+from standard_pipelines.api.pagination import iter_pages
+from standard_pipelines.api.zoho.models import ZohoCredentials, ZohoIndexedRecord
+from standard_pipelines.api.zoho.services import ZohoAPIManager
+from standard_pipelines.database.models import lookup_digest
+from standard_pipelines.extensions import db
+
+# Modules mirrored, in the order a caller is matched against them
+INDEXED_MODULES = ("Leads", "Contacts")
+INDEXED_FIELDS = ["First_Name", "Last_Name", "Email", "Phone", "Mobile"]
+# Modules whose records Zoho converts into others; the modified and deleted
+# listings leave converted records out, so they are purged separately
+CONVERTIBLE_MODULES = ("Leads",)
+# Re-read this much before the newest indexed change, in case of clock skew
+# or records modified while the previous sync was paging
+SYNC_OVERLAP = timedelta(minutes=10)
+# Seconds one worker may hold a client's sync before another may start it
+SYNC_LOCK_TIMEOUT = 3600
+# Country code assumed for national numbers without one
+DEFAULT_COUNTRY_CODE = "1"
+
+
+def normalize_phone(phone_number: Optional[str]) -> Optional[str]:
+    """E.164 form of a phone number, national numbers taken as DEFAULT_COUNTRY_CODE."""
+    phone_number = (phone_number or "").strip()
+    digits = re.sub(r"\D", "", phone_number)
+    if phone_number.startswith("00"):
+        digits = digits[2:]
+    elif not phone_number.startswith("+") and len(digits) == 10:
+        digits = DEFAULT_COUNTRY_CODE + digits
+    return f"+{digits}" if 8 <= len(digits) <= 15 else None
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    email = (email or "").strip().lower()
+    return email or None
+
+
+def normalize_name(name: Optional[str]) -> Optional[str]:
+    name = re.sub(r"\s+", " ", (name or "").strip().lower())
+    return name or None
+
+
+def _parse_modified_time(value: Optional[str]) -> Optional[datetime]:
+    try:
+        modified_time = datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+    if modified_time is not None and modified_time.tzinfo is not None:
+        modified_time = modified_time.astimezone(timezone.utc).replace(tzinfo=None)
+    return modified_time
+
+
+def _record_row(client_id, module: str, record: dict) -> dict:
+    full_name = f"{record.get('First_Name') or ''} {record.get('Last_Name') or ''}"
+    return {
+        "client_id": client_id,
+        "module": module,
+        "record_id": str(record["id"]),
+        "email_key": lookup_digest(client_id, normalize_email(record.get("Email"))),
+        "phone_key": lookup_digest(client_id, normalize_phone(record.get("Phone"))),
+        "mobile_phone_key": lookup_digest(client_id, normalize_phone(record.get("Mobile"))),
+        "name_key": lookup_digest(client_id, normalize_name(full_name)),
+        "record_modified_at": _parse_modified_time(record.get("Modified_Time")),
+    }
+
+
+def _upsert(rows: list[dict]) -> None:
+    # A record modified while we page can show up twice, and Postgres refuses
+    # to update the same row twice in one statement
+    rows = list({(row["module"], row["record_id"]): row for row in rows}.values())
+    statement = insert(ZohoIndexedRecord).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=["client_id", "module", "record_id"],
+        set_={
+            column: getattr(statement.excluded, column)
+            for column in ("email_key", "phone_key", "mobile_phone_key", "name_key", "record_modified_at")
+        } | {"modified_at": func.now()},
+    )
+    db.session.execute(statement)
+    db.session.commit()
+
+
+def sync_module(client_id, manager: ZohoAPIManager, module: str) -> int:
+    """
+    Pull every record of the module modified since the newest one in the
+    client's index and upsert it, then drop the records deleted or converted
+    since. The first sync of a client indexes all of the module's records.
+    Returns the number of records written.
+    """
+    newest = db.session.query(func.max(ZohoIndexedRecord.record_modified_at)).filter(
+        ZohoIndexedRecord.client_id == client_id,
+        ZohoIndexedRecord.module == module,
+    ).scalar()
+    since = newest - SYNC_OVERLAP if newest else None
+
+    def fetch_page(page_token: Optional[str]):
+        page = manager.get_records_modified_since(module, INDEXED_FIELDS, since, page_token)
+        return page["records"], page["next_page_token"]
+
+    synced = 0
+    # The next page downloads while this one is written
+    for records in iter_pages(fetch_page, prefetch=True):
+        rows = [_record_row(client_id, module, record) for record in records if record.get("id")]
+        if rows:
+            _upsert(rows)
+            synced += len(rows)
+
+    if since is not None:
+        page_number = 1
+        while True:
+            deleted = manager.get_deleted_record_ids(module, since, page_number)
+            if deleted["record_ids"]:
+                forget_records(client_id, module, deleted["record_ids"])
+            if not deleted["more_records"]:
+                break
+            page_number += 1
+
+    if since is not None and module in CONVERTIBLE_MODULES:
+        # Converting a lead modifies it, so the converted listing since the
+        # last sync holds every lead converted since
+        def fetch_converted_page(page_token: Optional[str]):
+            page = manager.get_records_modified_since(module, [], since, page_token, converted=True)
+            return page["records"], page["next_page_token"]
+
+        for records in iter_pages(fetch_converted_page):
+            record_ids = [str(record["id"]) for record in records if record.get("id")]
+            if record_ids:
+                forget_records(client_id, module, record_ids)
+    return synced
+
+
+def sync_client_records(client_id) -> int:
+    """Sync one client's index unless another worker is already doing so."""
+    credentials = ZohoCredentials.query.filter_by(client_id=client_id).first()
+    if credentials is None:
+        current_app.logger.warning(f"No Zoho credentials for client {client_id}, skipping record sync")
+        return 0
+
+    lock_key = f"zoho-record-sync:{client_id}"
+    redis_client = getattr(current_app, 'redis_client', None)
+    if redis_client is not None:
+        try:
+            if not redis_client.set(lock_key, 1, nx=True, ex=SYNC_LOCK_TIMEOUT):
+                current_app.logger.debug(f"Zoho record sync for client {client_id} already running")
+                return 0
+        except Exception as e:
+            current_app.logger.warning(f"Could not take Zoho record sync lock, syncing anyway: {e}")
+            redis_client = None
+
+    try:
+        manager = ZohoAPIManager(credentials)
+        synced = sum(sync_module(client_id, manager, module) for module in INDEXED_MODULES)
+        current_app.logger.info(f"Synced {synced} Zoho records for client {client_id}")
+        return synced
+    finally:
+        if redis_client is not None:
+            try:
+                redis_client.delete(lock_key)
+            except Exception:
+                pass
+
+
+def find_record(client_id, phone_number: Optional[str] = None, email: Optional[str] = None, name: Optional[str] = None) -> Optional[tuple[str, str]]:
+    """
+    Look a caller up in the index with the priorities of the live search:
+    leads before contacts, and within a module email, then phone, then the
+    full name. A name alone only matches when exactly one record carries it.
+
+    Returns the record's id and module, or None.
+    """
+    email_key = lookup_digest(client_id, normalize_email(email))
+    phone_key = lookup_digest(client_id, normalize_phone(phone_number))
+    name_key = lookup_digest(client_id, normalize_name(name))
+    conditions = []
+    if email_key:
+        conditions.append(ZohoIndexedRecord.email_key == email_key)
+    if phone_key:
+        conditions.append(ZohoIndexedRecord.phone_key == phone_key)
+        conditions.append(ZohoIndexedRecord.mobile_phone_key == phone_key)
+    if name_key:
+        conditions.append(ZohoIndexedRecord.name_key == name_key)
+    if not conditions:
+        return None
+
+    candidates = ZohoIndexedRecord.query.filter(
+        ZohoIndexedRecord.client_id == client_id,
+        or_(*conditions),
+    ).order_by(ZohoIndexedRecord.record_modified_at.desc().nulls_last()).limit(50).all()
+
+    def rank(entry: ZohoIndexedRecord) -> tuple[int, int]:
+        if email_key and entry.email_key == email_key:
+            strength = 0
+        elif phone_key and phone_key in (entry.phone_key, entry.mobile_phone_key):
+            strength = 1
+        else:
+            strength = 2
+        return INDEXED_MODULES.index(entry.module), strength
+
+    if sum(1 for entry in candidates if rank(entry)[1] == 2) > 1:
+        candidates = [entry for entry in candidates if rank(entry)[1] < 2]
+    if not candidates:
+        return None
+    best = min(candidates, key=rank)
+    return best.record_id, best.module
+
+
+def record_created(client_id, module: str, record: dict) -> None:
+    """Index a record we just created, so the next call matches it before the next sync."""
+    row = _record_row(client_id, module, record)
+    # Left empty so the delta sync does not skip past records it has not seen
+    row["record_modified_at"] = None
+    _upsert([row])
+
+
+def forget_records(client_id, module: str, record_ids: list[str]) -> None:
+    """Drop records that no longer exist in Zoho."""
+    ZohoIndexedRecord.query.filter(
+        ZohoIndexedRecord.client_id == client_id,
+        ZohoIndexedRecord.module == module,
+        ZohoIndexedRecord.record_id.in_([str(record_id) for record_id in record_ids]),
+    ).delete(synchronize_session=False)
+    db.session.commit()
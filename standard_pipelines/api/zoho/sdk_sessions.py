@@ -0,0 +1,142 @@
+"""
+Per-client Zoho CRM SDK sessions.
+
+The Zoho SDK keeps its configuration in ``Initializer``: a process-wide
+default plus a per-thread override installed by ``Initializer.switch_user``.
+Running ``Initializer.initialize`` for every manager rebuilt the SDK on each
+flow run and swapped the default context out from under other threads.
+Instead the SDK is initialized once per process, one ``OAuthToken`` is kept
+per credential, and managers activate their credential on the calling thread
+before each call, which only switches the thread's context when it last
+served another client.
+
+Access tokens come from the OAuth token broker, which refreshes them once
+across workers and writes them back to ``ZohoCredentials``. Tokens the SDK
+ends up refreshing on its own are written back through the token store.
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional
+
+from flask import current_app
+from sqlalchemy.orm import Session
+
+from zohocrmsdk.src.com.zoho.crm.api import Initializer
+from zohocrmsdk.src.com.zoho.crm.api.dc import USDataCenter
+from zohocrmsdk.src.com.zoho.api.authenticator import OAuthToken
+from zohocrmsdk.src.com.zoho.api.authenticator.store import TokenStore
+
+from standard_pipelines.api.oauth_tokens import oauth_token_broker
+from standard_pipelines.api.zoho.models import ZohoCredentials
+from standard_pipelines.extensions import db
+
+
+class ZohoCredentialsTokenStore(TokenStore):
+    """SDK token store backed by ``ZohoCredentials`` rows instead of a file."""
+
+    def __init__(self, sessions: 'ZohoSDKSessions') -> None:
+        self._sessions = sessions
+
+    def find_token(self, token: OAuthToken) -> Optional[OAuthToken]:
+        credentials_id = self._sessions.credentials_id_for(token)
+        if credentials_id is None:
+            return None
+        access_token = oauth_token_broker.access_token(ZohoCredentials, credentials_id)
+        token.set_access_token(access_token.token)
+        # The SDK compares this to the current time in milliseconds, it is an expiry time
+        token.set_expires_in(str(access_token.expires_at * 1000))
+        return token
+
+    def find_token_by_id(self, id) -> Optional[OAuthToken]:
+        return None
+
+    def save_token(self, token: OAuthToken) -> None:
+        credentials_id = self._sessions.credentials_id_for(token)
+        if credentials_id is None or not token.get_access_token():
+            return
+        expires_at_ms = int(token.get_expires_in() or 0)
+        with Session(db.engine) as session:
+            credentials = session.get(ZohoCredentials, credentials_id)
+            if credentials is None:
+                return
+            credentials.oauth_access_token = token.get_access_token()
+            credentials.oauth_token_expires_at = expires_at_ms // 1000
+            credentials.oauth_expires_at = expires_at_ms
+            session.commit()
+        oauth_token_broker.forget(ZohoCredentials, credentials_id)
+        current_app.logger.info(f"Stored Zoho access token refreshed by the SDK for credential {credentials_id}")
+
+    def delete_token(self, id) -> None:
+        # Credentials are removed through the app, never by the SDK
+        pass
+
+    def get_tokens(self) -> List[OAuthToken]:
+        return []
+
+    def delete_tokens(self) -> None:
+        pass
+
+
+class ZohoSDKSessions:
+
+    def __init__(self) -> None:
+        self._tokens: Dict[str, OAuthToken] = {}
+        self._credentials_ids: Dict[str, str] = {}
+        self._initialized_pid: Optional[int] = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def register(self, credentials: ZohoCredentials) -> None:
+        """Build the SDK token of an already loaded credential row, unless it exists."""
+        credentials_id = str(credentials.id)
+        with self._lock:
+            token = self._tokens.get(credentials_id)
+            if token is not None and token.get_refresh_token() == credentials.oauth_refresh_token:
+                return
+        access_token = oauth_token_broker.access_token_for(credentials)
+        token = OAuthToken(
+            client_id=credentials.oauth_client_id,
+            client_secret=credentials.oauth_client_secret,
+            refresh_token=credentials.oauth_refresh_token,
+            access_token=access_token.token,
+        )
+        token.set_expires_in(str(access_token.expires_at * 1000))
+        with self._lock:
+            self._tokens[credentials_id] = token
+            self._credentials_ids[credentials.oauth_refresh_token] = credentials_id
+        current_app.logger.debug(f"Created Zoho SDK token for credential {credentials_id}")
+
+    def activate(self, credentials_id: str) -> None:
+        """Make the credential's SDK context the current one on this thread."""
+        pid = os.getpid()
+        if getattr(self._local, 'active', None) == (pid, credentials_id):
+            return
+        token = self._tokens.get(credentials_id)
+        if token is None:
+            credentials = db.session.get(ZohoCredentials, credentials_id)
+            if credentials is None:
+                raise ValueError(f"ZohoCredentials {credentials_id} no longer exist")
+            self.register(credentials)
+            token = self._tokens[credentials_id]
+
+        environment = USDataCenter.PRODUCTION()
+        try:
+            with self._lock:
+                # SDK state does not survive a fork
+                if self._initialized_pid != pid:
+                    Initializer.initialize(environment=environment, token=token, store=ZohoCredentialsTokenStore(self))
+                    self._initialized_pid = pid
+                    current_app.logger.info("Successfully initialized Zoho CRM SDK")
+            Initializer.switch_user(environment=environment, token=token)
+        except Exception as e:
+            current_app.logger.error(f"Failed to initialize Zoho CRM SDK: {str(e)}", exc_info=True)
+            raise
+        self._local.active = (pid, credentials_id)
+
+    def credentials_id_for(self, token: OAuthToken) -> Optional[str]:
+        with self._lock:
+            return self._credentials_ids.get(token.get_refresh_token())
+
+
+zoho_sdk_sessions = ZohoSDKSessions()
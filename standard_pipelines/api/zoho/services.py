@@ -1,16 +1,23 @@
 from __future__ import annotations
+import asyncio
 import json
-import time
 import typing as t
+from datetime import datetime
 
 from flask import current_app
+from requests import Request
 from standard_pipelines.api.services import BaseAPIManager
+from standard_pipelines.api.async_http import async_http_engine
+from standard_pipelines.api.circuit_breaker import circuit_breaker
+from standard_pipelines.api.http_session import get_shared_session
+from standard_pipelines.api.oauth_tokens import oauth_token_broker
+from standard_pipelines.api.pagination import paginate
+from standard_pipelines.api.rate_limit import RateLimitKey
+from standard_pipelines.api.read_cache import cached_read
 from standard_pipelines.data_flow.exceptions import APIError
 from standard_pipelines.extensions import oauth
 
-from zohocrmsdk.src.com.zoho.crm.api import Initializer, ParameterMap, HeaderMap
-from zohocrmsdk.src.com.zoho.crm.api.dc import USDataCenter
-from zohocrmsdk.src.com.zoho.api.authenticator import OAuthToken
+from zohocrmsdk.src.com.zoho.crm.api import ParameterMap, HeaderMap
 from zohocrmsdk.src.com.zoho.crm.api.util import APIResponse, Choice
 from zohocrmsdk.src.com.zoho.crm.api.record.api_exception import APIException
 
@@ -31,61 +38,48 @@ from abc import ABCMeta, abstractmethod
 from types import MappingProxyType
 
 from .models import ZohoCredentials
+from .sdk_sessions import zoho_sdk_sessions
 
 class ZohoAPIManager(BaseAPIManager, metaclass=ABCMeta):
+
+    API_BASE_URL = "https://www.zohoapis.com/crm/v7"
+    COQL_URL = f"{API_BASE_URL}/coql"
+    # Rows returned by one COQL query, Zoho allows up to 2000
+    COQL_LIMIT = 200
+    # Records per page of a module listing, Zoho's maximum
+    RECORDS_PAGE_SIZE = 200
+
     def __init__(self, creds: ZohoCredentials) -> None:
         super().__init__(creds)
-        environment = USDataCenter.PRODUCTION()
-        self.token: OAuthToken = OAuthToken(
-            client_id=creds.oauth_client_id,
-            client_secret=creds.oauth_client_secret,
-            refresh_token=creds.oauth_refresh_token,
-            access_token=creds.oauth_access_token
-        )
-        # there's an error in zoho, expires_in is actually expires_at
-        if creds.oauth_expires_at:
-            self.token.set_expires_in(str(creds.oauth_expires_at))
-        current_app.logger.debug(f"Created OAuthToken with client_id: {creds.oauth_client_id}")
-        # initialize the Zoho CRM SDK (this sets a thread-local client)
-        try:
-            Initializer.initialize(environment=environment, token=self.token)
-            current_app.logger.info("Successfully initialized Zoho CRM SDK")
-        except Exception as e:
-            current_app.logger.error(f"Failed to initialize Zoho CRM SDK: {str(e)}", exc_info=True)
-            raise
+        self._credentials_id = str(creds.id)
+        # Tokens and SDK contexts are shared by every manager of the credential
+        zoho_sdk_sessions.register(creds)
 
     @property
     def required_config(self) -> list[str]:
         return ["client_id", "oauth_client_id", "oauth_client_secret"]
 
+    @property
+    def rate_limit_key(self) -> t.Optional[RateLimitKey]:
+        return ("zoho", self._credentials_id)
+
+    def _call(self, endpoint_class: str, call: t.Callable[[], t.Any]) -> t.Any:
+        """Make one Zoho SDK or REST call behind the circuit breaker and rate limiter."""
+        zoho_sdk_sessions.activate(self._credentials_id)
+        circuit = self.circuit_key(endpoint_class)
+        circuit_breaker.before_call(circuit)
+        self.throttle()
+        with circuit_breaker.recording_failures(circuit):
+            response = call()
+        status_code = getattr(response, 'status_code', None)
+        if status_code is None and hasattr(response, 'get_status_code'):
+            status_code = response.get_status_code()
+        circuit_breaker.record_result(circuit, status_code)
+        return response
+
     @property
     def access_token(self) -> str:
-        # Refresh token if expired.
-        expires_at: int = int(self.token.get_expires_in())
-        cur_time_ms: int = int(time.time() * 1000)
-        if cur_time_ms >= expires_at:
-            current_app.logger.info("Access token expired, refreshing...")
-            try:
-                # Import the OAuth client from the zohocrmsdk
-                from zohocrmsdk.src.com.zoho.api.authenticator.oauth_token import OAuthToken
-                from zohocrmsdk.src.com.zoho.crm.api.user_signature import UserSignature
-                
-                # Refresh the token
-                refreshed_token = self.token.refresh()
-                
-                # Update the SDK Initializer with the refreshed token
-                user_signature = UserSignature(None)  # You might want to set an email here if needed
-                Initializer.initialize(
-                    user_signature=user_signature,
-                    environment=USDataCenter.PRODUCTION(),
-                    token=refreshed_token
-                )
-                
-                current_app.logger.info("Successfully refreshed access token")
-            except Exception as e:
-                current_app.logger.error(f"Failed to refresh access token: {str(e)}", exc_info=True)
-                raise
-        return self.token.get_access_token()
+        return oauth_token_broker.access_token(ZohoCredentials, self._credentials_id).token
 
     def _serialize_zoho_object(self, zoho_obj: t.Any) -> t.Union[dict, list, str, None]:
         """
@@ -175,7 +169,7 @@ class ZohoAPIManager(BaseAPIManager, metaclass=ABCMeta):
             current_app.logger.debug(f"Search criteria: {search_criteria}")
             param_instance.add(SearchRecordsParam.criteria, search_criteria)
             
-            response = record_ops.search_records(param_instance)
+            response = self._call("records", lambda: record_ops.search_records(param_instance))
             current_app.logger.debug(f"get_record_by_field response: {response.get_status_code()}, {response.get_object()}")
             
             # Check if response object is an APIException
@@ -198,7 +192,198 @@ class ZohoAPIManager(BaseAPIManager, metaclass=ABCMeta):
             current_app.logger.exception(f"Error searching for {module_name}: {e}")
             raise APIError(f"Error searching for {module_name}: {str(e)}")
 
+    def find_records_matching_any(
+        self,
+        module_names: list[str],
+        criteria_groups: list[list[tuple[str, str]]],
+        fields: list[str],
+    ) -> dict[str, t.Union[list[dict], APIError]]:
+        """
+        Find the records of each module that match any of the (field, value)
+        criteria, with one COQL query per module and criteria group and all
+        queries run concurrently.
+        
+        Each group gets its own query and its own COQL_LIMIT, so broad
+        criteria (e.g. a common first name) cannot crowd the records matching
+        narrow ones (e.g. an email) out of the results.
+        
+        Args:
+            module_names: The modules to search (e.g., ["Leads", "Contacts"])
+            criteria_groups: Lists of (field API name, value) pairs, each
+                combined with OR
+            fields: The field API names to return with each record
+            
+        Returns:
+            The matching records of each module in group order without
+            duplicates, or the APIError one of its queries failed with
+        """
+        criteria_groups = [criteria for criteria in criteria_groups if criteria]
+        if not criteria_groups:
+            raise ValueError("At least one search criterion must be provided")
+        
+        select_fields = ", ".join(dict.fromkeys(["id", *fields]))
+        queries = []
+        for module_name in module_names:
+            for criteria in criteria_groups:
+                # COQL only combines two conditions per pair of parentheses
+                where = None
+                for field, value in criteria:
+                    condition = f"{field} = '{self._coql_string(value)}'"
+                    where = condition if where is None else f"({where} or {condition})"
+                queries.append(f"select {select_fields} from {module_name} where {where} limit {self.COQL_LIMIT}")
+        current_app.logger.debug(f"COQL queries: {queries}")
+        
+        results = iter(self.coql_queries(queries))
+        matches: dict[str, t.Union[list[dict], APIError]] = {}
+        for module_name in module_names:
+            module_results = [next(results) for _ in criteria_groups]
+            error = next((result for result in module_results if isinstance(result, APIError)), None)
+            if error is not None:
+                matches[module_name] = error
+                continue
+            records: dict[str, dict] = {}
+            for result in module_results:
+                for record in result:
+                    records.setdefault(str(record.get("id")), record)
+            matches[module_name] = list(records.values())
+        return matches
+
+    def coql_queries(self, select_queries: list[str]) -> list[t.Union[list[dict], APIError]]:
+        """
+        Run COQL select queries concurrently. Each result is the records the
+        query returned, or the APIError it failed with, in query order.
+        """
+        headers = {
+            "Authorization": f"Zoho-oauthtoken {self.access_token}",
+            "Content-Type": "application/json"
+        }
+
+        async def run_all():
+            return await asyncio.gather(
+                *(self._acoql_query(select_query, headers) for select_query in select_queries),
+                return_exceptions=True,
+            )
+
+        results = []
+        for result in async_http_engine.run(run_all()):
+            if isinstance(result, Exception) and not isinstance(result, APIError):
+                current_app.logger.error(f"Error running COQL query: {result}")
+                result = APIError(f"Error running COQL query: {str(result)}")
+            results.append(result)
+        return results
+
+    async def _acoql_query(self, select_query: str, headers: dict) -> list[dict]:
+        prepared = get_shared_session().prepare_request(
+            Request("POST", self.COQL_URL, json={"select_query": select_query}, headers=headers)
+        )
+        circuit = self.circuit_key("coql")
+        await circuit_breaker.abefore_call(circuit)
+        await self.athrottle()
+        async with circuit_breaker.arecording_failures(circuit):
+            response = await async_http_engine.send(prepared, 30)
+        await circuit_breaker.arecord_result(circuit, response.status_code)
+        await self.aobserve_rate_limit(response.status_code, response.headers)
+        
+        # No content means no records found, that's not an error
+        if response.status_code == 204:
+            return []
+        if response.status_code >= 400:
+            raise APIError(f"Zoho COQL query failed with status {response.status_code}: {response.text}")
+        return response.json().get("data") or []
+
+    def get_records_modified_since(
+        self,
+        module_name: str,
+        fields: list[str],
+        since: t.Optional[datetime] = None,
+        page_token: t.Optional[str] = None,
+        converted: bool = False,
+    ) -> dict:
+        """
+        One page of a module's records modified after ``since`` (all records
+        if None), oldest first.
+        
+        Args:
+            module_name: The module name in Zoho CRM (e.g., "Leads", "Contacts")
+            fields: The field API names to return with each record
+            since: Only records modified after this UTC time are returned
+            page_token: The next_page_token of the previous page
+            converted: List only converted leads, which Zoho leaves out by
+                default
+            
+        Returns:
+            A dictionary with the page's records and the next_page_token, which
+            is None on the last page
+            
+        Raises:
+            APIError: If the request fails
+        """
+        headers = {"Authorization": f"Zoho-oauthtoken {self.access_token}"}
+        if since is not None:
+            headers["If-Modified-Since"] = since.replace(microsecond=0).isoformat() + "+00:00"
+        params = {
+            "fields": ",".join(dict.fromkeys(["Modified_Time", *fields])),
+            "per_page": self.RECORDS_PAGE_SIZE,
+            "sort_by": "Modified_Time",
+            "sort_order": "asc",
+        }
+        if page_token:
+            params["page_token"] = page_token
+        if converted:
+            params["converted"] = "true"
+        url = f"{self.API_BASE_URL}/{module_name}"
+        
+        response = self._call("records", lambda: get_shared_session().get(url, headers=headers, params=params))
+        self.observe_rate_limit(response.status_code, response.headers)
+        
+        # Not modified / no content means there is nothing newer
+        if response.status_code in (204, 304):
+            return {"records": [], "next_page_token": None}
+        if response.status_code >= 400:
+            raise APIError(f"Failed to list {module_name} records. Status code: {response.status_code}, {response.text}")
+        data = response.json()
+        info = data.get("info") or {}
+        return {
+            "records": data.get("data") or [],
+            "next_page_token": info.get("next_page_token") if info.get("more_records") else None,
+        }
+
+    def get_deleted_record_ids(self, module_name: str, since: datetime, page: int = 1) -> dict:
+        """
+        One page of the ids of a module's records deleted after ``since``.
+        
+        Returns:
+            A dictionary with the page's record ids and whether more pages follow
+            
+        Raises:
+            APIError: If the request fails
+        """
+        headers = {
+            "Authorization": f"Zoho-oauthtoken {self.access_token}",
+            "If-Modified-Since": since.replace(microsecond=0).isoformat() + "+00:00",
+        }
+        params = {"type": "all", "page": page, "per_page": self.RECORDS_PAGE_SIZE}
+        url = f"{self.API_BASE_URL}/{module_name}/deleted"
+        
+        response = self._call("records", lambda: get_shared_session().get(url, headers=headers, params=params))
+        self.observe_rate_limit(response.status_code, response.headers)
         
+        if response.status_code in (204, 304):
+            return {"record_ids": [], "more_records": False}
+        if response.status_code >= 400:
+            raise APIError(f"Failed to list deleted {module_name} records. Status code: {response.status_code}, {response.text}")
+        data = response.json()
+        return {
+            "record_ids": [str(record["id"]) for record in data.get("data") or [] if record.get("id")],
+            "more_records": bool((data.get("info") or {}).get("more_records")),
+        }
+
+    @staticmethod
+    def _coql_string(value: str) -> str:
+        return str(value).replace("\\", "\\\\").replace("'", "\\'")
+
+        
+    @cached_read(ttl=600, stale_ttl=3600)
     def get_all_owners(self) -> list[dict]:
         """
         Retrieves all users/owners from Zoho CRM.
@@ -207,18 +392,7 @@ class ZohoAPIManager(BaseAPIManager, metaclass=ABCMeta):
             List of user data as JSON-serializable dictionaries
         """
         try:
-            from zohocrmsdk.src.com.zoho.crm.api.users import UsersOperations
-            
-            users_ops = UsersOperations()
-            response = users_ops.get_users()
-            
-            owners = []
-            if response.get_object() and hasattr(response.get_object(), 'get_users'):
-                data = response.get_object().get_users()
-                for user in data:
-                    owner_dict = self._serialize_zoho_object(user)
-                    owners.append(owner_dict)
-                
+            owners = list(self.iter_users())
             current_app.logger.info(f"Retrieved {len(owners)} users from Zoho")
             return owners
         
@@ -226,6 +400,34 @@ class ZohoAPIManager(BaseAPIManager, metaclass=ABCMeta):
             current_app.logger.exception(f"Error retrieving users: {e}")
             raise APIError(f"Error retrieving users: {str(e)}")
 
+    def iter_users(self, prefetch: bool = False) -> t.Iterator[dict]:
+        """
+        Yields every user in Zoho CRM page by page.
+        
+        Returns:
+            Iterator over user data as JSON-serializable dictionaries
+        """
+        from zohocrmsdk.src.com.zoho.crm.api.users import UsersOperations, GetUsersParam
+        
+        users_ops = UsersOperations()
+        
+        def fetch_page(page: t.Optional[int]):
+            page = page or 1
+            param_instance = ParameterMap()
+            param_instance.add(GetUsersParam.page, page)
+            param_instance.add(GetUsersParam.per_page, self.RECORDS_PAGE_SIZE)
+            response = self._call("users", lambda: users_ops.get_users(param_instance))
+            
+            response_object = response.get_object() if response is not None else None
+            if not response_object or not hasattr(response_object, 'get_users'):
+                return [], None
+            users = [self._serialize_zoho_object(user) for user in response_object.get_users() or []]
+            info = response_object.get_info() if hasattr(response_object, 'get_info') else None
+            more_records = bool(info and info.get_more_records())
+            return users, page + 1 if more_records else None
+        
+        return paginate(fetch_page, prefetch=prefetch)
+
     def get_all_users(self) -> list[dict]:
         # In Zoho, owners and users are essentially the same.
         return self.get_all_owners()
@@ -251,7 +453,7 @@ class ZohoAPIManager(BaseAPIManager, metaclass=ABCMeta):
         params = SearchRecordsParam()
         # Use criteria to search for deals where the "Contact_Name" field equals the given contact_id.
         params.set_criteria(f"(Contact_Name:equals:{contact_id})")
-        response = record_ops.search_records("Deals", params)
+        response = self._call("records", lambda: record_ops.search_records("Deals", params))
         if response.get_object() and response.get_object().get_data():
             deals = response.get_object().get_data()
             if len(deals) > 1:
@@ -353,7 +555,7 @@ class ZohoAPIManager(BaseAPIManager, metaclass=ABCMeta):
         
         try:
             # Send the create request
-            response = record_ops.create_records(request)
+            response = self._call("records", lambda: record_ops.create_records(request))
             current_app.logger.debug(f"create_record response: {response.get_status_code()}, {response.get_object()}")
             
             # Check for errors
@@ -470,10 +672,10 @@ class ZohoAPIManager(BaseAPIManager, metaclass=ABCMeta):
             }
             
             # Make the direct API call
-            import requests
             url = "https://www.zohoapis.com/crm/v2/Notes"
             
-            response = requests.post(url, headers=headers, json=data)
+            response = self._call("notes", lambda: get_shared_session().post(url, headers=headers, json=data))
+            self.observe_rate_limit(response.status_code, response.headers)
             
             # Process the response
             if response.status_code >= 400:
@@ -526,7 +728,7 @@ class ZohoAPIManager(BaseAPIManager, metaclass=ABCMeta):
                 raise APIError(f"Record ID {record_id} is not a valid integer.")
             
             # Get the record
-            response = record_ops.get_record(record_id_int)
+            response = self._call("records", lambda: record_ops.get_record(record_id_int))
             
             # Check for errors
             if response.get_status_code() >= 400:
@@ -561,8 +763,6 @@ class ZohoAPIManager(BaseAPIManager, metaclass=ABCMeta):
         
         try:
             # Use direct REST API call instead of SDK
-            import requests
-            
             headers = {
                 "Authorization": f"Zoho-oauthtoken {self.access_token}",
                 "Content-Type": "application/json"
@@ -581,7 +781,8 @@ class ZohoAPIManager(BaseAPIManager, metaclass=ABCMeta):
                 url = f"https://www.zohoapis.com/crm/v2/{module_name}/search?criteria={encoded_criteria}"
                 current_app.logger.debug(f"Search URL: {url}")
                 
-                response = requests.get(url, headers=headers)
+                response = self._call("records", lambda: get_shared_session().get(url, headers=headers))
+                self.observe_rate_limit(response.status_code, response.headers)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -607,7 +808,8 @@ class ZohoAPIManager(BaseAPIManager, metaclass=ABCMeta):
                 # Get recent records of the module type
                 url = f"https://www.zohoapis.com/crm/v2/{module_name}?fields=id,{lookup_field}"
                 
-                response = requests.get(url, headers=headers)
+                response = self._call("records", lambda: get_shared_session().get(url, headers=headers))
+                self.observe_rate_limit(response.status_code, response.headers)
                 
                 if response.status_code == 200:
                     data = response.json()
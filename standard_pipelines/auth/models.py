@@ -1,4 +1,4 @@
-from sqlalchemy import DateTime, func, String, Integer, Boolean, ForeignKey, UniqueConstraint
+from sqlalchemy import DateTime, func, String, Integer, Boolean, ForeignKey, UniqueConstraint, event, inspect
 from sqlalchemy.orm import Mapped, relationship, mapped_column, declared_attr
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.exc import IntegrityError
@@ -8,7 +8,7 @@ from standard_pipelines.database.models import BaseMixin
 from typing import TYPE_CHECKING, Optional, List
 from datetime import datetime, timezone
 import uuid
-from standard_pipelines.database.models import SecureMixin
+from standard_pipelines.database.models import SecureMixin, unencrypted_mapped_column
 from flask import current_app
 
 if TYPE_CHECKING:
@@ -76,9 +76,26 @@ class BaseCredentials(SecureMixin):
         ForeignKey('client.id', ondelete='CASCADE')
     )
 
+    # Bumped on every update that changes more than the access token, so
+    # pooled API managers are rebuilt only when their config or secrets change
+    config_version: Mapped[int] = unencrypted_mapped_column(Integer, default=1, server_default='1', nullable=False)
+
+    # Columns rewritten by access-token refreshes, which do not bump config_version
+    ACCESS_TOKEN_COLUMNS = frozenset({
+        'oauth_access_token', 'oauth_token_expires_at', 'oauth_expires_at', 'modified_at', 'config_version',
+    })
+
     def validate_fields(self):
         pass
 
+    def has_config_changes(self) -> bool:
+        """Whether the pending changes touch anything besides the access token."""
+        return any(
+            attr.history.has_changes()
+            for attr in inspect(self).attrs
+            if attr.key not in self.ACCESS_TOKEN_COLUMNS
+        )
+
     # Default to unique constraint, can be overridden by child classes
     @declared_attr
     def __table_args__(cls):
@@ -123,6 +140,14 @@ class BaseCredentials(SecureMixin):
         return f"<{self.__class__.__name__} for {self.client.name}>"
 
 
+# Inserted ahead of SecureMixin's listener, which re-encrypts every column and
+# would make all of them look changed
+@event.listens_for(BaseCredentials, 'before_update', propagate=True, insert=True)
+def bump_config_version(mapper, connection, target):
+    if target.has_config_changes():
+        target.config_version = (target.config_version or 1) + 1
+
+
 class AnthropicCredentials(BaseCredentials):
     """Credentials for Anthropic API access."""
     __tablename__ = 'anthropic_credential'
@@ -45,7 +45,19 @@ def init_app(app):
                 'task': 'standard_pipelines.celery.tasks.run_generic_tasks',
                 'schedule': crontab(minute='*'),  # Run every minute
                 'args': ('trigger_job',)
-            }         
+            },
+            'refresh-expiring-oauth-tokens-every-5-minutes': {
+                'task': 'standard_pipelines.celery.tasks.refresh_expiring_oauth_tokens',
+                'schedule': crontab(minute='*/5'),
+            },
+            'sync-sharpspring-lead-indexes-every-15-minutes': {
+                'task': 'standard_pipelines.celery.tasks.sync_sharpspring_lead_indexes',
+                'schedule': crontab(minute='*/15'),
+            },
+            'sync-zoho-record-indexes-every-15-minutes': {
+                'task': 'standard_pipelines.celery.tasks.sync_zoho_record_indexes',
+                'schedule': crontab(minute='*/15'),
+            }
             # 'run-polling-tasks-every-minute': {
             #     'task': 'standard_pipelines.celery.tasks.run_generic_tasks',
             #     'schedule': crontab(minute='*'),  # Run every minute
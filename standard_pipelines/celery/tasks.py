@@ -103,6 +103,88 @@ def execute_task_method(model_class_name: str, task_id: str, method_name: str):
         db.session.rollback()
         current_app.logger.error(f"Error executing {method_name} on {task_instance}: {str(e)}")
 
+@shared_task(bind=True, max_retries=6)
+def sync_oauth_credential_to_n8n(self, provider_name: str, credential_id: str, user_email: str, n8n_types: list[str] | None = None):
+    """
+    Push an OAuth credential to N8N outside the OAuth callback request.
+
+    All of the provider's N8N credential types are synced in one pass; only
+    the ones that failed with a retriable error are retried, with exponential
+    backoff.
+    """
+    from standard_pipelines.api.oauth_system import _oauth_registry
+
+    credential_cls = _oauth_registry.get(provider_name)
+    if credential_cls is None:
+        current_app.logger.error(f"Unknown OAuth provider {provider_name} for N8N sync")
+        return
+
+    credential = db.session.get(credential_cls, credential_id)
+    if credential is None:
+        current_app.logger.warning(f"{credential_cls.__name__} {credential_id} no longer exists, skipping N8N sync")
+        return
+
+    retry_types = credential.sync_to_n8n(user_email, n8n_types)
+    if retry_types:
+        countdown = 30 * 2 ** self.request.retries
+        current_app.logger.warning(f"Retrying N8N sync of {retry_types} for {provider_name} in {countdown}s")
+        raise self.retry(args=(provider_name, credential_id, user_email, retry_types), countdown=countdown)
+
+@shared_task(bind=True, max_retries=8)
+def process_deferred_webhook(self, client_data_flow_join_id: str, webhook_data):
+    """
+    Re-run a webhook that was deferred because a provider's circuit breaker
+    was open, backing off further while the outage lasts.
+    """
+    from standard_pipelines.data_flow.services import process_webhook
+    from standard_pipelines.data_flow.exceptions import CircuitOpenError
+
+    try:
+        process_webhook(client_data_flow_join_id, webhook_data, defer_on_outage=False)
+    except CircuitOpenError as e:
+        countdown = max(int(e.retry_after), 60 * 2 ** self.request.retries)
+        current_app.logger.warning(f"Provider still unavailable for webhook {client_data_flow_join_id}, retrying in {countdown}s")
+        raise self.retry(countdown=countdown)
+
+@shared_task
+def refresh_expiring_oauth_tokens():
+    """Pre-refresh OAuth access tokens that expire within OAUTH_PREREFRESH_WINDOW seconds."""
+    from standard_pipelines.api.oauth_tokens import oauth_token_broker
+
+    window = int(current_app.config.get('OAUTH_PREREFRESH_WINDOW', 900))
+    summary = oauth_token_broker.refresh_expiring(window)
+    for provider_name, counts in summary.items():
+        current_app.logger.info(f"OAuth pre-refresh for {provider_name}: {counts}")
+    return summary
+
+@shared_task
+def sync_sharpspring_lead_indexes():
+    """Queue a delta sync of the local SharpSpring lead index for every client with SharpSpring credentials."""
+    from standard_pipelines.api.sharpspring.models import SharpSpringCredentials
+
+    for (client_id,) in db.session.query(SharpSpringCredentials.client_id).all():
+        sync_sharpspring_lead_index.delay(str(client_id))
+
+@shared_task
+def sync_sharpspring_lead_index(client_id: str):
+    from standard_pipelines.api.sharpspring.lead_index import sync_client_leads
+
+    return sync_client_leads(client_id)
+
+@shared_task
+def sync_zoho_record_indexes():
+    """Queue a delta sync of the local Zoho lead and contact index for every client with Zoho credentials."""
+    from standard_pipelines.api.zoho.models import ZohoCredentials
+
+    for (client_id,) in db.session.query(ZohoCredentials.client_id).all():
+        sync_zoho_record_index.delay(str(client_id))
+
+@shared_task
+def sync_zoho_record_index(client_id: str):
+    from standard_pipelines.api.zoho.record_index import sync_client_records
+
+    return sync_client_records(client_id)
+
 @task_failure.connect
 def handle_task_failure(task_id, exception, args, kwargs, traceback, einfo, **kw):
     # Always rollback any db changes
@@ -38,6 +38,13 @@ class Config:
         'SECURITY_TRACKABLE': True,
         'SENTRY_DSN': None,
         'OAUTH_IMAGES_FOLDER': 'img/oauth',
+        'API_MANAGER_POOL_SIZE': 64,
+        'API_MANAGER_POOL_IDLE_TTL': 900,
+        'OAUTH_PREREFRESH_WINDOW': 900,
+        'READ_CACHE_SIZE': 1024,
+        'READ_CACHE_REDIS': True,
+        'HTTP_POOL_CONNECTIONS': 20,
+        'HTTP_POOL_MAXSIZE': 20,
     }
 
     # API Usage flags
@@ -1,11 +1,12 @@
 import typing as t
-from typing import Optional, Dict, List, Any, cast
+from typing import Dict, List, Any, cast
 from flask import current_app
 from functools import cached_property
 
 from ...api.hubspot.models import HubSpotCredentials
 from ...api.hubspot.services import HubSpotAPIManager
-from standard_pipelines.data_flow.exceptions import APIError, InvalidWebhookError
+from ...api.manager_pool import api_manager_pool
+from standard_pipelines.data_flow.exceptions import APIError, InvalidWebhookError, ObjectNotFoundError
 from ..services import BaseDataFlow
 from .models import AddDataToHubspotFieldConfiguration
 
@@ -52,15 +53,7 @@ class AddDataToHubspotField(BaseDataFlow[AddDataToHubspotFieldConfiguration]):
     
     @cached_property
     def hubspot_api_manager(self) -> HubSpotAPIManager:
-        credentials: Optional[HubSpotCredentials] = HubSpotCredentials.query.filter_by(client_id=self.client_id).first()
-        if credentials is None:
-            raise ValueError("No HubSpot credentials found for client")
-        hubspot_config = {
-            "client_id": credentials.hubspot_client_id,
-            "client_secret": credentials.hubspot_client_secret,
-            "refresh_token": credentials.hubspot_refresh_token
-        }
-        return HubSpotAPIManager(hubspot_config)
+        return api_manager_pool.get(HubSpotCredentials, self.client_id, HubSpotAPIManager.from_credentials)
     
     def context_from_webhook_data(self, webhook_data: t.Any) -> t.Optional[dict]:
         """
@@ -112,7 +105,8 @@ class AddDataToHubspotField(BaseDataFlow[AddDataToHubspotFieldConfiguration]):
     
     def extract(self, context: t.Optional[dict] = None) -> dict:
         """
-        Verify that the requested object exists and the fields are valid.
+        Check that the requested object type can be updated. Whether the
+        object exists is learned from the update itself in load.
         
         Args:
             context: The context from webhook_data
@@ -121,7 +115,7 @@ class AddDataToHubspotField(BaseDataFlow[AddDataToHubspotFieldConfiguration]):
             A dictionary with the verified data
             
         Raises:
-            APIError: If the object doesn't exist
+            APIError: If the object type is not supported
             ValueError: If context is missing
         """
         if not context:
@@ -131,39 +125,17 @@ class AddDataToHubspotField(BaseDataFlow[AddDataToHubspotFieldConfiguration]):
         object_type = cast(str, context.get('object_type'))
         field_updates = cast(List[Dict[str, str]], context.get('field_updates'))
         
-        current_app.logger.info(f"Verifying {object_type} with ID {object_id} for multiple field updates")
+        if object_type not in ("contact", "deal"):
+            # For other object types, we'll need to implement specific verification
+            # This is a placeholder for future expansion
+            current_app.logger.error(f"API Error verifying {object_type} with ID {object_id}: verification not implemented")
+            raise APIError(f"Verification for {object_type} not implemented")
         
-        # Verify object exists based on object_type
-        try:
-            if object_type == "contact":
-                obj = self.hubspot_api_manager.contact_by_contact_id(str(object_id))
-            elif object_type == "deal":
-                obj = self.hubspot_api_manager.deal_by_deal_id(str(object_id))
-            else:
-                # For other object types, we'll need to implement specific verification
-                # This is a placeholder for future expansion
-                raise APIError(f"Verification for {object_type} not implemented")
-            
-            # Verify the object was found
-            if not obj:
-                raise APIError(f"{object_type.capitalize()} with ID {object_id} not found")
-            
-            
-            return {
-                'object_id': object_id,
-                'object_type': object_type,
-                'field_updates': field_updates,
-                'original_object': obj
-            }
-        except APIError as e:
-            current_app.logger.error(f"API Error verifying {object_type} with ID {object_id}: {str(e)}")
-            raise
-        except ValueError as e:
-            current_app.logger.error(f"Value Error verifying {object_type} with ID {object_id}: {str(e)}")
-            raise APIError(f"Invalid value for {object_type} with ID {object_id}: {str(e)}")
-        except Exception as e:
-            current_app.logger.error(f"Error verifying {object_type} with ID {object_id}: {str(e)}")
-            raise APIError(f"Failed to verify {object_type} with ID {object_id}: {str(e)}")
+        return {
+            'object_id': object_id,
+            'object_type': object_type,
+            'field_updates': field_updates
+        }
     
     def transform(self, data: dict, context: t.Optional[dict] = None) -> dict:
         """
@@ -203,74 +175,107 @@ class AddDataToHubspotField(BaseDataFlow[AddDataToHubspotFieldConfiguration]):
         failures = []
         last_updated_object = None
         
+        # Field names that format to the same HubSpot property would overwrite
+        # each other in the update, so none of them is sent
+        field_names_by_property = {}
+        for update in field_updates:
+            field_name = cast(str, update.get('field_name'))
+            field_names_by_property.setdefault(self.format_hubspot_property_name(field_name), []).append(field_name)
+        duplicate_properties = {
+            hubspot_field_name: field_names
+            for hubspot_field_name, field_names in field_names_by_property.items()
+            if len(field_names) > 1
+        }
+        for hubspot_field_name, field_names in duplicate_properties.items():
+            current_app.logger.error(f"Rejecting fields {field_names}, which all update HubSpot property '{hubspot_field_name}'")
+        
+        # Format the field names according to HubSpot conventions and send them all in one update
+        properties = {}
         for update in field_updates:
             field_name = cast(str, update.get('field_name'))
             field_value = cast(str, update.get('field_contents'))
-            
-            # Format the field name according to HubSpot conventions
             hubspot_field_name = self.format_hubspot_property_name(field_name)
-            
+            if hubspot_field_name in duplicate_properties:
+                continue
             current_app.logger.info(f"Updating field {field_name} as HubSpot property '{hubspot_field_name}' with value: {field_value}")
+            properties[hubspot_field_name] = field_value
+        
+        try:
+            response = self.hubspot_api_manager.update_fields(
+                object_type=object_type,
+                object_id=object_id,
+                properties=properties
+            )
+            last_updated_object = response['updated_object']
+            property_failures = response['failures']
+            general_error = None
+        except ObjectNotFoundError as e:
+            current_app.logger.error(f"API Error verifying {object_type} with ID {object_id}: {str(e)}")
+            raise
+        except APIError as e:
+            property_failures = {}
+            general_error = str(e)
+        
+        for update in field_updates:
+            field_name = cast(str, update.get('field_name'))
+            field_value = cast(str, update.get('field_contents'))
+            hubspot_field_name = self.format_hubspot_property_name(field_name)
+            property_failure = property_failures.get(hubspot_field_name)
             
-            try:
-                # Use the update_field method to update the field
-                updated_object = self.hubspot_api_manager.update_field(
-                    object_type=object_type,
-                    object_id=object_id,
-                    field_name=hubspot_field_name,
-                    field_value=field_value
-                )
-                
-                last_updated_object = updated_object
+            if hubspot_field_name in duplicate_properties:
+                failure_details = {
+                    'field_name': field_name,
+                    'hubspot_property': hubspot_field_name,
+                    'field_value': field_value,
+                    'success': False,
+                    'error_type': 'DUPLICATE_PROPERTY',
+                    'error_message': f"Fields {duplicate_properties[hubspot_field_name]} all update property '{hubspot_field_name}', so none of them was applied."
+                }
+                failures.append(failure_details)
+                continue
+            
+            if general_error is None and property_failure is None:
                 update_results.append({
                     'field_name': field_name,
                     'hubspot_property': hubspot_field_name,
                     'field_value': field_value,
                     'success': True
                 })
-            except APIError as e:
-                error_message = str(e)
-                # Handle property doesn't exist errors
-                if "PROPERTY_DOESNT_EXIST" in error_message:
-                    property_name = hubspot_field_name
-                    # Extract the property name from the error if available
-                    if "Property \"" in error_message and "\" does not exist" in error_message:
-                        start_index = error_message.find("Property \"") + 10
-                        end_index = error_message.find("\" does not exist")
-                        if start_index > 0 and end_index > start_index:
-                            property_name = error_message[start_index:end_index]
-                    
-                    failure_details = {
-                        'field_name': field_name,
-                        'hubspot_property': hubspot_field_name,
-                        'field_value': field_value,
-                        'success': False,
-                        'error_type': 'PROPERTY_DOESNT_EXIST',
-                        'error_message': f"Property '{property_name}' doesn't exist in HubSpot. Check if you need a custom property created first."
-                    }
-                # Handle validation errors
-                elif "VALIDATION_ERROR" in error_message:
-                    failure_details = {
-                        'field_name': field_name,
-                        'hubspot_property': hubspot_field_name,
-                        'field_value': field_value,
-                        'success': False,
-                        'error_type': 'VALIDATION_ERROR',
-                        'error_message': f"Value '{field_value}' is not valid for property '{hubspot_field_name}'. {error_message}"
-                    }
-                # Handle other errors
-                else:
-                    failure_details = {
-                        'field_name': field_name,
-                        'hubspot_property': hubspot_field_name,
-                        'field_value': field_value,
-                        'success': False,
-                        'error_type': 'GENERAL_ERROR',
-                        'error_message': error_message
-                    }
-                    
-                current_app.logger.error(f"Error updating field {field_name}: {failure_details['error_message']}")
-                failures.append(failure_details)
+                continue
+            
+            # Handle property doesn't exist errors
+            if property_failure is not None and property_failure.get('code') == "PROPERTY_DOESNT_EXIST":
+                failure_details = {
+                    'field_name': field_name,
+                    'hubspot_property': hubspot_field_name,
+                    'field_value': field_value,
+                    'success': False,
+                    'error_type': 'PROPERTY_DOESNT_EXIST',
+                    'error_message': f"Property '{hubspot_field_name}' doesn't exist in HubSpot. Check if you need a custom property created first."
+                }
+            # Handle validation errors
+            elif property_failure is not None:
+                failure_details = {
+                    'field_name': field_name,
+                    'hubspot_property': hubspot_field_name,
+                    'field_value': field_value,
+                    'success': False,
+                    'error_type': 'VALIDATION_ERROR',
+                    'error_message': f"Value '{field_value}' is not valid for property '{hubspot_field_name}'. {property_failure.get('message')}"
+                }
+            # Handle other errors
+            else:
+                failure_details = {
+                    'field_name': field_name,
+                    'hubspot_property': hubspot_field_name,
+                    'field_value': field_value,
+                    'success': False,
+                    'error_type': 'GENERAL_ERROR',
+                    'error_message': general_error
+                }
+                
+            current_app.logger.error(f"Error updating field {field_name}: {failure_details['error_message']}")
+            failures.append(failure_details)
         
         # Determine overall success based on failures
         overall_success = len(failures) == 0
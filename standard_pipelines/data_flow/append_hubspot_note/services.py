@@ -1,11 +1,12 @@
 import typing as t
 import time
-from typing import Optional, Dict, List, Any, cast
+from typing import Dict, List, Any, cast
 from flask import current_app
 from functools import cached_property
 
 from ...api.hubspot.models import HubSpotCredentials
 from ...api.hubspot.services import HubSpotAPIManager, ExtantContactHubSpotObject, ExtantDealHubSpotObject, CreatableNoteHubSpotObject
+from ...api.manager_pool import api_manager_pool
 from standard_pipelines.data_flow.exceptions import APIError, InvalidWebhookError
 from ..services import BaseDataFlow
 from .models import AppendHubspotNoteConfiguration
@@ -22,17 +23,7 @@ class AppendHubspotNote(BaseDataFlow[AppendHubspotNoteConfiguration]):
     
     @cached_property
     def hubspot_api_manager(self) -> HubSpotAPIManager:
-        credentials: Optional[HubSpotCredentials] = HubSpotCredentials.query.filter_by(client_id=self.client_id).first()
-        if credentials is None:
-            raise ValueError("No HubSpot credentials found for client")
-        
-        # Manually decrypt credentials as a temporary fix until automatic decryption is resolved
-        hubspot_config = {
-            "client_id": credentials._decrypt_value(credentials.hubspot_client_id),
-            "client_secret": credentials._decrypt_value(credentials.hubspot_client_secret),
-            "refresh_token": credentials._decrypt_value(credentials.hubspot_refresh_token)
-        }
-        return HubSpotAPIManager(hubspot_config)
+        return api_manager_pool.get(HubSpotCredentials, self.client_id, HubSpotAPIManager.from_credentials)
     
     def context_from_webhook_data(self, webhook_data: t.Any) -> t.Optional[dict]:
         """
@@ -256,55 +247,30 @@ class AppendHubspotNote(BaseDataFlow[AppendHubspotNoteConfiguration]):
         # For this data flow, we just pass through the data
         return data
     
-    def create_and_associate_note(self, object_id: int, object_type: str, note_data: dict) -> dict:
+    def creatable_note(self, associated_object: ExtantContactHubSpotObject | ExtantDealHubSpotObject, note_data: dict) -> CreatableNoteHubSpotObject:
         """
-        Create a new note and associate it with the specified object.
+        Build a note associated with the specified object, ready to be created.
         
         Args:
-            object_id: The ID of the object to associate with
-            object_type: The type of object (contact, deal)
+            associated_object: The contact or deal the note belongs to
             note_data: Dictionary containing note content
             
         Returns:
-            The created note object
+            The note object, with its association inline
         """
-        note_content = note_data.get('content', '')
-        
-        current_app.logger.info(f"Creating note for {object_type} with ID {object_id}")
-        
-        # Create the note object
         note_object = CreatableNoteHubSpotObject({
             "properties": {
-                "hs_note_body": note_content,
+                "hs_note_body": note_data.get('content', ''),
                 "hs_timestamp": str(int(time.time() * 1000))  # Current time in milliseconds
             }
         }, self.hubspot_api_manager)
+        note_object.add_association(associated_object)
         
-        try:
-            # Create the note in HubSpot
-            created_note = self.hubspot_api_manager.create_note(note_object)
-            
-            # Associate the note with the appropriate object
-            if object_type == "contact":
-                # Get the contact object
-                contact = self.hubspot_api_manager.contact_by_contact_id(str(object_id))
-                contact_obj = ExtantContactHubSpotObject(contact, self.hubspot_api_manager)
-                created_note.add_association(contact_obj)
-            elif object_type == "deal":
-                # Get the deal object
-                deal = self.hubspot_api_manager.deal_by_deal_id(str(object_id))
-                deal_obj = ExtantDealHubSpotObject(deal, self.hubspot_api_manager)
-                created_note.add_association(deal_obj)
-                # Add owner from deal if possible
-                if "hubspot_owner_id" in deal.get("properties", {}):
-                    created_note.add_owner_from_deal(deal_obj)
-                    
-            current_app.logger.info(f"Successfully created and associated note for {object_type} with ID {object_id}")
-            return created_note
-            
-        except Exception as e:
-            current_app.logger.error(f"Error creating note for {object_type} with ID {object_id}: {str(e)}")
-            raise APIError(f"Failed to create note: {str(e)}")
+        # Add owner from deal if possible
+        if isinstance(associated_object, ExtantDealHubSpotObject) and \
+                associated_object.hubspot_object_dict.get("properties", {}).get("hubspot_owner_id"):
+            note_object.add_owner_from_deal(associated_object)
+        return note_object
     
     def load(self, data: dict, context: t.Optional[dict] = None) -> dict:
         """
@@ -326,23 +292,33 @@ class AppendHubspotNote(BaseDataFlow[AppendHubspotNoteConfiguration]):
         
         current_app.logger.info(f"Creating {len(notes)} notes for {object_type} with ID {object_id}")
         
+        # The object was fetched in extract, so the notes can carry their
+        # association and be created in batches
+        original_object = dict(data.get('original_object') or {}, id=str(object_id))
+        if object_type == "contact":
+            associated_object = ExtantContactHubSpotObject(original_object, self.hubspot_api_manager)
+        else:
+            associated_object = ExtantDealHubSpotObject(original_object, self.hubspot_api_manager)
+        note_objects = [self.creatable_note(associated_object, note_data) for note_data in notes]
+        
         note_results = []
         failures = []
         
-        for note_data in notes:
-            try:
-                created_note = self.create_and_associate_note(object_id, object_type, note_data)
-                note_results.append({
-                    'note_id': created_note.hubspot_object_dict.get('id'),
-                    'success': True
-                })
-            except APIError as e:
-                error_message = str(e)
+        for note_index, created_note in enumerate(self.hubspot_api_manager.create_notes(note_objects)):
+            if isinstance(created_note, APIError):
+                error_message = str(created_note)
                 failures.append({
+                    'note_index': note_index,
                     'success': False,
                     'error_message': error_message
                 })
                 current_app.logger.error(f"Error creating note: {error_message}")
+            else:
+                note_results.append({
+                    'note_index': note_index,
+                    'note_id': created_note.hubspot_object_dict.get('id'),
+                    'success': True
+                })
         
         overall_success = len(failures) == 0
         
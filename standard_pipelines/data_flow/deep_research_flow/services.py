@@ -1,5 +1,5 @@
 import typing as t
-from typing import Optional, Dict, Any, List
+from typing import Dict, Any, List
 from flask import current_app
 from functools import cached_property
 import re
@@ -8,6 +8,7 @@ from ...api.deep_research.services import DeepResearchManager
 from ...api.hubspot.models import HubSpotCredentials
 from ...api.hubspot.services import HubSpotAPIManager
 from ...api.openai.models import OpenAICredentials
+from ...api.manager_pool import api_manager_pool
 from ..services import BaseDataFlow
 from ..exceptions import InvalidWebhookError, DataFlowError
 from .models import DeepResearchConfiguration
@@ -25,15 +26,7 @@ class DeepResearchFlow(BaseDataFlow[DeepResearchConfiguration]):
 
     @cached_property
     def hubspot_api_manager(self) -> HubSpotAPIManager:
-        credentials: Optional[HubSpotCredentials] = HubSpotCredentials.query.filter_by(client_id=self.client_id).first()
-        if credentials is None:
-            raise ValueError("No HubSpot credentials found for client")
-        hubspot_config = {
-            "client_id": credentials.hubspot_client_id,
-            "client_secret": credentials.hubspot_client_secret,
-            "refresh_token": credentials.hubspot_refresh_token
-        }
-        return HubSpotAPIManager(hubspot_config)
+        return api_manager_pool.get(HubSpotCredentials, self.client_id, HubSpotAPIManager.from_credentials)
 
     @cached_property
     def deep_research_manager(self) -> DeepResearchManager:
@@ -1,5 +1,6 @@
 import datetime
 import json
+import re
 import typing as t
 from functools import cached_property
 from typing import Optional, Any, List, Dict, Union
@@ -10,8 +11,12 @@ from ...api.dialpad.models import DialpadCredentials
 from ...api.zoho.models import ZohoCredentials
 from ...api.dialpad.services import DialpadAPIManager
 from ...api.zoho.services import ZohoAPIManager
+from ...api.zoho.record_index import find_record, record_created
 from ...api.openai.services import OpenAIAPIManager
 from ...api.openai.models import OpenAICredentials
+from ...api.manager_pool import api_manager_pool
+from ...api.circuit_breaker import CircuitKey
+from ...extensions import db
 from ..services import BaseDataFlow
 from ..exceptions import InvalidWebhookError
 from .models import Dialpad2ZohoOnTranscriptConfiguration
@@ -24,6 +29,9 @@ class Dialpad2ZohoOnTranscript(BaseDataFlow[Dialpad2ZohoOnTranscriptConfiguratio
     """
     
     OPENAI_MODEL = "gpt-4o"
+    # Fields fetched for a matched lead or contact
+    LOOKUP_FIELDS = ["First_Name", "Last_Name", "Email", "Phone"]
+    MATCH_REASONS = ("email", "phone", "full name", "first name", "partial name")
     
     @classmethod
     def data_flow_name(cls) -> str:
@@ -31,32 +39,18 @@ class Dialpad2ZohoOnTranscript(BaseDataFlow[Dialpad2ZohoOnTranscriptConfiguratio
 
     @cached_property
     def zoho_api_manager(self) -> ZohoAPIManager:
-        credentials: Optional[ZohoCredentials] = ZohoCredentials.query.filter_by(client_id=self.client_id).first()
-        if credentials is None:
-            raise ValueError("No Zoho credentials found for client")
-        return ZohoAPIManager(credentials)
+        return api_manager_pool.get(ZohoCredentials, self.client_id, ZohoAPIManager)
 
     @cached_property
     def dialpad_api_manager(self) -> DialpadAPIManager:
-        credentials = DialpadCredentials.query.filter_by(client_id=self.client_id).first()
-        if not credentials:
-            raise ValueError(f"No Dialpad credentials found for client {self.client_id}")
-        
-        dialpad_config = {
-            "api_key": credentials.dialpad_api_key,
-        }
-        return DialpadAPIManager(dialpad_config)
+        return api_manager_pool.get(DialpadCredentials, self.client_id, DialpadAPIManager.from_credentials)
     
     @cached_property
     def openai_api_manager(self) -> OpenAIAPIManager:
-        credentials = OpenAICredentials.query.filter_by(client_id=self.client_id).first()
-        if not credentials:
-            raise ValueError(f"No OpenAI credentials found for client {self.client_id}")
-        
-        openai_config = {
-            "api_key": credentials.openai_api_key
-        }
-        return OpenAIAPIManager(openai_config)
+        return api_manager_pool.get(OpenAICredentials, self.client_id, OpenAIAPIManager.from_credentials)
+
+    def load_circuits(self) -> list[CircuitKey]:
+        return [self.zoho_api_manager.circuit_key("records"), self.zoho_api_manager.circuit_key("notes")]
 
     def context_from_webhook_data(self, webhook_data: t.Any) -> t.Optional[dict]:
         """
@@ -98,7 +92,8 @@ class Dialpad2ZohoOnTranscript(BaseDataFlow[Dialpad2ZohoOnTranscriptConfiguratio
     def find_lead_or_contact(self, person_data: dict) -> tuple[dict, str]:
         """
         Find a lead or contact in Zoho based on email, phone number, or name.
-        Uses multiple search methods to minimize duplicate creation.
+        Searches Leads and Contacts for any of the identifiers at once and
+        ranks the matches locally, to minimize duplicate creation.
         
         Args:
             person_data: Dictionary containing available contact information
@@ -109,184 +104,57 @@ class Dialpad2ZohoOnTranscript(BaseDataFlow[Dialpad2ZohoOnTranscriptConfiguratio
         """
         current_app.logger.info(f"Finding lead or contact for: {person_data}")
         
-        # Try to find contact by available identifiers
-        record = None
-        module_name = None
-        
         # STEP 1: Build search criteria from available data
-        search_criteria = {}
-        
-        if person_data.get('email'):
-            search_criteria['email'] = person_data['email']
-        
-        if person_data.get('phonenumber'):
-            # Try different phone formats to increase match chances
-            phone = person_data['phonenumber']
-            
-            # Normalize: remove any non-digit characters for comparison
-            import re
-            digits_only = re.sub(r'\D', '', phone)
-            
-            # Try different formats - with country code, without, etc.
-            if phone.startswith('+'):
-                # Without the '+' for searching
-                search_criteria['phone'] = phone[1:]
-            else:
-                search_criteria['phone'] = phone
-        
-        # Use name as an additional search criterion when available
-        if person_data.get('name'):
-            name_parts = person_data['name'].split(' ', 1)
+        email = person_data.get('email')
+        phone = person_data.get('phonenumber')
+        name_parts = person_data['name'].split(' ', 1) if person_data.get('name') else []
+        phone_digits = re.sub(r'\D', '', phone) if phone else ''
+        
+        # Names go in their own query so that a common first name cannot
+        # crowd the email and phone matches out of the results
+        identifier_criteria = []
+        name_criteria = []
+        if email:
+            identifier_criteria.append(("Email", email))
+        if phone:
+            # Try different formats - as given, without the '+', digits only
+            phone_formats = [phone, phone[1:] if phone.startswith('+') else phone, phone_digits]
+            identifier_criteria.extend(("Phone", phone_format) for phone_format in dict.fromkeys(phone_formats) if phone_format)
+        if name_parts:
+            name_criteria.append(("First_Name", name_parts[0]))
             if len(name_parts) > 1:
-                search_criteria['first_name'] = name_parts[0]
-                search_criteria['last_name'] = name_parts[1]
-            else:
-                search_criteria['first_name'] = name_parts[0]
+                name_criteria.append(("Last_Name", name_parts[1]))
         
-        # STEP 2: First search in Leads, then in Contacts
-        if search_criteria:
-            # Search in Leads first
-            try:
-                current_app.logger.debug(f"Searching for lead with criteria: {search_criteria}")
-                # Use match_all=False to perform an OR search across all fields
-                lead = self.zoho_api_manager.get_record_by_field("Leads", search_criteria, match_all=False)
-                if lead:
-                    current_app.logger.info(f"Found lead by combined criteria: {lead.get('id')}")
-                    return lead, "Leads"
-            except Exception as e:
-                current_app.logger.warning(f"Error searching for lead with combined criteria: {e}")
-            
-            # If no lead found, search in Contacts
-            try:
-                current_app.logger.debug(f"Searching for contact with criteria: {search_criteria}")
-                # Use match_all=False to perform an OR search across all fields
-                contact = self.zoho_api_manager.get_record_by_field("Contacts", search_criteria, match_all=False)
-                if contact:
-                    current_app.logger.info(f"Found contact by combined criteria: {contact.get('id')}")
-                    return contact, "Contacts"
-            except Exception as e:
-                current_app.logger.warning(f"Error searching for contact with combined criteria: {e}")
-        
-        # STEP 3: If not found, try searching by individual criteria for maximum flexibility
-        # Try by email first (most reliable identifier)
-        if person_data.get('email'):
-            # Search in Leads
-            try:
-                email_result = self.zoho_api_manager.get_record_by_field("Leads", {'email': person_data['email']})
-                if email_result:
-                    current_app.logger.info(f"Found lead by email: {email_result.get('id')}")
-                    return email_result, "Leads"
-            except Exception as e:
-                current_app.logger.warning(f"Error searching leads by email: {e}")
-            
-            # Search in Contacts
-            try:
-                email_result = self.zoho_api_manager.get_record_by_field("Contacts", {'email': person_data['email']})
-                if email_result:
-                    current_app.logger.info(f"Found contact by email: {email_result.get('id')}")
-                    return email_result, "Contacts"
-            except Exception as e:
-                current_app.logger.warning(f"Error searching contacts by email: {e}")
-        
-        # Try by phone number if email didn't work
-        if person_data.get('phonenumber'):
-            # Try searching for leads by phone
-            try:
-                # Try with original phone format
-                phone_result = self.zoho_api_manager.get_record_by_field("Leads", {'phone': person_data['phonenumber']})
-                if phone_result:
-                    current_app.logger.info(f"Found lead by phone: {phone_result.get('id')}")
-                    return phone_result, "Leads"
-                
-                # If not found, try with modified formats
-                if person_data['phonenumber'].startswith('+'):
-                    phone_no_plus = person_data['phonenumber'][1:]
-                    phone_result = self.zoho_api_manager.get_record_by_field("Leads", {'phone': phone_no_plus})
-                    if phone_result:
-                        current_app.logger.info(f"Found lead by phone (no plus): {phone_result.get('id')}")
-                        return phone_result, "Leads"
-                
-                # Try with just digits
-                if 'digits_only' in locals():
-                    phone_result = self.zoho_api_manager.get_record_by_field("Leads", {'phone': digits_only})
-                    if phone_result:
-                        current_app.logger.info(f"Found lead by phone (digits only): {phone_result.get('id')}")
-                        return phone_result, "Leads"
-            except Exception as e:
-                current_app.logger.warning(f"Error searching leads by phone: {e}")
-            
-            # Try searching for contacts by phone
-            try:
-                # Try with original phone format
-                phone_result = self.zoho_api_manager.get_record_by_field("Contacts", {'phone': person_data['phonenumber']})
-                if phone_result:
-                    current_app.logger.info(f"Found contact by phone: {phone_result.get('id')}")
-                    return phone_result, "Contacts"
-                
-                # If not found, try with modified formats
-                if person_data['phonenumber'].startswith('+'):
-                    phone_no_plus = person_data['phonenumber'][1:]
-                    phone_result = self.zoho_api_manager.get_record_by_field("Contacts", {'phone': phone_no_plus})
-                    if phone_result:
-                        current_app.logger.info(f"Found contact by phone (no plus): {phone_result.get('id')}")
-                        return phone_result, "Contacts"
-                
-                # Try with just digits
-                if 'digits_only' in locals():
-                    phone_result = self.zoho_api_manager.get_record_by_field("Contacts", {'phone': digits_only})
-                    if phone_result:
-                        current_app.logger.info(f"Found contact by phone (digits only): {phone_result.get('id')}")
-                        return phone_result, "Contacts"
-            except Exception as e:
-                current_app.logger.warning(f"Error searching contacts by phone: {e}")
+        indexed = self.find_indexed_record(email, phone, person_data.get('name'))
+        if indexed is not None:
+            record, module_name = indexed
+            current_app.logger.info(f"Found {module_name[:-1].lower()} in the local index: {record.get('id')}")
+            return record, module_name
         
-        # STEP 4: Search by name as a last resort
-        if person_data.get('name'):
-            name_parts = person_data['name'].split(' ', 1)
-            
-            # Search in Leads by name
-            try:
-                if len(name_parts) > 1:
-                    # Try to find by first name and last name
-                    name_result = self.zoho_api_manager.get_record_by_field(
-                        "Leads", 
-                        {'first_name': name_parts[0], 'last_name': name_parts[1]},
-                        match_all=True
-                    )
-                    if name_result:
-                        current_app.logger.info(f"Found lead by full name: {name_result.get('id')}")
-                        return name_result, "Leads"
-                else:
-                    # Try by first name only
-                    name_result = self.zoho_api_manager.get_record_by_field("Leads", {'first_name': name_parts[0]})
-                    if name_result:
-                        current_app.logger.info(f"Found lead by first name: {name_result.get('id')}")
-                        return name_result, "Leads"
-            except Exception as e:
-                current_app.logger.warning(f"Error searching leads by name: {e}")
+        if not identifier_criteria and not name_criteria:
+            current_app.logger.info("No identifiers to search Zoho with")
+        else:
+            # STEP 2: Query each module for email/phone and for name matches,
+            # Leads and Contacts at the same time
+            candidates = self.zoho_api_manager.find_records_matching_any(
+                ["Leads", "Contacts"], [identifier_criteria, name_criteria], self.LOOKUP_FIELDS
+            )
             
-            # Search in Contacts by name
-            try:
-                if len(name_parts) > 1:
-                    # Try to find by first name and last name
-                    name_result = self.zoho_api_manager.get_record_by_field(
-                        "Contacts", 
-                        {'first_name': name_parts[0], 'last_name': name_parts[1]},
-                        match_all=True
-                    )
-                    if name_result:
-                        current_app.logger.info(f"Found contact by full name: {name_result.get('id')}")
-                        return name_result, "Contacts"
-                else:
-                    # Try by first name only
-                    name_result = self.zoho_api_manager.get_record_by_field("Contacts", {'first_name': name_parts[0]})
-                    if name_result:
-                        current_app.logger.info(f"Found contact by first name: {name_result.get('id')}")
-                        return name_result, "Contacts"
-            except Exception as e:
-                current_app.logger.warning(f"Error searching contacts by name: {e}")
-        
-        # STEP 5: If no existing lead or contact found, create a new contact
+            # STEP 3: Pick the best match. As before, any lead wins over any
+            # contact, and within a module email beats phone beats name.
+            for module_name in ("Leads", "Contacts"):
+                records = candidates[module_name]
+                if isinstance(records, APIError):
+                    current_app.logger.warning(f"COQL search of {module_name} failed, falling back to record search: {records}")
+                    records = self._search_module(module_name, email, phone, name_parts)
+                if not records:
+                    continue
+                ranked = [(self._match_rank(record, email, phone_digits, name_parts), record) for record in records]
+                rank, record = min(ranked, key=lambda ranked_record: ranked_record[0])
+                current_app.logger.info(f"Found {module_name[:-1].lower()} by {self.MATCH_REASONS[rank]}: {record.get('id')}")
+                return record, module_name
+        
+        # STEP 4: If no existing lead or contact found, create a new contact
         current_app.logger.info(f"No lead or contact found after extensive search, creating new contact")
         
         # Prepare contact data using Zoho's expected field names
@@ -314,6 +182,7 @@ class Dialpad2ZohoOnTranscript(BaseDataFlow[Dialpad2ZohoOnTranscriptConfiguratio
             contact_data["Phone"] = person_data['phonenumber']
         
         try:
+            self.writes_started = True
             contact = self.zoho_api_manager.create_record("Contacts", contact_data)
             current_app.logger.info(f"Created new contact: {contact}")
             
@@ -343,6 +212,7 @@ class Dialpad2ZohoOnTranscript(BaseDataFlow[Dialpad2ZohoOnTranscriptConfiguratio
                 normalized_contact["Phone"] = contact_data["Phone"]
             
             current_app.logger.debug(f"Normalized contact data: {normalized_contact}")
+            self.index_created_record("Contacts", normalized_contact)
             return normalized_contact, "Contacts"
             
         except APIError as e:
@@ -408,6 +278,68 @@ class Dialpad2ZohoOnTranscript(BaseDataFlow[Dialpad2ZohoOnTranscriptConfiguratio
         
         return contact_name
 
+    def find_indexed_record(self, email: Optional[str], phone: Optional[str], name: Optional[str]) -> Optional[tuple[dict, str]]:
+        # The index only saves API calls, so any problem with it falls back to searching
+        try:
+            indexed = find_record(self.client_id, phone_number=phone, email=email, name=name)
+        except Exception as e:
+            # A failed statement leaves the session unusable for the rest of the flow
+            db.session.rollback()
+            current_app.logger.warning(f"Zoho record index lookup failed, searching Zoho instead: {e}")
+            return None
+        if indexed is None:
+            return None
+
+        # The index holds no contact details, so the match is read from Zoho;
+        # a record deleted since the last sync falls back to searching too
+        record_id, module_name = indexed
+        try:
+            return self.zoho_api_manager.get_record_by_id(module_name, record_id), module_name
+        except APIError as e:
+            current_app.logger.warning(f"Could not read indexed {module_name} record {record_id}, searching Zoho instead: {e}")
+            return None
+
+    def index_created_record(self, module_name: str, record: dict) -> None:
+        if not record.get('id'):
+            return
+        try:
+            record_created(self.client_id, module_name, record)
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.warning(f"Could not add {module_name} record {record.get('id')} to the index: {e}")
+
+    def _match_rank(self, record: dict, email: Optional[str], phone_digits: str, name_parts: List[str]) -> int:
+        """Lower is a stronger match, indexes MATCH_REASONS."""
+        if email and (record.get('Email') or '').lower() == email.lower():
+            return 0
+        if phone_digits and re.sub(r'\D', '', record.get('Phone') or '') == phone_digits:
+            return 1
+        first_name = (record.get('First_Name') or '').lower()
+        last_name = (record.get('Last_Name') or '').lower()
+        if len(name_parts) > 1 and first_name == name_parts[0].lower() and last_name == name_parts[1].lower():
+            return 2
+        if len(name_parts) == 1 and first_name == name_parts[0].lower():
+            return 3
+        return 4
+
+    def _search_module(self, module_name: str, email: Optional[str], phone: Optional[str], name_parts: List[str]) -> List[dict]:
+        """The combined OR record search, for credentials that cannot run COQL."""
+        search_criteria = {}
+        if email:
+            search_criteria['email'] = email
+        if phone:
+            search_criteria['phone'] = phone[1:] if phone.startswith('+') else phone
+        if name_parts:
+            search_criteria['first_name'] = name_parts[0]
+            if len(name_parts) > 1:
+                search_criteria['last_name'] = name_parts[1]
+        try:
+            record = self.zoho_api_manager.get_record_by_field(module_name, search_criteria, match_all=False)
+        except Exception as e:
+            current_app.logger.warning(f"Error searching {module_name} with combined criteria: {e}")
+            return []
+        return [record] if record else []
+
     def enrich_transcript(self, transcript: str, contact: dict) -> str:
         """
         Replace identifiers in transcript with user's full name or email.
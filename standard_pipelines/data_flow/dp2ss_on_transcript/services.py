@@ -9,9 +9,13 @@ from ...api.openai.models import OpenAICredentials
 
 from ...api.sharpspring.services import SharpSpringAPIManager
 from ...api.sharpspring.models import SharpSpringCredentials
+from ...api.sharpspring.lead_index import find_lead_id, forget_lead, record_lead
 
 from ...api.dialpad.services import DialpadAPIManager
 from ...api.dialpad.models import DialpadCredentials
+from ...api.manager_pool import api_manager_pool
+from ...api.circuit_breaker import CircuitKey
+from ...extensions import db
 from flask import current_app
 import time
 import re
@@ -38,23 +42,16 @@ class DP2SSOnTranscript(BaseDataFlow[DP2SSOnTranscriptConfiguration]):
 
     @cached_property
     def dialpad_api_manager(self) -> DialpadAPIManager:
-        credentials = DialpadCredentials.query.filter_by(client_id=self.client_id).first()
-        if credentials is None:
-            raise ValueError("No Dialpad credentials found for client")
-        dialpad_config = {
-            "api_key": credentials.dialpad_api_key
-        }
-        return DialpadAPIManager(dialpad_config)
+        return api_manager_pool.get(DialpadCredentials, self.client_id, DialpadAPIManager.from_credentials)
 
     @cached_property
     def openai_api_manager(self) -> OpenAIAPIManager:
-        credentials = OpenAICredentials.query.filter_by(client_id=self.client_id).first()
-        if credentials is None:
-            raise ValueError("No OpenAI credentials found for client")
-        openai_config = {
-            "api_key": credentials.openai_api_key
-        }
-        return OpenAIAPIManager(openai_config)
+        return api_manager_pool.get(OpenAICredentials, self.client_id, OpenAIAPIManager.from_credentials)
+
+    def load_circuits(self) -> list[CircuitKey]:
+        # Extract turns SharpSpring rejections into error results, so check
+        # both before it decides what to create
+        return [self.sharpspring_api_manager.circuit_key("read"), self.sharpspring_api_manager.circuit_key("write")]
     
     #======================== Core Flow ==============================#
     def context_from_webhook_data(self, webhook_data: t.Any) -> t.Optional[dict]:
@@ -124,8 +121,20 @@ class DP2SSOnTranscript(BaseDataFlow[DP2SSOnTranscriptConfiguration]):
         transcript_length = len(transcript["transcript"]) if transcript.get("transcript") else 0
         current_app.logger.debug("[DP2SS:EXTRACT] Retrieved transcript of length %d characters", transcript_length)
 
-        # Get the owner ID from SharpSpring
         owner_email = context["target"]["email"]
+        contact = context["contact"]
+
+        # A match in the local lead index replaces the lead searches below
+        indexed_contact_id = self.find_indexed_contact_id(contact)
+
+        # Fetch the owner, transcript field and lead lookups below in two concurrent rounds
+        self.sharpspring_api_manager.prefetch_contact_lookups(
+            owner_email,
+            phone_number="" if indexed_contact_id else (contact.get("phone") or ""),
+            email=None if indexed_contact_id else contact.get("email")
+        )
+
+        # Get the owner ID from SharpSpring
         current_app.logger.debug("[DP2SS:EXTRACT] Getting owner ID for email: %s", owner_email)
         owner_id_response = self.sharpspring_api_manager.get_account_owner_id(owner_email)
         if "error" in owner_id_response:
@@ -135,16 +144,24 @@ class DP2SSOnTranscript(BaseDataFlow[DP2SSOnTranscriptConfiguration]):
         current_app.logger.debug("[DP2SS:EXTRACT] Found owner ID: %s", owner_id_response.get("owner_id"))
 
         # Get the contact ID from SharpSpring
-        contact = context["contact"]
         contact_details = f"name='{contact.get('name')}', phone='{contact.get('phone')}', email='{contact.get('email')}'"
         current_app.logger.debug("[DP2SS:EXTRACT] Looking for contact in SharpSpring: %s", contact_details)
 
+        contact_id_response = {"contact_id": None, "transcript": None}
+        if indexed_contact_id:
+            current_app.logger.debug("[DP2SS:EXTRACT] Found contact in lead index with ID: %s", indexed_contact_id)
+            contact_id_response = self.sharpspring_api_manager.get_contact_by_id(indexed_contact_id)
+            if "error" not in contact_id_response and not contact_id_response.get("contact_id"):
+                current_app.logger.debug("[DP2SS:EXTRACT] Indexed contact %s no longer exists in SharpSpring", indexed_contact_id)
+                forget_lead(self.client_id, indexed_contact_id)
+
         # Try to find contact with the most reliable matching (all fields first)
-        contact_id_response = self.sharpspring_api_manager.get_contact(
-            phone_number=contact["phone"],
-            name=contact["name"],
-            email=contact["email"]
-        )
+        if "error" in contact_id_response or not contact_id_response.get("contact_id"):
+            contact_id_response = self.sharpspring_api_manager.get_contact(
+                phone_number=contact["phone"],
+                name=contact["name"],
+                email=contact["email"]
+            )
 
         # If the main search fails, try individual fields
         if "error" in contact_id_response or not contact_id_response.get("contact_id"):
@@ -465,6 +482,28 @@ class DP2SSOnTranscript(BaseDataFlow[DP2SSOnTranscriptConfiguration]):
             current_app.logger.exception("[DP2SS:CONTACT] Error in direct contact search: %s", str(e))
             return None
     
+    def find_indexed_contact_id(self, contact: dict) -> t.Optional[str]:
+        # The index only saves API calls, so any problem with it falls back to searching
+        try:
+            return find_lead_id(
+                self.client_id,
+                phone_number=contact.get("phone") or "",
+                email=contact.get("email"),
+                name=contact.get("name")
+            )
+        except Exception as e:
+            # A failed statement leaves the session unusable for the rest of the flow
+            db.session.rollback()
+            current_app.logger.warning("[DP2SS:CONTACT] Lead index lookup failed, searching SharpSpring instead: %s", str(e))
+            return None
+
+    def index_created_contact(self, contact_id: str, contact: dict, email: str) -> None:
+        try:
+            record_lead(self.client_id, contact_id, contact.get("name"), email, contact.get("phone"))
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.warning("[DP2SS:CONTACT] Could not add contact %s to the lead index: %s", contact_id, str(e))
+
     def ensure_contact_id(self, data, context) -> str:
         if not data["contact_id"]:
             contact = context["contact"]
@@ -697,6 +736,7 @@ class DP2SSOnTranscript(BaseDataFlow[DP2SSOnTranscriptConfiguration]):
                     raise APIError(f"Failed to create unique contact variant for {contact.get('name', 'Unknown')}: "
                                   f"{unique_response.get('error', 'Unknown error')}")
 
+                self.index_created_contact(unique_response["contact_id"], contact, unique_email)
                 return unique_response["contact_id"]
 
             # Handle any other errors
@@ -708,6 +748,7 @@ class DP2SSOnTranscript(BaseDataFlow[DP2SSOnTranscriptConfiguration]):
             # Success path - genuinely created a new contact
             current_app.logger.debug("[DP2SS:CONTACT] Successfully created new contact with ID: %s",
                                   contact_response['contact_id'])
+            self.index_created_contact(contact_response["contact_id"], contact, contact["email"])
             return contact_response["contact_id"]
 
         # Contact ID was already found in the extract phase
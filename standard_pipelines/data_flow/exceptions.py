@@ -7,4 +7,24 @@ class APIError(RuntimeError):
 
 
 class RetriableAPIError(APIError):
-    pass
\ No newline at end of file
+    pass
+
+
+class ObjectNotFoundError(APIError):
+    pass
+
+
+class OAuthRefreshError(APIError):
+    pass
+
+
+class OAuthGrantRevokedError(OAuthRefreshError):
+    pass
+
+
+class CircuitOpenError(APIError):
+    """Raised without calling out while a provider's circuit breaker is open."""
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
\ No newline at end of file
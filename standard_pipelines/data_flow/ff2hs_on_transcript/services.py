@@ -2,7 +2,6 @@ import datetime
 import itertools
 import os
 import typing as t
-from typing import Optional
 import uuid
 from flask import current_app
 from functools import cached_property
@@ -22,6 +21,7 @@ from ...api.hubspot.services import (
     CreatableDealHubSpotObject,
     CreatableMeetingHubSpotObject,
     CreatableNoteHubSpotObject,
+    HubSpotUnitOfWork,
 )
 from standard_pipelines.data_flow.exceptions import APIError
 
@@ -29,6 +29,7 @@ from sqlalchemy import UUID
 from ..services import BaseDataFlow
 from ...api.openai.services import OpenAIAPIManager
 from ...api.openai.models import OpenAICredentials
+from ...api.manager_pool import api_manager_pool
 from ..exceptions import InvalidWebhookError
 from .models import FF2HSOnTranscriptConfiguration
 
@@ -42,31 +43,15 @@ class FF2HSOnTranscript(BaseDataFlow[FF2HSOnTranscriptConfiguration]):
 
     @cached_property
     def hubspot_api_manager(self) -> HubSpotAPIManager:
-        credentials: Optional[HubSpotCredentials] = HubSpotCredentials.query.filter_by(client_id=self.client_id).first()
-        if credentials is None:
-            raise ValueError("No HubSpot credentials found for client")
-        hubspot_config = {
-            "client_id": credentials.hubspot_client_id,
-            "client_secret": credentials.hubspot_client_secret,
-            "refresh_token": credentials.hubspot_refresh_token
-        }
-        return HubSpotAPIManager(hubspot_config)
+        return api_manager_pool.get(HubSpotCredentials, self.client_id, HubSpotAPIManager.from_credentials)
 
     @cached_property
     def fireflies_api_manager(self) -> FirefliesAPIManager:
-        credentials = FirefliesCredentials.query.filter_by(client_id=self.client_id).first()
-        fireflies_config = {
-            "api_key": credentials.fireflies_api_key
-        }
-        return FirefliesAPIManager(fireflies_config)
+        return api_manager_pool.get(FirefliesCredentials, self.client_id, FirefliesAPIManager.from_credentials)
     
     @cached_property
     def openai_api_manager(self) -> OpenAIAPIManager:
-        credentials = OpenAICredentials.query.filter_by(client_id=self.client_id).first()
-        openai_config = {
-            "api_key": credentials.openai_api_key
-        }
-        return OpenAIAPIManager(openai_config)
+        return api_manager_pool.get(OpenAICredentials, self.client_id, OpenAIAPIManager.from_credentials)
 
     def context_from_webhook_data(self, webhook_data: t.Any) -> t.Optional[dict]:
         if not isinstance(webhook_data, dict):
@@ -224,16 +209,16 @@ class FF2HSOnTranscript(BaseDataFlow[FF2HSOnTranscriptConfiguration]):
                 contacts.append(extant_contact)
             except APIError:
                 contacts.append(self.hubspot_contact(contactable_attendee))
-        for contact in contacts:
-            if isinstance(contact, ExtantContactHubSpotObject):
-                try:
-                    contact_id = contact.hubspot_object_dict["id"]
-                    resp = self.hubspot_api_manager.deal_by_contact_id(contact_id)
-                    deal_id = resp["id"]
-                    resp = self.hubspot_api_manager.deal_by_deal_id(deal_id, properties=["hubspot_owner_id"])
-                    deals.append (ExtantDealHubSpotObject(resp, self.hubspot_api_manager))
-                except APIError:
-                    pass
+        extant_contact_ids = [
+            contact.hubspot_object_dict["id"]
+            for contact in contacts if isinstance(contact, ExtantContactHubSpotObject)
+        ]
+        if extant_contact_ids:
+            contact_deals = self.hubspot_api_manager.deals_by_contact_ids(extant_contact_ids, properties=["hubspot_owner_id"])
+            for contact_id in extant_contact_ids:
+                resp = contact_deals[str(contact_id)]
+                if not isinstance(resp, APIError):
+                    deals.append(ExtantDealHubSpotObject(resp, self.hubspot_api_manager))
 
         formatted_names = self.formatted_names(contacts)
 
@@ -262,17 +247,21 @@ class FF2HSOnTranscript(BaseDataFlow[FF2HSOnTranscriptConfiguration]):
         meeting: CreatableMeetingHubSpotObject = data["meeting"]
         note: CreatableNoteHubSpotObject = data["note"]
 
-        evaluated_contacts = [contact.evaluate() for contact in contacts]
-        for contact in evaluated_contacts:
-            deal.add_association(contact)
-            meeting.add_association(contact)
+        # Contacts are upserted on email, so an attendee added to HubSpot since
+        # transform looked them up is not duplicated
+        unit_of_work = HubSpotUnitOfWork(self.hubspot_api_manager)
+        for contact in contacts:
+            unit_of_work.add(contact, upsert_by="email")
+        unit_of_work.add(deal)
+        for contact in contacts:
+            unit_of_work.associate(deal, contact)
+            unit_of_work.associate(meeting, contact)
 
-        evaluated_deal = deal.evaluate()
+        # A deal we are about to create already carries its owner
+        unit_of_work.associate(meeting, deal)
+        meeting.add_owner_from_deal(deal)
 
-        meeting.add_association(evaluated_deal)
-        meeting.add_owner_from_deal(evaluated_deal)
-        meeting.evaluate()
+        unit_of_work.associate(note, deal)
+        note.add_owner_from_deal(deal)
 
-        note.add_association(evaluated_deal)
-        note.add_owner_from_deal(evaluated_deal)
-        note.evaluate()
+        unit_of_work.flush()
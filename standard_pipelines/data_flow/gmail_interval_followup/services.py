@@ -8,9 +8,9 @@ from standard_pipelines.api.google.gmail_services import GmailAPIManager
 from standard_pipelines.api.openai.services import OpenAIAPIManager
 from standard_pipelines.api.fireflies.services import FirefliesAPIManager
 from standard_pipelines.api.fireflies.models import FirefliesCredentials
+from standard_pipelines.api.manager_pool import api_manager_pool
 from standard_pipelines.data_flow.exceptions import InvalidWebhookError
 from functools import cached_property
-from typing import Optional
 import typing as t
 import requests
 from datetime import datetime, timedelta
@@ -25,32 +25,16 @@ class GmailIntervalFollowup(BaseDataFlow[GmailIntervalFollowupConfiguration]):
 
     @cached_property
     def hubspot_api_manager(self) -> HubSpotAPIManager:
-        credentials: Optional[HubSpotCredentials] = HubSpotCredentials.query.filter_by(client_id=self.client_id).first()
-        if credentials is None:
-            raise ValueError("No HubSpot credentials found for client")
-        hubspot_config = {
-            "client_id": credentials.hubspot_client_id,
-            "client_secret": credentials.hubspot_client_secret,
-            "refresh_token": credentials.hubspot_refresh_token
-        }
-        return HubSpotAPIManager(hubspot_config)
+        return api_manager_pool.get(HubSpotCredentials, self.client_id, HubSpotAPIManager.from_credentials)
 
     
     @cached_property
     def openai_api_manager(self) -> OpenAIAPIManager:
-        credentials = OpenAICredentials.query.filter_by(client_id=self.client_id).first()
-        openai_config = {
-            "api_key": credentials.openai_api_key
-        }
-        return OpenAIAPIManager(openai_config)
+        return api_manager_pool.get(OpenAICredentials, self.client_id, OpenAIAPIManager.from_credentials)
     
     @cached_property
     def fireflies_api_manager(self) -> FirefliesAPIManager:
-        credentials = FirefliesCredentials.query.filter_by(client_id=self.client_id).first()
-        fireflies_config = {
-            "api_key": credentials.fireflies_api_key
-        }
-        return FirefliesAPIManager(fireflies_config)
+        return api_manager_pool.get(FirefliesCredentials, self.client_id, FirefliesAPIManager.from_credentials)
     
     def context_from_webhook_data(self, webhook_data: t.Any) -> t.Optional[dict]:
         if not isinstance(webhook_data, dict):
@@ -110,10 +94,8 @@ class GmailIntervalFollowup(BaseDataFlow[GmailIntervalFollowupConfiguration]):
             # Log the error and raise a more specific exception
             raise ValueError(f"Failed to generate email content: {str(e)}")
         
-        google_api_config = { 
-            "refresh_token": input_data["google_credentials"].refresh_token
-        }
-        gmail_client = GmailAPIManager(google_api_config)
+        gmail_client = api_manager_pool.get_for_credentials(input_data["google_credentials"], GmailAPIManager.from_credentials)
+        self.writes_started = True
         draft_return = gmail_client.create_draft(input_data["contactable_attendees"], self.configuration.subject_line_template, email_body)
         return {
             'thread_id': draft_return['thread_id'],
@@ -4,9 +4,9 @@ from standard_pipelines.api.google.models import GoogleCredentials
 from standard_pipelines.api.hubspot.models import HubSpotCredentials
 from standard_pipelines.api.hubspot.services import HubSpotAPIManager
 from standard_pipelines.api.google.gmail_services import GmailAPIManager
+from standard_pipelines.api.manager_pool import api_manager_pool
 from standard_pipelines.data_flow.exceptions import InvalidWebhookError
 from functools import cached_property
-from typing import Optional
 import typing as t
 from flask import current_app
 
@@ -19,17 +19,17 @@ class LeadFollowupHumanNotification(BaseDataFlow[LeadFollowupHumanNotificationCo
 
     @cached_property
     def hubspot_api_manager(self) -> HubSpotAPIManager:
-        credentials: Optional[HubSpotCredentials] = HubSpotCredentials.query.filter_by(client_id=self.client_id).first()
-        if credentials is None:
-            raise ValueError("No HubSpot credentials found for client")
-        
+        return api_manager_pool.get(HubSpotCredentials, self.client_id, self._build_hubspot_api_manager)
+
+    @staticmethod
+    def _build_hubspot_api_manager(credentials: HubSpotCredentials) -> HubSpotAPIManager:
         # Manually decrypt credentials as a temporary fix until automatic decryption is resolved
         hubspot_config = {
             "client_id": credentials._decrypt_value(credentials.hubspot_client_id),
             "client_secret": credentials._decrypt_value(credentials.hubspot_client_secret),
             "refresh_token": credentials._decrypt_value(credentials.hubspot_refresh_token)
         }
-        return HubSpotAPIManager(hubspot_config)
+        return HubSpotAPIManager(hubspot_config, credentials=credentials)
     
     def context_from_webhook_data(self, webhook_data: t.Any) -> t.Optional[dict]:
         """
@@ -99,12 +99,8 @@ class LeadFollowupHumanNotification(BaseDataFlow[LeadFollowupHumanNotificationCo
                 owner_email = "acpohl21@gmail.com"  # Fallback if no owner
             else:
                 # Get owner details
-                owner_email = None
-                all_owners = self.hubspot_api_manager.all_owners()
-                for owner in all_owners:
-                    if owner.get('id') == owner_id:
-                        owner_email = owner.get('email')
-                        break
+                owner = self.hubspot_api_manager.owner_by_id(owner_id)
+                owner_email = owner.get('email') if owner else None
                         
                 if not owner_email:
                     current_app.logger.warning(f"Owner email not found for owner ID {owner_id}")
@@ -174,10 +170,7 @@ class LeadFollowupHumanNotification(BaseDataFlow[LeadFollowupHumanNotificationCo
         google_credentials = output_data["google_credentials"]
         
         # Initialize Gmail client
-        google_api_config = {
-            "refresh_token": google_credentials._decrypt_value(google_credentials.oauth_refresh_token)
-        }
-        gmail_client = GmailAPIManager(google_api_config)
+        gmail_client = api_manager_pool.get_for_credentials(google_credentials, GmailAPIManager.from_credentials)
         
         # Get CC addresses if configured
         cc_addresses = self.configuration.cc_addresses if hasattr(self.configuration, 'cc_addresses') else None
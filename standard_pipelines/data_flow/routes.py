@@ -28,7 +28,8 @@ def webhook(client_data_flow_join_id: str):
                 return jsonify({'error': 'Invalid request data'}), 400
 
             current_app.logger.debug(f'Webhook data: {json.dumps(webhook_data, indent=4)}')
-            process_webhook(client_data_flow_join_id, webhook_data)
+            if not process_webhook(client_data_flow_join_id, webhook_data):
+                return {'status': 'deferred', 'message': 'Webhook received, provider unavailable so it will be retried'}, 202
             return {'status': 'success', 'message': 'Webhook received'}
         except Exception as e:
             current_app.logger.error(f'Error processing webhook: {str(e)}')
@@ -60,8 +61,8 @@ def webhook_split():
     for webhook_id in validated_ids:
         try:
             # Directly call the helper function
-            process_webhook(webhook_id, webhook_data)
-            results.append({'webhook_id': webhook_id, 'status': 'success'})
+            processed = process_webhook(webhook_id, webhook_data)
+            results.append({'webhook_id': webhook_id, 'status': 'success' if processed else 'deferred'})
             current_app.logger.info(f'Wait 5 seconds before executing next webhook')
             time.sleep(5)
         except Exception as e:
@@ -3,6 +3,7 @@ from .models import ClientDataFlowJoin, DataFlow
 from .utils import BaseDataFlow,DataFlowRegistryMeta
 from standard_pipelines.api.dialpad.models import DialpadCredentials
 import jwt
+from standard_pipelines.data_flow.exceptions import APIError, CircuitOpenError
 
 
 def determine_data_flow_service(client_data_flow_join_id: str) -> BaseDataFlow:
@@ -19,9 +20,32 @@ def determine_data_flow_service(client_data_flow_join_id: str) -> BaseDataFlow:
     data_flow_class = DataFlowRegistryMeta.data_flow_class(data_flow.name)
     return data_flow_class(client_id=client_id)
 
-def process_webhook(client_data_flow_join_id: str, webhook_data):
+def process_webhook(client_data_flow_join_id: str, webhook_data, defer_on_outage: bool = True) -> bool:
+    """
+    Run the data flow for a webhook. If a provider's circuit breaker was open
+    before the flow wrote anything, it is queued for a later retry and False
+    is returned; with ``defer_on_outage`` off, ``CircuitOpenError`` is raised
+    instead. A rejection after the first write is not retried, since a replay
+    would repeat the writes.
+    """
     data_flow_service = determine_data_flow_service(client_data_flow_join_id)
-    data_flow_service.webhook_run(webhook_data)
+    try:
+        data_flow_service.webhook_run(webhook_data)
+        return True
+    except CircuitOpenError as e:
+        if data_flow_service.writes_started:
+            raise APIError(f'Provider circuit opened partway through {client_data_flow_join_id}, not retrying: {e}') from e
+        if not defer_on_outage:
+            raise
+        rejection = e
+
+    from standard_pipelines.celery.tasks import process_deferred_webhook
+    countdown = int(rejection.retry_after) + 1
+    current_app.logger.warning(
+        f'Deferring webhook for {client_data_flow_join_id} by {countdown}s, provider circuit open: {rejection}'
+    )
+    process_deferred_webhook.apply_async(args=(client_data_flow_join_id, webhook_data), countdown=countdown)
+    return False
 
 def extract_webhook_data(request, client_data_flow_join_id=None):
     if request.mimetype == 'application/json':
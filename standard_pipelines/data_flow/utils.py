@@ -12,6 +12,7 @@ from abc import ABCMeta, abstractmethod
 import typing as t
 from collections import defaultdict
 from .models import DataFlowConfiguration
+from standard_pipelines.api.circuit_breaker import CircuitKey, circuit_breaker
 import inspect
 import sentry_sdk
 
@@ -52,6 +53,9 @@ class BaseDataFlow(t.Generic[DataFlowConfigurationType], metaclass=DataFlowRegis
 
     def __init__(self, client_id: str) -> None:
         self.client_id = client_id
+        # Set once a run may have changed something outside this app, after
+        # which replaying the run would repeat those changes
+        self.writes_started = False
 
     @classmethod
     def data_flow_id(cls) -> uuid.UUID:
@@ -95,6 +99,13 @@ class BaseDataFlow(t.Generic[DataFlowConfigurationType], metaclass=DataFlowRegis
             InvalidWebhookError: the webhook is invalid and something went wrong
         """
 
+    def load_circuits(self) -> list[CircuitKey]:
+        """
+        Circuit breakers of the providers the flow writes to. They are checked
+        before extract, so an outage stops the run before anything is written.
+        """
+        return []
+
     def webhook_run(self, webhook_data: t.Any = None):
         context = self.context_from_webhook_data(webhook_data)
         self.run(context)
@@ -103,8 +114,11 @@ class BaseDataFlow(t.Generic[DataFlowConfigurationType], metaclass=DataFlowRegis
         """Run each stage of ETL in sequence, stopping if any stage fails."""
 
         success = True
+        self.writes_started = False
 
         try:
+            for circuit in self.load_circuits():
+                circuit_breaker.check(circuit)
             input_data: dict = self.extract(context)
         except Exception as e:
             self.handle_extract_failure(e)
@@ -118,6 +132,7 @@ class BaseDataFlow(t.Generic[DataFlowConfigurationType], metaclass=DataFlowRegis
                 success = False
 
         if success:
+            self.writes_started = True
             try:
                 self.load(output_data, context)
             except Exception as e:
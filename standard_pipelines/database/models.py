@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
 from sqlalchemy.dialects.postgresql import UUID as pgUUID
-from sqlalchemy import Column, func, DateTime, Integer, String, Boolean, event, inspect, JSON
+from sqlalchemy import func, DateTime, Integer, String, Boolean, event, inspect, JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship, Mapper, MappedColumn
 from standard_pipelines.database.exceptions import ScheduledJobError
 from sqlalchemy.orm.attributes import set_committed_value
@@ -12,7 +12,9 @@ from celery import shared_task
 import time
 from cryptography.fernet import Fernet
 from bitwarden_sdk import BitwardenClient
-from typing import Any, Optional, List
+from typing import Any, Callable, Dict, NamedTuple, Optional, List, Tuple
+import hashlib
+import hmac
 import json
 import os
 import sentry_sdk
@@ -257,7 +259,18 @@ def unencrypted_mapped_column(*args, **kwargs):
     kwargs['info'] = info
     return mapped_column(*args, **kwargs)
 
-def __should_skip_column(column_name : str, column : MappedColumn):
+def lookup_digest(client_id, value : Optional[str]) -> Optional[str]:
+    """
+    Keyed hash of a normalized lookup value, for indexes that match on
+    contact details without storing them. The client is part of the message,
+    so the same value hashes differently for every client.
+    """
+    if not value:
+        return None
+    key = current_app.config['ENCRYPTION_KEY'].encode()
+    return hmac.new(key, f"{client_id}:{value}".encode(), hashlib.sha256).hexdigest()
+
+def _should_skip_column(column_name : str, column : MappedColumn):
     # TODO: We should probably remove this and replace sometime with the unencrypted_mapped_column instead, same with the _ prefix
     explicit_skip_columns = {'id', 'created_at', 'modified_at', 'client_id', 'user_email', 'user_name'}
 
@@ -272,40 +285,60 @@ def __should_skip_column(column_name : str, column : MappedColumn):
     
     return False
 
+class ColumnCodec(NamedTuple):
+    """Encrypt/decrypt pair applied to a single encrypted column."""
+    encode: Callable[[SecureMixin, Any], Any]
+    decode: Callable[[SecureMixin, Any], Any]
+
+# (attribute key, codec) for every encrypted column, keyed by mapped class
+EncryptionPlan = Tuple[Tuple[str, ColumnCodec], ...]
+_encryption_plans: Dict[type, EncryptionPlan] = {}
+
+def build_encryption_plan(mapper : Mapper) -> EncryptionPlan:
+    """Resolve which columns of a SecureMixin mapper are encrypted and how."""
+    class_ = mapper.class_
+    codec = ColumnCodec(class_._encrypt_value, class_._decrypt_value)
+    return tuple(
+        (column_name, codec)
+        for column_name, column in mapper.columns.items()
+        if not _should_skip_column(column_name, column)
+    )
+
+def get_encryption_plan(class_ : type) -> EncryptionPlan:
+    plan = _encryption_plans.get(class_)
+    if plan is None:
+        # Normally filled in by mapper_configured, this only covers mappers
+        # that were used before configure_mappers() ran.
+        plan = _encryption_plans[class_] = build_encryption_plan(inspect(class_))
+    return plan
+
+@event.listens_for(SecureMixin, 'mapper_configured', propagate=True)
+def cache_encryption_plan(mapper : Mapper, class_ : type):
+    _encryption_plans[class_] = build_encryption_plan(mapper)
+
 # Encrypt before saving to database
 @event.listens_for(SecureMixin, 'before_insert', propagate=True)
 @event.listens_for(SecureMixin, 'before_update', propagate=True)
-def encrypt_before_save(mapper : Mapper, connection, target):   
-    for column_name in mapper.columns.keys():
-        column : MappedColumn = mapper.columns.get(column_name)
-
-        if not __should_skip_column(column_name, column):
-            value = getattr(target, column_name)
-            encrypted_value = target._encrypt_value(value)
-            setattr(target, column_name, encrypted_value)            
+def encrypt_before_save(mapper : Mapper, connection, target):
+    for column_name, codec in get_encryption_plan(mapper.class_):
+        value = getattr(target, column_name)
+        encrypted_value = codec.encode(target, value)
+        setattr(target, column_name, encrypted_value)
 
 # Decrypt after loading from database
 @event.listens_for(SecureMixin, 'load', propagate=True)
 def decrypt_after_load(target, context):
     try:
-        for column_name in inspect(target).mapper.columns.keys():
-            column : Column = inspect(target).mapper.columns.get(column_name)
-            # current_app.logger.debug('Current app debug log')
-            if not __should_skip_column(column_name, column):
-                try:
-                    value = getattr(target, column_name)
-                    plain = target._decrypt_value(getattr(target, column.key))
-                    # mark the value as "what came from the DB" – keeps the instance clean
-                    set_committed_value(target, column.key, plain)
-                except Exception as e:
-                    # Log the error but don't fail the entire load
-                    from flask import current_app
-                    if current_app:
-                        current_app.logger.warning(f"Failed to decrypt {column_name} on {target.__class__.__name__}: {e}")
+        for column_name, codec in get_encryption_plan(type(target)):
+            try:
+                plain = codec.decode(target, getattr(target, column_name))
+                # mark the value as "what came from the DB" – keeps the instance clean
+                set_committed_value(target, column_name, plain)
+            except Exception as e:
+                # Log the error but don't fail the entire load
+                if current_app:
+                    current_app.logger.warning(f"Failed to decrypt {column_name} on {target.__class__.__name__}: {e}")
     except Exception as e:
         # Log any unexpected errors
-        from flask import current_app
         if current_app:
             current_app.logger.error(f"Decryption event listener failed for {target.__class__.__name__}: {e}")
-
-    
\ No newline at end of file
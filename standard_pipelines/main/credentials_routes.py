@@ -194,7 +194,7 @@ def add_credential(credential_type: str):
     fields = []
     for column in model.__table__.columns:
         # TODO: Find a way to define this as "non-viewable" in the base credentials model
-        if column.name not in ['id', 'client_id', 'created_at', 'updated_at', 'modified_at']:
+        if column.name not in ['id', 'client_id', 'created_at', 'updated_at', 'modified_at', 'config_version']:
             field_info = {
                 'name': column.name,
                 'type': str(column.type),
@@ -7,6 +7,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 import pytest
 from standard_pipelines import create_app
+from standard_pipelines.data_flow.models import Client
 from standard_pipelines.extensions import db
 from testcontainers.postgres import PostgresContainer
 from testcontainers.redis import RedisContainer
@@ -93,6 +94,22 @@ def celery_app(app):
     """Create a Celery app instance for testing."""
     return app.extensions['celery']
 
+@pytest.fixture
+def redis_client(app, monkeypatch):
+    """The Redis test container as ``app.redis_client``, for code that shares state through Redis."""
+    client = redis.get_client(decode_responses=True)
+    monkeypatch.setattr(app, 'redis_client', client, raising=False)
+    return client
+
+@pytest.fixture
+def client_id(app):
+    """A saved client, deleted again with everything that cascades from it."""
+    client = Client(name="test_client", is_active=True, bitwarden_encryption_key_id="test_key_id")
+    client.save()
+    yield client.id
+    db.session.delete(client)
+    db.session.commit()
+
 @pytest.fixture
 def frozen_datetime():
     """Fixture to manage frozen time in tests."""
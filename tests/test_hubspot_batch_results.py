@@ -0,0 +1,51 @@
+from standard_pipelines.api.hubspot.services import HubSpotAPIManager
+from standard_pipelines.data_flow.exceptions import APIError
+
+
+def test_results_are_matched_to_inputs_by_trace_id():
+    response = {"results": [
+        {"id": "12", "objectWriteTraceId": "1"},
+        {"id": "11", "objectWriteTraceId": "0"},
+    ]}
+
+    results = HubSpotAPIManager._traced_results("note", response, 2)
+
+    assert [result["id"] for result in results] == ["11", "12"]
+
+
+def test_only_rejected_inputs_become_errors():
+    response = {
+        "status": "COMPLETE",
+        "results": [
+            {"id": "11", "objectWriteTraceId": "0"},
+            {"id": "13", "objectWriteTraceId": "2"},
+        ],
+        "errors": [{
+            "status": "error",
+            "category": "VALIDATION_ERROR",
+            "message": "Property values were not valid",
+            "context": {"objectWriteTraceId": ["1"]},
+        }],
+    }
+
+    results = HubSpotAPIManager._traced_results("note", response, 3)
+
+    assert results[0]["id"] == "11"
+    assert isinstance(results[1], APIError)
+    assert "Property values were not valid" in str(results[1])
+    assert results[2]["id"] == "13"
+
+
+def test_inputs_missing_from_the_response_become_errors():
+    response = {"results": [{"id": "11", "objectWriteTraceId": "0"}]}
+
+    results = HubSpotAPIManager._traced_results("note", response, 2)
+
+    assert results[0]["id"] == "11"
+    assert isinstance(results[1], APIError)
+
+
+def test_results_without_trace_ids_keep_response_order():
+    response = {"results": [{"id": "11"}, {"id": "12"}]}
+
+    assert HubSpotAPIManager._traced_results("note", response, 2) == [{"id": "11"}, {"id": "12"}]
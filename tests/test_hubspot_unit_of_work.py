@@ -0,0 +1,126 @@
+from standard_pipelines.api.hubspot.services import (
+    CreatableContactHubSpotObject,
+    CreatableDealHubSpotObject,
+    CreatableMeetingHubSpotObject,
+    ExtantContactHubSpotObject,
+    HubSpotAPIManager,
+    HubSpotUnitOfWork,
+)
+
+
+class RecordingHubSpotAPIManager:
+    """Stands in for the API manager and records the batch calls it receives."""
+
+    hubspot_association_object = HubSpotAPIManager.hubspot_association_object
+
+    def __init__(self):
+        self.calls = []
+        self._next_id = 0
+
+    def _created(self, object_type, inputs):
+        results = []
+        for object_input in inputs:
+            self._next_id += 1
+            results.append({"id": f"{object_type}-{self._next_id}", "properties": dict(object_input["properties"])})
+        return results
+
+    def batch_create(self, object_type, inputs):
+        self.calls.append(("create", object_type, [dict(object_input) for object_input in inputs]))
+        return self._created(object_type, inputs)
+
+    def batch_upsert(self, object_type, id_property, inputs):
+        self.calls.append(("upsert", object_type, id_property, [dict(object_input) for object_input in inputs]))
+        return self._created(object_type, inputs)
+
+    def batch_associate(self, from_type, to_type, pairs):
+        self.calls.append(("associate", from_type, to_type, pairs))
+
+
+def test_objects_wait_for_earlier_partners_and_associate_inline():
+    api_manager = RecordingHubSpotAPIManager()
+    contact = CreatableContactHubSpotObject({"properties": {"email": "a@example.com"}}, api_manager)
+    deal = CreatableDealHubSpotObject({"properties": {"dealname": "Deal"}}, api_manager)
+
+    unit = HubSpotUnitOfWork(api_manager)
+    unit.add(contact)
+    unit.associate(deal, contact)
+    unit.flush()
+
+    assert [call[:2] for call in api_manager.calls] == [("create", "contact"), ("create", "deal")]
+    deal_input = api_manager.calls[1][2][0]
+    assert deal_input["associations"] == [{
+        "to": {"id": "contact-1"},
+        "types": [{"associationCategory": "HUBSPOT_DEFINED", "associationTypeId": 3}],
+    }]
+    assert unit.resolve(deal).hubspot_object_dict["id"] == "deal-2"
+
+
+def test_association_to_later_partner_is_deferred():
+    api_manager = RecordingHubSpotAPIManager()
+    deal = CreatableDealHubSpotObject({"properties": {"dealname": "Deal"}}, api_manager)
+    contact = CreatableContactHubSpotObject({"properties": {"email": "a@example.com"}}, api_manager)
+
+    unit = HubSpotUnitOfWork(api_manager)
+    unit.associate(deal, contact)
+    unit.flush()
+
+    assert [call[:2] for call in api_manager.calls] == [
+        ("create", "deal"), ("create", "contact"), ("associate", "deal"),
+    ]
+    assert "associations" not in api_manager.calls[0][2][0]
+    assert api_manager.calls[2] == ("associate", "deal", "contact", [("deal-1", "contact-2")])
+
+
+def test_objects_of_one_round_share_a_batch():
+    api_manager = RecordingHubSpotAPIManager()
+    contact = ExtantContactHubSpotObject({"id": "101"}, api_manager)
+    deal = CreatableDealHubSpotObject({"properties": {"dealname": "Deal"}}, api_manager)
+    meeting = CreatableMeetingHubSpotObject({"properties": {"hs_meeting_title": "Call"}}, api_manager)
+    other_deal = CreatableDealHubSpotObject({"properties": {"dealname": "Other"}}, api_manager)
+
+    unit = HubSpotUnitOfWork(api_manager)
+    unit.associate(deal, contact)
+    unit.associate(meeting, contact)
+    unit.add(other_deal)
+    unit.flush()
+
+    assert [call[:2] for call in api_manager.calls] == [("create", "deal"), ("create", "meeting")]
+    assert len(api_manager.calls[0][2]) == 2
+    assert api_manager.calls[0][2][0]["associations"][0]["to"] == {"id": "101"}
+    assert api_manager.calls[1][2][0]["associations"][0]["to"] == {"id": "101"}
+    assert "associations" not in api_manager.calls[0][2][1]
+
+
+def test_upserted_objects_associate_in_a_separate_batch():
+    api_manager = RecordingHubSpotAPIManager()
+    deal = CreatableDealHubSpotObject({"properties": {"dealname": "Deal"}}, api_manager)
+    contact = CreatableContactHubSpotObject({"properties": {"email": "a@example.com"}}, api_manager)
+
+    unit = HubSpotUnitOfWork(api_manager)
+    unit.add(contact, upsert_by="email")
+    unit.associate(deal, contact)
+    unit.add(CreatableContactHubSpotObject({"properties": {"firstname": "No email"}}, api_manager), upsert_by="email")
+    unit.flush()
+
+    assert [call[:2] for call in api_manager.calls] == [
+        ("upsert", "contact"), ("create", "contact"), ("create", "deal"),
+    ]
+    assert api_manager.calls[0][2] == "email"
+    # The deal was created after the contact, so its association went inline
+    assert api_manager.calls[2][2][0]["associations"][0]["to"] == {"id": "contact-1"}
+
+    api_manager = RecordingHubSpotAPIManager()
+    deal = CreatableDealHubSpotObject({"properties": {"dealname": "Deal"}}, api_manager)
+    meeting = CreatableMeetingHubSpotObject({"properties": {"hs_unique_id": "m-1"}}, api_manager)
+
+    unit = HubSpotUnitOfWork(api_manager)
+    unit.add(deal)
+    unit.add(meeting, upsert_by="hs_unique_id")
+    unit.associate(meeting, deal)
+    unit.flush()
+
+    assert [call[:2] for call in api_manager.calls] == [
+        ("create", "deal"), ("upsert", "meeting"), ("associate", "meeting"),
+    ]
+    assert "associations" not in api_manager.calls[1][3][0]
+    assert api_manager.calls[2] == ("associate", "meeting", "deal", [("meeting-2", "deal-1")])
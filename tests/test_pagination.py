@@ -0,0 +1,127 @@
+import threading
+from contextvars import ContextVar
+
+import pytest
+from flask import current_app, has_app_context
+from standard_pipelines.api.pagination import iter_pages, paginate
+
+request_id: ContextVar[str] = ContextVar("request_id", default="")
+
+
+class PageSource:
+    """Serves ``pages`` by index cursor and records which cursors were fetched."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.fetched = []
+        self.lock = threading.Lock()
+
+    def __call__(self, cursor):
+        index = cursor or 0
+        with self.lock:
+            self.fetched.append(index)
+        next_cursor = index + 1 if index + 1 < len(self.pages) else None
+        return iter(self.pages[index]), next_cursor
+
+
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_pages_are_yielded_in_order(app, prefetch):
+    source = PageSource([[1, 2], [3], [4, 5]])
+
+    assert list(iter_pages(source, prefetch=prefetch)) == [[1, 2], [3], [4, 5]]
+    assert sorted(source.fetched) == [0, 1, 2]
+
+
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_paginate_yields_records(app, prefetch):
+    source = PageSource([[1, 2], [], [3]])
+
+    assert list(paginate(source, prefetch=prefetch)) == [1, 2, 3]
+
+
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_single_empty_page(app, prefetch):
+    assert list(iter_pages(PageSource([[]]), prefetch=prefetch)) == [[]]
+
+
+def test_pages_are_fetched_lazily_without_prefetch(app):
+    source = PageSource([[1], [2], [3]])
+    pages = iter_pages(source)
+
+    assert next(pages) == [1]
+    assert source.fetched == [0]
+
+    pages.close()
+    assert source.fetched == [0]
+
+
+def test_prefetch_requests_next_page_while_current_is_consumed(app):
+    source = PageSource([[1], [2], [3]])
+    second_fetched = threading.Event()
+
+    def fetch_page(cursor):
+        page = source(cursor)
+        if cursor == 1:
+            second_fetched.set()
+        return page
+
+    pages = iter_pages(fetch_page, prefetch=True)
+    assert next(pages) == [1]
+    # The second page arrives without the caller asking for it
+    assert second_fetched.wait(timeout=5)
+    assert list(pages) == [[2], [3]]
+
+
+def test_prefetch_runs_in_callers_contexts(app):
+    seen = []
+
+    def fetch_page(cursor):
+        seen.append((has_app_context() and current_app.name, request_id.get()))
+        return [cursor], None if cursor else 1
+
+    token = request_id.set("abc")
+    try:
+        assert list(iter_pages(fetch_page, prefetch=True)) == [[None], [1]]
+    finally:
+        request_id.reset(token)
+
+    assert seen == [(app.name, "abc"), (app.name, "abc")]
+
+
+def test_closing_early_stops_prefetching(app):
+    release = threading.Event()
+    in_flight = threading.Event()
+    fetched = []
+
+    def fetch_page(cursor):
+        cursor = cursor or 0
+        fetched.append(cursor)
+        if cursor == 1:
+            in_flight.set()
+            release.wait(timeout=5)
+        return [cursor], cursor + 1
+
+    pages = iter_pages(fetch_page, prefetch=True)
+    assert next(pages) == [0]
+    assert in_flight.wait(timeout=5)
+
+    # Closing does not wait for the page in flight
+    pages.close()
+    release.set()
+
+    for thread in threading.enumerate():
+        if thread.name.startswith("paginate-prefetch"):
+            thread.join(timeout=5)
+    assert fetched == [0, 1]
+
+
+def test_errors_reach_the_caller(app):
+    def fetch_page(cursor):
+        if cursor:
+            raise RuntimeError("page failed")
+        return [1], 1
+
+    pages = iter_pages(fetch_page, prefetch=True)
+    assert next(pages) == [1]
+    with pytest.raises(RuntimeError, match="page failed"):
+        next(pages)
@@ -0,0 +1,87 @@
+import uuid
+
+import pytest
+from standard_pipelines.api.rate_limit import RateLimit, RateLimiter, parse_retry_after
+from standard_pipelines.data_flow.exceptions import RetriableAPIError
+
+
+@pytest.fixture(params=["redis", "local"])
+def limiter(request, app, monkeypatch):
+    """A limiter with a small test bucket, backed by Redis or by per-process buckets."""
+    if request.param == "redis":
+        request.getfixturevalue("redis_client")
+    else:
+        monkeypatch.setattr(RateLimiter, "_redis_client", staticmethod(lambda: None))
+    return RateLimiter({"test": RateLimit(rate=1.0, burst=2)})
+
+
+@pytest.fixture
+def credential():
+    return uuid.uuid4().hex
+
+
+def test_bucket_allows_burst_then_waits(limiter, credential):
+    assert limiter._try_acquire("test", credential) == 0
+    assert limiter._try_acquire("test", credential) == 0
+
+    wait = limiter._try_acquire("test", credential)
+    assert 0.5 < wait <= 1.0
+
+
+def test_buckets_are_per_credential(limiter, credential):
+    limiter._try_acquire("test", credential)
+    limiter._try_acquire("test", credential)
+
+    assert limiter._try_acquire("test", uuid.uuid4().hex) == 0
+
+
+def test_unlimited_provider_never_waits(limiter, credential):
+    for _ in range(10):
+        assert limiter._try_acquire("unknown", credential) == 0
+
+
+def test_acquire_gives_up_past_max_wait(limiter, credential):
+    limiter.acquire("test", credential)
+    limiter.acquire("test", credential)
+
+    with pytest.raises(RetriableAPIError):
+        limiter.acquire("test", credential, max_wait=0.1)
+
+
+def test_429_blocks_bucket_for_retry_after(limiter, credential):
+    limiter.observe("test", credential, 429, {"Retry-After": "30"})
+
+    wait = limiter._try_acquire("test", credential)
+    assert 29 < wait <= 30
+
+
+def test_429_without_retry_after_uses_default(limiter, credential):
+    limiter.observe("test", credential, 429, {})
+
+    wait = limiter._try_acquire("test", credential)
+    assert limiter.DEFAULT_RETRY_AFTER - 1 < wait <= limiter.DEFAULT_RETRY_AFTER
+
+
+def test_shorter_penalty_does_not_shorten_block(limiter, credential):
+    limiter.penalize("test", credential, 30)
+    limiter.penalize("test", credential, 5)
+
+    assert limiter._try_acquire("test", credential) > 25
+
+
+def test_other_statuses_do_not_penalize(limiter, credential):
+    limiter.observe("test", credential, 500, {"Retry-After": "30"})
+
+    assert limiter._try_acquire("test", credential) == 0
+
+
+def test_parse_retry_after_seconds():
+    assert parse_retry_after("12") == 12.0
+    assert parse_retry_after("-3") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+
+def test_parse_retry_after_http_date(frozen_datetime):
+    assert parse_retry_after("Wed, 01 Jan 2025 12:00:30 GMT") == 30.0
+    assert parse_retry_after("Wed, 01 Jan 2025 11:00:00 GMT") == 0.0
@@ -0,0 +1,180 @@
+import threading
+import uuid
+from datetime import timedelta
+
+import pytest
+from standard_pipelines.api.read_cache import ReadCache, cached_read
+
+
+class CountingLoader:
+    """Returns a new value each call: {"version": <call number>}."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {"version": self.calls}
+
+
+@pytest.fixture
+def local_cache(app, monkeypatch):
+    monkeypatch.setattr(ReadCache, "_redis_client", staticmethod(lambda: None))
+    return ReadCache(maxsize=16)
+
+
+@pytest.fixture
+def key():
+    return ReadCache.make_key("reads", ("test", uuid.uuid4().hex))
+
+
+def wait_for_refreshes():
+    for thread in threading.enumerate():
+        if thread.name == "read-cache-refresh":
+            thread.join(timeout=5)
+
+
+def test_fresh_entry_is_served_from_cache(local_cache, key, frozen_datetime):
+    loader = CountingLoader()
+
+    first = local_cache.load("reads", key, loader, ttl=60)
+    first["version"] = 99
+    frozen_datetime.tick(timedelta(seconds=59))
+    second = local_cache.load("reads", key, loader, ttl=60)
+
+    assert loader.calls == 1
+    # Callers get copies, so mutating one does not change the cache
+    assert second == {"version": 1}
+
+
+def test_expired_entry_is_reloaded(local_cache, key, frozen_datetime):
+    loader = CountingLoader()
+
+    local_cache.load("reads", key, loader, ttl=60)
+    frozen_datetime.tick(timedelta(seconds=61))
+
+    assert local_cache.load("reads", key, loader, ttl=60) == {"version": 2}
+    assert loader.calls == 2
+
+
+def test_stale_entry_is_served_while_revalidating(local_cache, key, frozen_datetime):
+    loader = CountingLoader()
+
+    local_cache.load("reads", key, loader, ttl=60, stale_ttl=600)
+    frozen_datetime.tick(timedelta(seconds=120))
+
+    assert local_cache.load("reads", key, loader, ttl=60, stale_ttl=600) == {"version": 1}
+    wait_for_refreshes()
+    assert loader.calls == 2
+    assert local_cache.load("reads", key, loader, ttl=60, stale_ttl=600) == {"version": 2}
+    assert loader.calls == 2
+
+
+def test_entry_past_stale_window_is_reloaded_synchronously(local_cache, key, frozen_datetime):
+    loader = CountingLoader()
+
+    local_cache.load("reads", key, loader, ttl=60, stale_ttl=600)
+    frozen_datetime.tick(timedelta(seconds=661))
+
+    assert local_cache.load("reads", key, loader, ttl=60, stale_ttl=600) == {"version": 2}
+
+
+def test_cache_if_rejects_values(local_cache, key):
+    loader = CountingLoader()
+
+    def only_even(value):
+        return value["version"] % 2 == 0
+
+    assert local_cache.load("reads", key, loader, ttl=60, cache_if=only_even) == {"version": 1}
+    assert local_cache.load("reads", key, loader, ttl=60, cache_if=only_even) == {"version": 2}
+    assert local_cache.load("reads", key, loader, ttl=60, cache_if=only_even) == {"version": 2}
+    assert loader.calls == 2
+
+
+def test_bypass_reloads_and_refreshes_cache(local_cache, key):
+    loader = CountingLoader()
+
+    local_cache.load("reads", key, loader, ttl=60)
+    assert local_cache.load("reads", key, loader, ttl=60, bypass=True) == {"version": 2}
+    with local_cache.bypass():
+        assert local_cache.load("reads", key, loader, ttl=60) == {"version": 3}
+    assert local_cache.load("reads", key, loader, ttl=60) == {"version": 3}
+
+
+def test_least_recently_used_entries_are_evicted(local_cache):
+    loader = CountingLoader()
+    keys = [ReadCache.make_key("reads", ("test", "lru"), (index,)) for index in range(17)]
+
+    for key in keys:
+        local_cache.load("reads", key, loader, ttl=60)
+
+    assert local_cache.lookup(keys[0]) is None
+    assert local_cache.lookup(keys[-1]) is not None
+
+
+def test_entries_are_shared_through_redis(redis_client, key):
+    loader = CountingLoader()
+
+    ReadCache().load("reads", key, loader, ttl=60)
+
+    assert ReadCache().load("reads", key, loader, ttl=60) == {"version": 1}
+    assert loader.calls == 1
+
+
+class ScopedManager:
+
+    def __init__(self, credential):
+        self.cache_scope = ("test", credential)
+        self.calls = 0
+
+    @cached_read(ttl=60, cache_if=lambda owners: bool(owners))
+    def get_owners(self, team):
+        self.calls += 1
+        return [f"{team}-owner"] if team else []
+
+
+def test_cached_read_scopes_entries_per_credential(redis_client):
+    manager = ScopedManager(uuid.uuid4().hex)
+    other_manager = ScopedManager(uuid.uuid4().hex)
+
+    assert manager.get_owners("sales") == ["sales-owner"]
+    assert manager.get_owners("sales") == ["sales-owner"]
+    assert ScopedManager.get_owners.is_cached(manager, "sales")
+    assert other_manager.get_owners("sales") == ["sales-owner"]
+    assert (manager.calls, other_manager.calls) == (1, 1)
+
+    manager.get_owners("")
+    manager.get_owners("")
+    assert manager.calls == 3
+
+    manager.get_owners("sales", bypass_cache=True)
+    assert manager.calls == 4
+
+
+def test_invalidation_reaches_other_workers(redis_client):
+    scope = ("test", uuid.uuid4().hex)
+    key = ReadCache.make_key("fields", scope)
+    loader = CountingLoader()
+    worker, other_worker = ReadCache(), ReadCache()
+
+    worker.load("fields", key, loader, ttl=3600, invalidatable=True)
+    assert other_worker.load("fields", key, loader, ttl=3600, invalidatable=True) == {"version": 1}
+
+    worker.invalidate("fields", scope)
+
+    # The other worker's in-process copy is dropped as well
+    assert other_worker.load("fields", key, loader, ttl=3600, invalidatable=True) == {"version": 2}
+    assert worker.load("fields", key, loader, ttl=3600, invalidatable=True) == {"version": 2}
+    assert loader.calls == 2
+
+
+def test_stats_are_written_to_redis_in_batches(redis_client, key):
+    name = f"reads-{uuid.uuid4().hex}"
+    cache = ReadCache()
+    cache.STATS_FLUSH_INTERVAL = 3600
+
+    cache.load(name, key, CountingLoader(), ttl=60)
+    cache.load(name, key, CountingLoader(), ttl=60)
+    assert not redis_client.exists(f"read-cache-stats:{name}")
+
+    assert cache.stats()[name] == {"misses": 1, "hits": 1}
@@ -0,0 +1,102 @@
+from standard_pipelines.api.sharpspring.lead_index import find_lead_id, normalize_phone, record_lead, sync_leads
+from standard_pipelines.api.sharpspring.models import SharpSpringLead
+from standard_pipelines.data_flow.models import Client
+from standard_pipelines.extensions import db
+
+
+class LeadSource:
+    """Stands in for the API manager, serving ``leads`` as one page of updated leads."""
+
+    def __init__(self, *leads):
+        self.leads = list(leads)
+
+    def get_leads_updated_since(self, since, until, offset):
+        return {"leads": self.leads, "next_offset": None}
+
+
+def index_leads(client_id, *leads):
+    return sync_leads(client_id, LeadSource(*leads))
+
+
+def test_sync_writes_every_lead(client_id):
+    assert index_leads(client_id, {"id": "1", "emailAddress": "ada@example.com"}, {"id": "2"}, {"name": "no id"}) == 2
+
+
+def test_email_beats_phone_and_name(client_id):
+    index_leads(
+        client_id,
+        {"id": "1", "firstName": "Ada", "lastName": "Lovelace", "phoneNumber": "+1 (555) 123-4567", "updateTimestamp": "2025-01-02 00:00:00"},
+        {"id": "2", "emailAddress": "Ada@Example.com ", "updateTimestamp": "2025-01-01 00:00:00"},
+    )
+
+    assert find_lead_id(client_id, "+1 555 123 4567", "ada@example.com", "Ada Lovelace") == "2"
+
+
+def test_phone_matches_mobile_when_email_misses(client_id):
+    index_leads(
+        client_id,
+        {"id": "1", "emailAddress": "other@example.com", "mobilePhoneNumber": "555.123.4567"},
+        {"id": "2", "firstName": "Ada", "lastName": "Lovelace"},
+    )
+
+    assert find_lead_id(client_id, "555-123-4567", "ada@example.com", "Ada Lovelace") == "1"
+
+
+def test_most_recently_updated_lead_wins(client_id):
+    index_leads(
+        client_id,
+        {"id": "1", "emailAddress": "ada@example.com", "updateTimestamp": "2024-06-01 00:00:00"},
+        {"id": "2", "emailAddress": "ada@example.com", "updateTimestamp": "2025-01-01 00:00:00"},
+        {"id": "3", "emailAddress": "ada@example.com"},
+    )
+
+    assert find_lead_id(client_id, email="ada@example.com") == "2"
+
+
+def test_name_only_matches_a_single_lead(client_id):
+    index_leads(client_id, {"id": "1", "firstName": "Ada", "lastName": "Lovelace"})
+    assert find_lead_id(client_id, name="  ada   LOVELACE ") == "1"
+
+    index_leads(client_id, {"id": "2", "firstName": "Ada", "lastName": "Lovelace"})
+    assert find_lead_id(client_id, name="Ada Lovelace") is None
+
+
+def test_resynced_lead_is_updated(client_id):
+    index_leads(client_id, {"id": "1", "emailAddress": "ada@example.com", "updateTimestamp": "2025-01-01 00:00:00"})
+    index_leads(client_id, {"id": "1", "emailAddress": "ada@lovelace.org", "updateTimestamp": "2025-01-02 00:00:00"})
+
+    assert find_lead_id(client_id, email="ada@example.com") is None
+    assert find_lead_id(client_id, email="ada@lovelace.org") == "1"
+
+
+def test_leads_are_scoped_to_client(client_id):
+    other = Client(name="other_test_client", is_active=True, bitwarden_encryption_key_id="test_key_id")
+    other.save()
+    try:
+        index_leads(other.id, {"id": "1", "emailAddress": "ada@example.com"})
+        assert find_lead_id(client_id, email="ada@example.com") is None
+    finally:
+        db.session.delete(other)
+        db.session.commit()
+
+
+def test_recorded_lead_is_found_before_sync(client_id):
+    record_lead(client_id, "42", full_name="Ada Lovelace", email="ada@example.com", phone_number="5551234567")
+
+    assert find_lead_id(client_id, "555 123 4567") == "42"
+    assert find_lead_id(client_id) is None
+
+
+def test_contact_details_are_not_stored(client_id):
+    record_lead(client_id, "42", full_name="Ada Lovelace", email="ada@example.com", phone_number="5551234567")
+
+    lead = SharpSpringLead.query.filter_by(client_id=client_id, lead_id="42").one()
+    stored = (lead.email_key, lead.phone_key, lead.name_key)
+    assert all(len(key) == 64 for key in stored)
+    assert not {"ada@example.com", "5551234567", "ada lovelace"} & set(stored)
+
+
+def test_normalize_phone():
+    assert normalize_phone("+1 (555) 123-4567") == "15551234567"
+    assert normalize_phone("123456") is None
+    assert normalize_phone(None) is None
@@ -0,0 +1,119 @@
+import pytest
+from standard_pipelines.api.zoho.models import ZohoIndexedRecord
+from standard_pipelines.api.zoho.record_index import find_record, normalize_phone, record_created, sync_module
+
+
+class RecordSource:
+    """Stands in for the API manager, serving one page of modified, deleted and converted records."""
+
+    def __init__(self, *records, deleted=(), converted=()):
+        self.records = list(records)
+        self.deleted = list(deleted)
+        self.converted = list(converted)
+
+    def get_records_modified_since(self, module, fields, since=None, page_token=None, converted=False):
+        records = [{"id": record_id} for record_id in self.converted] if converted else self.records
+        return {"records": records, "next_page_token": None}
+
+    def get_deleted_record_ids(self, module, since, page=1):
+        return {"record_ids": self.deleted, "more_records": False}
+
+
+def index_records(client_id, module, *records, **changes):
+    return sync_module(client_id, RecordSource(*records, **changes), module)
+
+
+def test_sync_writes_every_record(client_id):
+    assert index_records(client_id, "Contacts", {"id": "c1", "Email": "ada@example.com"}, {"id": "c2"}, {"Email": "no id"}) == 2
+
+
+def test_leads_rank_before_contacts(client_id):
+    index_records(client_id, "Contacts", {"id": "c1", "Email": "ada@example.com"})
+    index_records(client_id, "Leads", {"id": "l1", "Phone": "555-123-4567"})
+
+    assert find_record(client_id, phone_number="(555) 123-4567", email="ada@example.com") == ("l1", "Leads")
+
+
+def test_email_beats_phone_beats_name_within_a_module(client_id):
+    index_records(
+        client_id, "Contacts",
+        {"id": "name", "First_Name": "Ada", "Last_Name": "Lovelace"},
+        {"id": "phone", "Mobile": "+1 555 123 4567"},
+        {"id": "email", "Email": "Ada@Example.com", "First_Name": "Ada"},
+    )
+
+    assert find_record(client_id, "5551234567", "ada@example.com", "Ada Lovelace")[0] == "email"
+    assert find_record(client_id, "5551234567", None, "Ada Lovelace")[0] == "phone"
+    assert find_record(client_id, None, None, "Ada Lovelace")[0] == "name"
+
+
+def test_contact_details_are_not_stored(client_id):
+    index_records(client_id, "Contacts", {
+        "id": "c1", "First_Name": "Ada", "Last_Name": "Lovelace", "Email": "ada@example.com", "Phone": "555-123-4567",
+    })
+
+    entry = ZohoIndexedRecord.query.filter_by(client_id=client_id, record_id="c1").one()
+    stored = (entry.email_key, entry.phone_key, entry.name_key)
+    assert all(len(key) == 64 for key in stored)
+    assert not {"ada@example.com", "+15551234567", "ada lovelace"} & set(stored)
+    assert find_record(client_id, email="ADA@example.com ") == ("c1", "Contacts")
+
+
+def test_ambiguous_name_does_not_match(client_id):
+    index_records(
+        client_id, "Contacts",
+        {"id": "c1", "First_Name": "Ada", "Last_Name": "Lovelace"},
+        {"id": "c2", "First_Name": "Ada", "Last_Name": "Lovelace"},
+    )
+
+    assert find_record(client_id, name="Ada Lovelace") is None
+
+
+def test_ambiguous_name_does_not_hide_identifier_match(client_id):
+    index_records(
+        client_id, "Contacts",
+        {"id": "c1", "First_Name": "Ada", "Last_Name": "Lovelace"},
+        {"id": "c2", "First_Name": "Ada", "Last_Name": "Lovelace"},
+        {"id": "c3", "Email": "ada@example.com"},
+    )
+
+    assert find_record(client_id, email="ada@example.com", name="Ada Lovelace")[0] == "c3"
+
+
+def test_delta_sync_drops_deleted_and_converted_records(client_id):
+    modified_time = "2025-01-01T12:00:00+00:00"
+    index_records(
+        client_id, "Leads",
+        {"id": "l1", "Email": "ada@example.com", "Modified_Time": modified_time},
+        {"id": "l2", "Email": "grace@example.com", "Modified_Time": modified_time},
+    )
+
+    index_records(client_id, "Leads", deleted=["l1"], converted=["l2"])
+
+    assert find_record(client_id, email="ada@example.com") is None
+    assert find_record(client_id, email="grace@example.com") is None
+
+
+def test_created_record_is_found_before_sync(client_id):
+    record_created(client_id, "Contacts", {"id": "c1", "Email": "ada@example.com"})
+
+    assert find_record(client_id, email="ada@example.com") == ("c1", "Contacts")
+
+
+def test_no_identifiers_match_nothing(client_id):
+    assert find_record(client_id) is None
+    assert find_record(client_id, phone_number="12") is None
+
+
+@pytest.mark.parametrize("phone_number, normalized", [
+    ("+1 (555) 123-4567", "+15551234567"),
+    ("555-123-4567", "+15551234567"),
+    ("15551234567", "+15551234567"),
+    ("+44 20 7946 0958", "+442079460958"),
+    ("0044 20 7946 0958", "+442079460958"),
+    ("123", None),
+    ("", None),
+    (None, None),
+])
+def test_normalize_phone(phone_number, normalized):
+    assert normalize_phone(phone_number) == normalized